@@ -2,12 +2,19 @@ import streamlit as st
 # from streamlit_navigation_bar import st_navbar
 
 import datetime
-from data_loader import get_sp500_components, load_data, convert_df_to_csv
-# from indicators import calculate_macd, calculate_atr, calculate_obv, calculate_stochastic
-from plotting import plot_stock_chart
-from utils import configure_cufflinks
+import time
 
-configure_cufflinks()
+import pandas as pd
+from data_loader import get_sp500_components, load_timeframe, convert_df_to_csv
+# from indicators import calculate_macd, calculate_atr, calculate_obv, calculate_stochastic
+from plotting import plot_stock_chart, CHART_MODES
+from downsampling import DEFAULT_MAX_POINTS, downsample_series
+from backtest import backtest
+from resampling import TIMEFRAMES, periods_per_year
+from signals import (
+    sma_signal, rsi_signal, macd_cross_signal, macd_trend,
+    bollinger_signal, stochastic_signal, atr_percent
+)
 
 # User Interface
 
@@ -47,6 +54,13 @@ end_date = st.sidebar.date_input(
 )
 if start_date > end_date:
     st.sidebar.error("The end date must fall after the start date")
+timeframe = st.sidebar.selectbox(
+    "Timeframe",
+    list(TIMEFRAMES),
+    index=list(TIMEFRAMES).index("1d"),
+    help="Yahoo serves 1m bars for the last 30 days, 5m for 60 days and 1h for 2 years. "
+         "Other timeframes are built locally from the finest stored bars, so switching does not download again"
+)
 
 # Volume option
 exp_volume = st.sidebar.expander("Volume")
@@ -164,8 +178,44 @@ stoch_d = exp_stoch.number_input(
     step=1
 )
 
+# Chart options
+exp_chart = st.sidebar.expander("Chart")
+max_points = exp_chart.number_input(
+    label="Max points per trace",
+    min_value=200,
+    max_value=20000,
+    value=DEFAULT_MAX_POINTS,
+    step=100,
+    help="Longer date ranges are downsampled to this many points before plotting"
+)
+chart_mode = exp_chart.selectbox(
+    label="Layout",
+    options=CHART_MODES,
+    format_func={
+        "auto": "Auto",
+        "overlay": "Overlay (single chart)",
+        "stacked": "Stacked panes (WebGL)",
+    }.get,
+    help="Auto switches to stacked WebGL panes for long histories"
+)
+
+# Backtest options
+exp_backtest = st.sidebar.expander("Backtest")
+allow_short = exp_backtest.checkbox(
+    label="Short on bearish signals",
+    help="Go short instead of flat on BEARISH and OVERBOUGHT signals"
+)
+cost_bps = exp_backtest.number_input(
+    label="Cost per trade (bps)",
+    min_value=0.0,
+    max_value=100.0,
+    value=5.0,
+    step=1.0
+)
+
 
-df = load_data(ticker, start_date, end_date)
+# The end date is inclusive, so intraday timeframes show today's session
+df = load_timeframe(ticker, start_date, end_date + datetime.timedelta(days=1), timeframe)
 
 data_exp = st.expander("Preview data")
 available_cols = df.columns.tolist()
@@ -180,7 +230,7 @@ csv_file = convert_df_to_csv(df[columns_to_show])
 data_exp.download_button(
     label="Download selected as CSV",
     data=csv_file,
-    file_name=f"{ticker}_stock_prices.csv",
+    file_name=f"{ticker}_{timeframe}_stock_prices.csv",
     mime="text/csv",
 )
 
@@ -208,7 +258,8 @@ indicator_params = {
     "stoch_d": stoch_d,
 }
 
-plot_stock_chart(df, ticker, tickers_companies_dict, indicator_params)
+plot_stock_chart(df, ticker, tickers_companies_dict, indicator_params, max_points=max_points,
+                 mode=chart_mode)
 
 # Add a section for technical analysis summary
 if 'Close' in df.columns:
@@ -228,40 +279,29 @@ if 'Close' in df.columns:
             # or pass the calculated SMA from plotting.py
             if f'SMA_{sma_periods}' in df.columns:
                 latest_sma = df[f'SMA_{sma_periods}'].iloc[-1]
-                sma_signal = "BULLISH" if latest_close > latest_sma else "BEARISH"
-                st.write(f"**SMA ({sma_periods}):** ${latest_sma:.2f} - Signal: {sma_signal}")
+                st.write(f"**SMA ({sma_periods}):** ${latest_sma:.2f} - Signal: {sma_signal(latest_close, latest_sma)}")
 
         if rsi_flag:
             if 'RSI' in df.columns:
                 latest_rsi = df['RSI'].iloc[-1]
-                if latest_rsi > rsi_upper:
-                    rsi_signal = "OVERBOUGHT"
-                elif latest_rsi < rsi_lower:
-                    rsi_signal = "OVERSOLD"
-                else:
-                    rsi_signal = "NEUTRAL"
-                st.write(f"**RSI ({rsi_periods}):** {latest_rsi:.2f} - Signal: {rsi_signal}")
+                latest_rsi_signal = rsi_signal(latest_rsi, rsi_upper, rsi_lower)
+                st.write(f"**RSI ({rsi_periods}):** {latest_rsi:.2f} - Signal: {latest_rsi_signal}")
 
         if macd_flag:
             if 'MACD' in df.columns and 'MACD_Signal' in df.columns and 'MACD_Histogram' in df.columns:
                 latest_macd = df['MACD'].iloc[-1]
                 latest_signal = df['MACD_Signal'].iloc[-1]
                 latest_hist = df['MACD_Histogram'].iloc[-1]
-                macd_cross_signal = "BULLISH" if latest_macd > latest_signal else "BEARISH"
-                macd_trend = "STRENGTHENING" if latest_hist > 0 else "WEAKENING"
-                st.write(f"**MACD:** {latest_macd:.2f} - Signal: {macd_cross_signal}, Trend: {macd_trend}")
+                latest_cross = macd_cross_signal(latest_macd, latest_signal)
+                latest_trend = macd_trend(latest_hist)
+                st.write(f"**MACD:** {latest_macd:.2f} - Signal: {latest_cross}, Trend: {latest_trend}")
 
     with col2:
         if bb_flag:
             if 'Upper_Band' in df.columns and 'Lower_Band' in df.columns:
                 latest_upper = df['Upper_Band'].iloc[-1]
                 latest_lower = df['Lower_Band'].iloc[-1]
-                if latest_close > latest_upper:
-                    bb_signal = "OVERBOUGHT"
-                elif latest_close < latest_lower:
-                    bb_signal = "OVERSOLD"
-                else:
-                    bb_signal = "NEUTRAL"
+                bb_signal = bollinger_signal(latest_close, latest_upper, latest_lower)
                 st.write(f"**Bollinger Bands:** Signal: {bb_signal}")
                 st.write(f"  - Upper: ${latest_upper:.2f}")
                 st.write(f"  - Lower: ${latest_lower:.2f}")
@@ -270,16 +310,36 @@ if 'Close' in df.columns:
             if '%K' in df.columns and '%D' in df.columns:
                 latest_k = df['%K'].iloc[-1]
                 latest_d = df['%D'].iloc[-1]
-                if latest_k > 80:
-                    stoch_signal = "OVERBOUGHT"
-                elif latest_k < 20:
-                    stoch_signal = "OVERSOLD"
-                else:
-                    stoch_signal = "NEUTRAL"
+                stoch_signal = stochastic_signal(latest_k)
                 st.write(f"**Stochastic:** %K: {latest_k:.2f}, %D: {latest_d:.2f} - Signal: {stoch_signal}")
 
         if atr_flag:
             if 'ATR' in df.columns:
                 latest_atr = df['ATR'].iloc[-1]
-                atr_percent = (latest_atr / latest_close) * 100
-                st.write(f"**ATR ({atr_period}):** ${latest_atr:.2f} ({atr_percent:.2f}% of price)")
\ No newline at end of file
+                latest_atr_percent = atr_percent(latest_atr, latest_close)
+                st.write(f"**ATR ({atr_period}):** ${latest_atr:.2f} ({latest_atr_percent:.2f}% of price)")
+
+# Backtest the summary's signal rules over the whole loaded history
+if 'Close' in df.columns:
+    st.subheader("Signal Backtest")
+    backtest_start = time.perf_counter()
+    backtest_summary, equity = backtest(df, indicator_params, allow_short=allow_short, cost_bps=cost_bps,
+                                        periods_per_year=periods_per_year(timeframe))
+    backtest_ms = (time.perf_counter() - backtest_start) * 1000
+
+    if len(backtest_summary) == 1:
+        st.info("Enable SMA, RSI, MACD, Bollinger Bands or Stochastic in the sidebar to backtest their signals")
+    else:
+        table = backtest_summary.copy()
+        for col in ['total_return', 'cagr', 'volatility', 'max_drawdown', 'exposure', 'hit_rate']:
+            table[col] = (table[col] * 100).round(2)
+        table['sharpe'] = table['sharpe'].round(2)
+        table.columns = ['Total Return %', 'CAGR %', 'Volatility %', 'Sharpe', 'Max Drawdown %',
+                         'Exposure %', 'Trades', 'Hit Rate %']
+        st.dataframe(table, use_container_width=True)
+        st.line_chart(pd.DataFrame({col: downsample_series(equity[col], max_points) for col in equity}).ffill())
+        st.caption(
+            f"Growth of $1 over {len(df)} bars. Signals trade at the close and earn the next bar's return; "
+            f"RSI, Bollinger and stochastic positions are held until the opposite extreme. "
+            f"Computed in {backtest_ms:.1f} ms."
+        )
@@ -0,0 +1,126 @@
+import os
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+from chat_streaming import render_stream
+from replay import load_fixture, recorded_latency, replay_team
+from span_profiler import SpanRecorder, instrument, load_traces, summarize
+from team_runner import TeamRunner
+from tool_cache import ToolCache
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# Representative queries, each replayed from a recording. single-stock is the
+# AgentOps export of a live run; the other two are synthetic recordings modeled
+# on it (see the 'synthetic' attribute of their root span).
+SCENARIOS = {
+    'single-stock': os.path.join(ROOT, 'assets', 'trace_9023c417_2025-08-10_12-48-25.json'),
+    'market-overview': os.path.join(ROOT, 'assets', 'replay', 'market_overview.jsonl'),
+    'web-research': os.path.join(ROOT, 'assets', 'replay', 'web_research.jsonl'),
+}
+# cold: every run calls every tool. tool-cache: runs share a ToolCache, so only
+# the first pays for tool calls. concurrent: SESSIONS runs at once on a TeamRunner.
+VARIANTS = ('cold', 'tool-cache', 'concurrent')
+SESSIONS = 4
+# Recorded latencies are multiplied by this, so the suite takes seconds, not minutes
+LATENCY_SCALE = float(os.getenv("BENCHMARK_LATENCY_SCALE", "0.05"))
+RUNS = int(os.getenv("BENCHMARK_RUNS", "8"))
+# Regression thresholds: measured total latency over the (scaled) recorded latency.
+# Replay sleeps exactly the recorded time, so anything above 1.0 is overhead added
+# by routing, streaming, caching or the runner.
+THRESHOLDS = {
+    'cold': {'p50': 1.05, 'p95': 1.10},
+    'tool-cache': {'p50': 1.00, 'p95': 1.10},
+    'concurrent': {'p50': 1.10, 'p95': 1.25},
+}
+
+
+class _NullPlaceholder:
+    def markdown(self, text):
+        pass
+
+
+def _measure(chunks):
+    text, metrics = render_stream(chunks, _NullPlaceholder())
+    return metrics['ttft_s'], metrics['total_s'], len(text)
+
+
+def run_variant(trace, variant, runs=RUNS, latency_scale=LATENCY_SCALE, recorder=None):
+    """Returns [(ttft_s, total_s, characters)] for `runs` replays of trace."""
+    cache = ToolCache() if variant == 'tool-cache' else None
+
+    def make_team():
+        team = replay_team(trace, latency_scale=latency_scale, tool_cache=cache)
+        return instrument(team, recorder) if recorder is not None else team
+
+    if variant != 'concurrent':
+        return [_measure(make_team().run(message="", stream=True)) for _ in range(runs)]
+
+    runner = TeamRunner(max_workers=SESSIONS, max_pending=SESSIONS)
+    results = []
+    lock = threading.Lock()
+
+    def session():
+        result = _measure(runner.submit(make_team, "", timeout=60))
+        with lock:
+            results.append(result)
+
+    for _ in range(max(runs // SESSIONS, 1)):
+        threads = [threading.Thread(target=session) for _ in range(SESSIONS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    runner.shutdown()
+    return results
+
+
+def benchmark(scenarios=SCENARIOS, variants=VARIANTS, runs=RUNS, latency_scale=LATENCY_SCALE):
+    """
+    Replays every scenario under every variant and returns one row per pair with
+    p50/p95 time to first token and total latency, their ratio to the recorded
+    run, the routing and tool time per run, and whether the thresholds were met.
+    """
+    rows = []
+    for scenario, path in scenarios.items():
+        trace = load_fixture(path)
+        recorded_ttft, recorded_total = (seconds * latency_scale for seconds in recorded_latency(trace))
+        for variant in variants:
+            with tempfile.TemporaryDirectory() as directory:
+                spans = os.path.join(directory, 'spans.jsonl')
+                results = np.array(run_variant(trace, variant, runs, latency_scale, SpanRecorder(spans)))
+                breakdown = {(row['kind'], row['name']): row for row in summarize(load_traces(spans))}
+            count = len(results)
+            routing = sum(row['critical_s'] for key, row in breakdown.items() if key[0] == 'team') / count
+            tools = sum(row['critical_s'] for key, row in breakdown.items() if key[0] == 'tool') / count
+            ratios = {name: float(np.percentile(results[:, 1], q)) / recorded_total
+                      for name, q in (('p50', 50), ('p95', 95))}
+            rows.append({
+                'scenario': scenario, 'variant': variant, 'runs': count,
+                'ttft_p50_s': float(np.percentile(results[:, 0], 50)),
+                'ttft_p95_s': float(np.percentile(results[:, 0], 95)),
+                'total_p50_s': float(np.percentile(results[:, 1], 50)),
+                'total_p95_s': float(np.percentile(results[:, 1], 95)),
+                'recorded_s': recorded_total, 'recorded_ttft_s': recorded_ttft,
+                'routing_s': routing, 'tools_s': tools,
+                'ratio_p50': ratios['p50'], 'ratio_p95': ratios['p95'],
+                'ok': all(ratios[name] <= limit for name, limit in THRESHOLDS[variant].items()),
+            })
+    return rows
+
+
+if __name__ == "__main__":
+    # Usage: python agent_benchmark.py [scenario ...]; exits 1 when a threshold is exceeded
+    names = sys.argv[1:] or list(SCENARIOS)
+    rows = benchmark({name: SCENARIOS[name] for name in names})
+    print(f"Replay at {LATENCY_SCALE}x recorded latency, {RUNS} runs per variant\n")
+    print(f"{'scenario':<16} {'variant':<11} {'ttft p50':>9} {'ttft p95':>9} {'total p50':>10} {'total p95':>10} "
+          f"{'recorded':>9} {'routing':>8} {'tools':>7} {'p50 x':>6} {'p95 x':>6}")
+    for row in rows:
+        print(f"{row['scenario']:<16} {row['variant']:<11} {row['ttft_p50_s']:>9.3f} {row['ttft_p95_s']:>9.3f} "
+              f"{row['total_p50_s']:>10.3f} {row['total_p95_s']:>10.3f} {row['recorded_s']:>9.3f} "
+              f"{row['routing_s']:>8.3f} {row['tools_s']:>7.3f} {row['ratio_p50']:>6.2f} {row['ratio_p95']:>6.2f}"
+              f"  {'ok' if row['ok'] else 'REGRESSION'}")
+    sys.exit(0 if all(row['ok'] for row in rows) else 1)
@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+
+from indicators import compute_indicators, indicator_requests
+from signals import (
+    BULLISH, BEARISH, OVERBOUGHT, OVERSOLD,
+    sma_rule, rsi_rule, macd_cross_rule, bollinger_rule, stochastic_rule
+)
+
+TRADING_DAYS = 252
+BUY_AND_HOLD = 'Buy & Hold'
+# Columns of the summary table, in display order
+METRICS = ('total_return', 'cagr', 'volatility', 'sharpe', 'max_drawdown', 'exposure', 'trades', 'hit_rate')
+# Label -> target position; NEUTRAL (missing here) keeps the previous position, so
+# the mean-reversion rules hold a trade until the opposite extreme. Exit labels go
+# short instead of flat with allow_short.
+ENTRY_LABELS = (BULLISH, OVERSOLD)
+EXIT_LABELS = (BEARISH, OVERBOUGHT)
+
+
+def rule_positions(outputs, close, indicator_params):
+    """
+    Evaluates the enabled rules on indicator output arrays, 1-D for one ticker or
+    2-D (time x ticker); returns {rule: (rule result, inputs)}.
+    """
+    rules = {}
+    sma_col = f"SMA_{indicator_params['sma_periods']}"
+    if indicator_params['sma_flag'] and sma_col in outputs:
+        rules[f"SMA ({indicator_params['sma_periods']})"] = (sma_rule(close, outputs[sma_col]),
+                                                            (close, outputs[sma_col]))
+    if indicator_params['rsi_flag'] and 'RSI' in outputs:
+        rules['RSI'] = (rsi_rule(outputs['RSI'], indicator_params['rsi_upper'], indicator_params['rsi_lower']),
+                        (outputs['RSI'],))
+    if indicator_params['macd_flag'] and 'MACD' in outputs:
+        rules['MACD'] = (macd_cross_rule(outputs['MACD'], outputs['MACD_Signal']),
+                         (outputs['MACD'], outputs['MACD_Signal']))
+    if indicator_params['bb_flag'] and 'Upper_Band' in outputs:
+        rules['Bollinger Bands'] = (bollinger_rule(close, outputs['Upper_Band'], outputs['Lower_Band']),
+                                    (close, outputs['Upper_Band'], outputs['Lower_Band']))
+    if indicator_params['stoch_flag'] and '%K' in outputs:
+        rules['Stochastic'] = (stochastic_rule(outputs['%K']), (outputs['%K'],))
+    return rules
+
+
+def rule_inputs(df, indicator_params):
+    """
+    Returns {rule: (rule result, inputs)} for the enabled indicators, using the
+    Technical Analysis Summary rules from signals.py on every bar of df and the
+    outputs of the indicator engine.
+    """
+    outputs = {name: values.to_numpy() for name, values in
+               compute_indicators(df, indicator_requests(indicator_params)).items()}
+    return rule_positions(outputs, df['Close'].to_numpy(dtype=np.float64), indicator_params)
+
+
+def _target(label, allow_short):
+    if label in ENTRY_LABELS:
+        return 1.0
+    if label in EXIT_LABELS:
+        return -1.0 if allow_short else 0.0
+    return np.nan
+
+
+def positions(rule, inputs, allow_short=False):
+    """
+    Target position after each bar's close for one rule: 1 long, 0 flat, -1 short.
+    Works along axis 0, so 2-D (time x ticker) inputs give one column per ticker.
+    Bars where any input is still NaN (indicator warm-up) are flat.
+    """
+    conditions, choices, default = rule
+    target = np.select(conditions, [_target(label, allow_short) for label in choices],
+                       _target(default, allow_short))
+    target[np.logical_or.reduce([np.isnan(values) for values in inputs])] = 0.0
+    # Forward-fill the NEUTRAL bars without a Python loop
+    rows = np.arange(len(target)).reshape((-1,) + (1,) * (target.ndim - 1))
+    filled = np.where(np.isnan(target), 0, rows)
+    np.maximum.accumulate(filled, axis=0, out=filled)
+    held = np.take_along_axis(target, filled, axis=0) if target.ndim > 1 else target[filled]
+    return np.nan_to_num(held)
+
+
+def years_of(index, bars, periods_per_year=TRADING_DAYS):
+    """Length of the history in years, from the dates when index has them."""
+    if isinstance(index, pd.DatetimeIndex) and bars > 1:
+        return max((index[-1] - index[0]) / pd.Timedelta(days=365.25), 1 / periods_per_year)
+    return max(bars, 1) / periods_per_year
+
+
+def _trade_stats(held, log_returns):
+    """(trades, share of winning trades) per column; a trade is a run of one non-zero position."""
+    in_market = held != 0
+    previous = np.vstack([np.zeros((1, held.shape[1])), held[:-1]])
+    # Number trades column by column (Fortran order) so ids are unique across columns
+    starts = (in_market & (held != previous)).ravel(order='F')
+    trade_ids = np.cumsum(starts).reshape(held.shape, order='F') - 1
+    trade_columns = np.flatnonzero(starts) // len(held)
+    trades = np.bincount(trade_columns, minlength=held.shape[1])
+    if not len(trade_columns):
+        return trades, np.full(held.shape[1], np.nan)
+    trade_returns = np.bincount(trade_ids[in_market], weights=log_returns[in_market], minlength=len(trade_columns))
+    wins = np.bincount(trade_columns, weights=trade_returns > 0, minlength=held.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return trades, np.where(trades > 0, wins / trades, np.nan)
+
+
+def evaluate(close, target, years, cost_bps=0.0, periods_per_year=TRADING_DAYS):
+    """
+    Trades target positions (bars x columns) on close, which is 1-D for one ticker
+    or (bars x columns) for one ticker per column. Each bar's position is taken at
+    its close and earns the next bar's return, so there is no look-ahead; cost_bps
+    (a scalar or one value per column) is charged on every change of position.
+    Volatility and Sharpe are annualized with periods_per_year bars.
+    Returns ({metric: one value per column} for METRICS, equity curves).
+    """
+    close = close[:, None] if close.ndim == 1 else close
+    # Position held during each bar is the one taken at the previous close
+    held = np.vstack([np.zeros((1, target.shape[1])), target[:-1]])
+    bar_returns = np.zeros(close.shape)
+    bar_returns[1:] = close[1:] / close[:-1] - 1
+    bar_returns = np.nan_to_num(bar_returns, nan=0.0, posinf=0.0, neginf=0.0)
+    turnover = np.abs(np.diff(held, axis=0, prepend=0.0))
+    returns = held * bar_returns - turnover * np.asarray(cost_bps) / 1e4
+
+    log_returns = np.log1p(returns)
+    equity = np.exp(np.cumsum(log_returns, axis=0))
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1
+    volatility = (returns.std(axis=0, ddof=1) * np.sqrt(periods_per_year) if len(close) > 1
+                  else np.zeros(target.shape[1]))
+    mean = returns.mean(axis=0) * periods_per_year
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(volatility > 0, mean / volatility, np.nan)
+    trades, hit_rate = _trade_stats(held, log_returns)
+    metrics = {
+        'total_return': equity[-1] - 1,
+        'cagr': equity[-1] ** (1 / np.asarray(years)) - 1,
+        'volatility': volatility,
+        'sharpe': sharpe,
+        'max_drawdown': drawdown.min(axis=0),
+        'exposure': (held != 0).mean(axis=0),
+        'trades': trades,
+        'hit_rate': hit_rate,
+    }
+    return metrics, equity
+
+
+def backtest(df, indicator_params, allow_short=False, cost_bps=0.0, periods_per_year=TRADING_DAYS):
+    """
+    Backtests every enabled signal rule over the whole of df, plus buy & hold
+    (which pays no costs); pass periods_per_year for bars other than daily.
+    Everything runs on (bars x rules) arrays. Returns
+    (summary DataFrame with one row per rule and the METRICS columns, equity
+    DataFrame of growth of 1).
+    """
+    close = df['Close'].to_numpy(dtype=np.float64)
+    rules = rule_inputs(df, indicator_params)
+    names = list(rules) + [BUY_AND_HOLD]
+    if len(close) == 0:
+        return pd.DataFrame(columns=METRICS), pd.DataFrame(columns=names)
+    target = np.column_stack([positions(rule, inputs, allow_short) for rule, inputs in rules.values()]
+                             + [np.ones(len(close))])
+    metrics, equity = evaluate(close, target, years_of(df.index, len(close), periods_per_year),
+                               [cost_bps] * len(rules) + [0.0], periods_per_year)
+    summary = pd.DataFrame(metrics, index=pd.Index(names, name='Rule'))
+    return summary, pd.DataFrame(equity, index=df.index, columns=names)
+
+
+if __name__ == "__main__":
+    import time
+
+    # 50 years of synthetic daily bars with every rule enabled
+    rng = np.random.default_rng(0)
+    bars = 50 * TRADING_DAYS
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, bars)))
+    spread = close * rng.uniform(0.001, 0.02, bars)
+    df = pd.DataFrame({'Open': close, 'High': close + spread, 'Low': close - spread, 'Close': close,
+                       'Volume': rng.integers(1e5, 1e7, bars)},
+                      index=pd.bdate_range('1975-01-01', periods=bars))
+    params = {
+        'sma_flag': True, 'sma_periods': 20, 'bb_flag': True, 'bb_periods': 20, 'bb_std': 2,
+        'rsi_flag': True, 'rsi_periods': 14, 'rsi_upper': 70, 'rsi_lower': 30,
+        'macd_flag': True, 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9,
+        'atr_flag': False, 'atr_period': 14, 'obv_flag': False,
+        'stoch_flag': True, 'stoch_k': 14, 'stoch_d': 3,
+    }
+
+    for label, cache_note in (("cold", "indicators computed"), ("warm", "indicators cached")):
+        start = time.perf_counter()
+        summary, equity = backtest(df, params, cost_bps=5)
+        print(f"{label}: {bars} bars x {len(summary)} rules in {(time.perf_counter() - start) * 1e3:.1f} ms "
+              f"({cache_note})")
+    timings = []
+    for _ in range(20):
+        start = time.perf_counter()
+        backtest(df, params, allow_short=True, cost_bps=5)
+        timings.append(time.perf_counter() - start)
+    print(f"warm median over 20 runs: {np.median(timings) * 1e3:.1f} ms\n")
+    with pd.option_context('display.width', 120, 'display.float_format', '{:.3f}'.format):
+        print(summary)
@@ -0,0 +1,121 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from price_store import get_price_store, has_sessions
+from schema import drop_missing_bars, normalize_schema, split_tickers
+
+
+def yfinance_batch_fetcher(symbols, start, end):
+    """Downloads OHLCV bars for several symbols in one request; returns {symbol: DataFrame}."""
+    import yfinance as yf
+    from upstream import get_provider
+
+    yahoo = get_provider("yahoo")
+
+    def download():
+        data = yf.download(symbols, start, end, threads=False, progress=False, session=yahoo.session)
+        # yf.download logs failures and returns an empty frame. Nothing at all for a range
+        # with sessions means the request failed (usually throttling), so let the provider retry
+        if data.empty and has_sessions(start, end):
+            raise ConnectionError(f"Yahoo returned no bars for {len(symbols)} symbols from {pd.Timestamp(start):%Y-%m-%d}")
+        return data
+
+    # Shares the Yahoo rate limit and its retries with the chart and the agents
+    data = normalize_schema(yahoo.call(download))
+    if data.empty:
+        return {}
+    if not isinstance(data.columns, pd.MultiIndex):
+        return {symbols[0]: drop_missing_bars(data)}
+    return split_tickers(data)
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def load_bulk(tickers, start, end, fetcher=None, store=None, batch_size=50, max_workers=4):
+    """
+    Loads daily bars for many tickers at once.
+    Only the date ranges each ticker is missing from the price store are downloaded:
+    tickers missing the same range are grouped into batches and fetched on a bounded
+    thread pool, and every fetched range is merged into the store. Retrying is left
+    to the fetcher (the Yahoo provider's retries for the default one).
+    Returns (panel, failures) where panel has (ticker, field) MultiIndex columns and
+    failures maps each ticker that could not be loaded to its error message.
+    """
+    fetcher = fetcher or yfinance_batch_fetcher
+    store = store if store is not None else get_price_store()
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+
+    # Usually one gap shared by every ticker: the bars since the last load
+    by_gap = defaultdict(list)
+    for ticker in dict.fromkeys(tickers):
+        for gap in store.missing(ticker, start, end):
+            by_gap[tuple(gap)].append(ticker)
+
+    fetched = defaultdict(list)
+    failures = {}
+    failed = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(fetcher, batch, gap_start, gap_end): (gap_start, gap_end, batch)
+            for (gap_start, gap_end), gap_tickers in by_gap.items()
+            for batch in _chunks(gap_tickers, batch_size)
+        }
+        for future in as_completed(futures):
+            gap_start, gap_end, batch = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures.update({ticker: str(e) for ticker in batch})
+                failed.update(batch)
+                continue
+            for ticker in batch:
+                frame = result.get(ticker)
+                if frame is not None:
+                    frame = frame.loc[(frame.index >= gap_start) & (frame.index < gap_end)]
+                if (frame is None or frame.empty) and has_sessions(gap_start, gap_end):
+                    # No bars for a range that had sessions: a failed download, fetched
+                    # again on the next load. Empty weekends and holidays are stored as covered.
+                    failures[ticker] = "No data returned"
+                    failed.add(ticker)
+                    continue
+                frame = frame if frame is not None else pd.DataFrame()
+                fetched[ticker].append(frame)
+                try:
+                    store.put(ticker, frame, gap_start, gap_end)
+                except OSError as e:
+                    failures[ticker] = f"Loaded but not stored: {e}"
+
+    frames = {}
+    for ticker in dict.fromkeys(tickers):
+        if ticker in failed:
+            continue
+        pieces = [store.read(ticker)] + fetched[ticker]
+        pieces = [piece for piece in pieces if not piece.empty]
+        if not pieces:
+            failures[ticker] = "No data returned"
+            continue
+        data = pd.concat(pieces)
+        data = data[~data.index.duplicated(keep="last")].sort_index()
+        data = data.loc[(data.index >= start) & (data.index < end)]
+        if data.empty:
+            failures[ticker] = "No data returned"
+            continue
+        frames[ticker] = data
+
+    ordered = list(frames)
+    if not ordered:
+        return pd.DataFrame(), failures
+    panel = pd.concat([frames[t] for t in ordered], axis=1, keys=ordered, names=["Ticker", "Field"])
+    panel = panel.sort_index()
+    panel.index.name = "Date"
+    return panel, failures
+
+
+def panel_to_long(panel):
+    """Converts a (ticker, field) panel into long format with Date and Ticker columns."""
+    return panel.stack(level="Ticker", future_stack=True).dropna(how="all").reset_index()
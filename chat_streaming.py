@@ -0,0 +1,162 @@
+import time
+
+# Seconds between placeholder re-renders while a response streams in; markdown is
+# re-rendered at most this often however fast the chunks arrive
+RENDER_INTERVAL = 0.05
+CURSOR = "▌"
+
+
+def chunk_text(chunk):
+    """
+    Returns the text carried by one item of a streamed agent or team run, or ''.
+    agno streams events whose `event` names the kind (RunResponseContent,
+    TeamRunResponseContent, ToolCallStarted, RunResponseCompleted, ...); only the
+    content events hold new text, the completed events repeat the whole answer.
+    """
+    if isinstance(chunk, str):
+        return chunk
+    event = getattr(chunk, "event", None)
+    if event is not None and "Content" not in str(event):
+        return ""
+    content = getattr(chunk, "content", None)
+    return content if isinstance(content, str) else ""
+
+
+def render_stream(chunks, placeholder, interval=RENDER_INTERVAL, clock=time.perf_counter):
+    """
+    Writes a streamed response into a Streamlit placeholder as it arrives and
+    returns (full text, metrics). The placeholder is re-rendered when at least
+    `interval` seconds have passed since the last render, so the number of renders
+    depends on the response time rather than its length. metrics holds
+    ttft_s (time to the first text), total_s, chunks, chars and renders.
+    """
+    start = clock()
+    parts = []
+    first = None
+    last_render = start
+    count = 0
+    renders = 0
+    for chunk in chunks:
+        count += 1
+        text = chunk_text(chunk)
+        if not text:
+            continue
+        parts.append(text)
+        now = clock()
+        if first is None:
+            first = now
+        # Show the first text at once, then at most once per interval
+        if renders == 0 or now - last_render >= interval:
+            placeholder.markdown("".join(parts) + CURSOR)
+            last_render = now
+            renders += 1
+
+    full_response = "".join(parts)
+    placeholder.markdown(full_response)
+    end = clock()
+    metrics = {
+        "ttft_s": (first if first is not None else end) - start,
+        "total_s": end - start,
+        "chunks": count,
+        "chars": len(full_response),
+        "renders": renders + 1,
+    }
+    return full_response, metrics
+
+
+def format_metrics(metrics):
+    """
+    One-line summary of render_stream metrics for a caption. A 'queue_s' entry is
+    the time the run waited for a worker; a 'cached' entry (question, similarity,
+    age_s) marks an answer reused from the response cache.
+    """
+    summary = (f"First token {metrics['ttft_s']:.2f} s · total {metrics['total_s']:.2f} s · "
+               f"{metrics['chars']:,} characters")
+    if metrics.get("queue_s", 0) >= 0.05:
+        summary += f" · queued {metrics['queue_s']:.2f} s"
+    cached = metrics.get("cached")
+    if cached:
+        summary += (f" · ⚡ from cache: similar to “{cached['question']}” "
+                    f"({cached['similarity']:.0%} match, {cached['age_s'] / 60:.0f} min old)")
+    return summary
+
+
+class _FakeChunk:
+    """Stand-in for an agno streamed content event."""
+
+    event = "TeamRunResponseContent"
+
+    def __init__(self, content):
+        self.content = content
+
+
+class _FakeResponse:
+    """Stand-in for the response object returned by a non-streaming run."""
+
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeTeam:
+    """
+    Local stand-in for finance_team that needs no API keys: run() answers every
+    message with `text` after `first_token_delay` seconds, then streams it in
+    `chunk_size`-character chunks `token_delay` seconds apart. Used to measure
+    time-to-first-token and total latency of the chat page.
+    """
+
+    def __init__(self, text=None, first_token_delay=0.5, token_delay=0.01, chunk_size=4):
+        self.text = text or "\n".join(
+            f"- **Point {i}:** revenue grew {i}% while margins held steady." for i in range(1, 201)
+        )
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.chunk_size = chunk_size
+
+    def _chunks(self):
+        time.sleep(self.first_token_delay)
+        for i in range(0, len(self.text), self.chunk_size):
+            if i:
+                time.sleep(self.token_delay)
+            yield _FakeChunk(self.text[i:i + self.chunk_size])
+
+    def run(self, message, stream=False, **kwargs):
+        if stream:
+            return self._chunks()
+        time.sleep(self.first_token_delay + self.token_delay * (len(self.text) // self.chunk_size))
+        return _FakeResponse(self.text)
+
+
+if __name__ == "__main__":
+    class CountingPlaceholder:
+        def __init__(self):
+            self.renders = 0
+            self.rendered_chars = 0
+
+        def markdown(self, text):
+            self.renders += 1
+            self.rendered_chars += len(text)
+
+    team = FakeTeam(first_token_delay=0.5, token_delay=0.001, chunk_size=4)
+    print(f"Fake answer: {len(team.text):,} characters in {len(team.text) // team.chunk_size:,} chunks")
+
+    # Previous page behaviour: wait for the whole answer, then replay it 5 characters
+    # at a time with a 10 ms sleep per step
+    placeholder = CountingPlaceholder()
+    start = time.perf_counter()
+    full_response = team.run(message="test").content
+    first = None
+    for i in range(0, len(full_response), 5):
+        placeholder.markdown(full_response[:i + 5] + CURSOR)
+        first = first or time.perf_counter()
+        time.sleep(0.01)
+    placeholder.markdown(full_response)
+    total = time.perf_counter() - start
+    print(f"simulated typewriter  first text {first - start:6.2f} s  total {total:6.2f} s  "
+          f"renders {placeholder.renders:5,}  characters rendered {placeholder.rendered_chars:,}")
+
+    placeholder = CountingPlaceholder()
+    full_response, metrics = render_stream(team.run(message="test", stream=True), placeholder)
+    assert full_response == team.text
+    print(f"native streaming      first text {metrics['ttft_s']:6.2f} s  total {metrics['total_s']:6.2f} s  "
+          f"renders {placeholder.renders:5,}  characters rendered {placeholder.rendered_chars:,}")
@@ -0,0 +1,41 @@
+# Puts the repository root on sys.path so tests import the app modules directly
+import numpy as np
+import pandas as pd
+import pytest
+
+# One of every indicator, with the periods the dashboard uses by default
+INDICATOR_REQUESTS = [
+    ('sma', {'period': 20}),
+    ('bollinger_bands', {'period': 20, 'std_dev': 2}),
+    ('rsi', {'period': 14}),
+    ('macd', {'fast_period': 12, 'slow_period': 26, 'signal_period': 9}),
+    ('atr', {'period': 14}),
+    'obv',
+    ('stochastic', {'k_period': 14, 'd_period': 3}),
+]
+
+
+def make_bars(n=3000, seed=0, gap=True):
+    """Random-walk OHLCV bars on business days, optionally with a few bars missing prices as around a trading halt."""
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.standard_normal(n).cumsum()
+    df = pd.DataFrame({
+        'Open': close,
+        'High': close + rng.random(n),
+        'Low': close - rng.random(n),
+        'Close': close,
+        'Volume': rng.integers(1, 1_000_000, n),
+    }, index=pd.bdate_range('2000-01-03', periods=n))
+    if gap:
+        df.iloc[n // 3:n // 3 + 3, :4] = np.nan
+    return df
+
+
+@pytest.fixture
+def indicator_requests():
+    return list(INDICATOR_REQUESTS)
+
+
+@pytest.fixture
+def random_bars():
+    return make_bars
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+
+class RollingCovariance:
+    """
+    Rolling covariance, correlation and beta matrices of many return series over
+    a fixed window. Each update adds the new day's cross-products to running sums
+    and subtracts those of the day leaving the window, so a day costs O(N^2)
+    instead of recomputing the window. Pairs are evaluated over the days both
+    returns exist (like pandas), and a pair is NaN until it has min_periods of
+    them. dtype=np.float32 halves the memory of the N x N sums; they are rebuilt
+    exactly from the window every `refresh` updates so rounding never accumulates.
+    """
+
+    def __init__(self, tickers, window, dtype=np.float64, min_periods=None, refresh=None):
+        self.tickers = list(tickers)
+        self.window = window
+        self.dtype = np.dtype(dtype)
+        self.min_periods = min_periods or window
+        self.refresh = refresh or window
+        n = len(self.tickers)
+        # Ring buffer of the returns in the window, NaN for missing
+        self.buffer = np.full((window, n), np.nan, dtype=self.dtype)
+        self.rows = 0
+        self.updates_since_refresh = 0
+        self.count = np.zeros((n, n), dtype=np.int32)
+        self.sum_x = np.zeros((n, n), dtype=self.dtype)
+        self.sum_xx = np.zeros((n, n), dtype=self.dtype)
+        self.sum_xy = np.zeros((n, n), dtype=self.dtype)
+
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.buffer, self.count, self.sum_x, self.sum_xx, self.sum_xy))
+
+    def _apply(self, returns, sign):
+        # sum_x[i, j] sums x_i over the days where x_j exists too, and so on
+        valid = ~np.isnan(returns)
+        x = np.where(valid, returns, 0).astype(self.dtype)
+        mask = valid.astype(self.dtype)
+        self.count += sign * np.outer(valid, valid).astype(np.int32)
+        self.sum_x += sign * np.outer(x, mask)
+        self.sum_xx += sign * np.outer(x * x, mask)
+        self.sum_xy += sign * np.outer(x, x)
+
+    def _rebuild(self):
+        """Recomputes every sum from the returns in the window with matrix products."""
+        window = self.buffer[:min(self.rows, self.window)]
+        valid = ~np.isnan(window)
+        x = np.where(valid, window, 0).astype(self.dtype)
+        mask = valid.astype(self.dtype)
+        self.count = (valid.T.astype(np.int32) @ valid.astype(np.int32))
+        self.sum_x = x.T @ mask
+        self.sum_xx = (x * x).T @ mask
+        self.sum_xy = x.T @ x
+        self.updates_since_refresh = 0
+
+    def update(self, returns):
+        """Adds one day of returns (one value per ticker, NaN when missing), dropping the oldest day."""
+        returns = np.asarray(returns, dtype=self.dtype)
+        slot = self.rows % self.window
+        if self.rows >= self.window:
+            self._apply(self.buffer[slot], -1)
+        self.buffer[slot] = returns
+        self.rows += 1
+        self.updates_since_refresh += 1
+        if self.updates_since_refresh >= self.refresh:
+            self._rebuild()
+        else:
+            self._apply(returns, 1)
+
+    def warm_up(self, returns):
+        """Loads the last `window` rows of a (day x ticker) returns array or DataFrame in one step."""
+        returns = np.asarray(returns, dtype=self.dtype)[-self.window:]
+        self.buffer[:len(returns)] = returns
+        self.rows = len(returns)
+        # Rows are oldest first, so the next update() overwrites the oldest day
+        self._rebuild()
+        return self
+
+    def cov(self):
+        """Sample covariance matrix over the window (ddof=1)."""
+        count = self.count.astype(self.dtype)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = (self.sum_xy - self.sum_x * self.sum_x.T / count) / (count - 1)
+        return np.where(self.count >= max(self.min_periods, 2), cov, np.nan)
+
+    def corr(self):
+        """Correlation matrix over the window, each pair over the days both returns exist."""
+        count = self.count.astype(self.dtype)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = self.sum_xy - self.sum_x * self.sum_x.T / count
+            var_x = self.sum_xx - self.sum_x ** 2 / count
+            corr = cov / np.sqrt(var_x * var_x.T)
+        return np.where(self.count >= max(self.min_periods, 2), np.clip(corr, -1, 1), np.nan)
+
+    def beta(self):
+        """beta[i, j]: the beta of ticker i's returns on ticker j's (cov(i, j) / var(j))."""
+        count = self.count.astype(self.dtype)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = self.sum_xy - self.sum_x * self.sum_x.T / count
+            var_y = self.sum_xx.T - self.sum_x.T ** 2 / count
+            beta = cov / var_y
+        return np.where(self.count >= max(self.min_periods, 2), beta, np.nan)
+
+    def frame(self, matrix):
+        """Labels an N x N matrix with the tickers."""
+        return pd.DataFrame(matrix, index=self.tickers, columns=self.tickers)
+
+
+def top_pairs(corr, tickers, n=20, most=True):
+    """
+    The n most (or, with most=False, least) correlated distinct pairs of a
+    correlation matrix, as a DataFrame with First, Second and Correlation.
+    """
+    rows, cols = np.triu_indices(len(tickers), k=1)
+    values = np.asarray(corr)[rows, cols]
+    keep = np.flatnonzero(~np.isnan(values))
+    order = keep[np.argsort(values[keep], kind='stable')]
+    best = order[::-1][:n] if most else order[:n]
+    tickers = np.asarray(tickers)
+    return pd.DataFrame({'First': tickers[rows[best]], 'Second': tickers[cols[best]], 'Correlation': values[best]})
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Per-day update of the full correlation matrix, incremental vs pandas.")
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--window', type=int, default=60)
+    # pandas' rolling().corr() loops over every pair: ~100 s per day at 500 tickers
+    parser.add_argument('--naive-tickers', type=int, default=100)
+    args = parser.parse_args()
+
+    # S&P 500-sized universe of daily returns driven by one market factor; some
+    # tickers list part-way through and a few bars are missing
+    rng = np.random.default_rng(0)
+    tickers, days, window = [f"T{i:03}" for i in range(args.tickers)], 300, args.window
+    market = rng.normal(0.0003, 0.01, days)
+    returns = market[:, None] * rng.uniform(0.5, 1.5, len(tickers)) + rng.normal(0, 0.015, (days, len(tickers)))
+    returns[:100, ::25] = np.nan
+    returns[rng.random(returns.shape) < 0.002] = np.nan
+    frame = pd.DataFrame(returns, columns=tickers)
+    start_day = days - 10
+
+    def incremental(columns, dtype):
+        # Warm up on earlier days, then time the daily updates up to the last day
+        tracker = RollingCovariance(tickers[:columns], window, dtype=dtype).warm_up(returns[:start_day, :columns])
+        elapsed = []
+        for t in range(start_day, days):
+            begin = time.perf_counter()
+            tracker.update(returns[t, :columns])
+            corr = tracker.corr()
+            elapsed.append(time.perf_counter() - begin)
+        return np.median(elapsed), tracker.nbytes(), corr
+
+    def timed(func):
+        begin = time.perf_counter()
+        result = func()
+        return time.perf_counter() - begin, result
+
+    print(f"{window}-day window, one new day, full correlation matrix\n")
+    print(f"{'method':<30} {'tickers':>7} {'per day':>11} {'state':>8} {'max |error|':>12}")
+    for columns in dict.fromkeys((min(args.naive_tickers, len(tickers)), len(tickers))):
+        window_frame = frame.iloc[-window:, :columns]
+        if columns <= args.naive_tickers:
+            # The naive way: rerun pandas' rolling correlation for the newest day
+            seconds, expected = timed(lambda: window_frame.rolling(window).corr().iloc[-columns:].to_numpy())
+            print(f"{'pandas rolling().corr()':<30} {columns:>7} {seconds * 1e3:>8.1f} ms")
+        seconds, expected = timed(lambda: window_frame.corr(min_periods=window).to_numpy())
+        print(f"{'pandas corr() of the window':<30} {columns:>7} {seconds * 1e3:>8.1f} ms")
+        for label, dtype in (("float64", np.float64), ("float32", np.float32)):
+            seconds, nbytes, corr = incremental(columns, dtype)
+            print(f"{'incremental ' + label:<30} {columns:>7} {seconds * 1e3:>8.1f} ms "
+                  f"{nbytes / 2**20:>5.1f} MB {np.nanmax(np.abs(corr - expected)):>12.1e}")
+    full = RollingCovariance(tickers, window).warm_up(returns)
+    print(f"\nMost correlated pairs:\n{top_pairs(full.corr(), tickers, n=5)}")
@@ -1,68 +1,77 @@
-import yfinance as yf
+import io
 import streamlit as st
 import pandas as pd
+from bulk_loader import load_bulk
+from price_store import get_price_store
+from resampling import resample_ohlcv, source_intervals
+from upstream import get_provider
+
+SP500_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+
+def _fetch_page(url):
+    """Downloads a page over the shared Wikipedia session, under its rate limit."""
+    wikipedia = get_provider("wikipedia")
+
+    def get():
+        response = wikipedia.session.get(url, timeout=30, headers={"User-Agent": "Fintelligence/1.0"})
+        response.raise_for_status()
+        return response.text
+
+    return wikipedia.call(get)
 
 @st.cache_data
 def get_sp500_components():
     """Fetches the list of S&P 500 companies from Wikipedia."""
-    df = pd.read_html("https://en.wikipedia.org/wiki/List_of_S%26P_500_companies")
+    df = pd.read_html(io.StringIO(_fetch_page(SP500_URL)))
     df = df[0]
     tickers = df["Symbol"].to_list()
     tickers_companies_dict = dict(zip(df["Symbol"], df["Security"]))
     return tickers, tickers_companies_dict
 
-@st.cache_data
-def load_data(symbol, start, end):
+@st.cache_data(ttl=900, show_spinner=False)
+def load_universe(tickers, start, end):
     """
-    Loads historical stock data for a given symbol and date range.
-    Handles MultiIndex columns and standardizes column names.
+    Loads a tuple of tickers as one (date x (ticker, field)) panel through the
+    local price store, downloading only the days it is missing. Returns
+    (panel, failures); the pages clear it from their "Refresh data" buttons.
     """
-    data = yf.download(symbol, start, end)
-
-    # Fix for MultiIndex columns - flatten the columns if they are MultiIndex
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = [' '.join(col).strip() for col in data.columns.values]
-
-    # Ensure standard column names (Open, High, Low, Close, Volume)
-    # Map common variations to standard names
-    standard_cols = {
-        'Open': 'Open',
-        'High': 'High',
-        'Low': 'Low',
-        'Close': 'Close',
-        'Volume': 'Volume',
-        'Adj Close': 'Adj Close'
-    }
-
-    # Create a mapping for the actual columns in the dataframe
-    actual_mapping = {}
-
-    # First, try to find exact matches
-    for std_col in standard_cols:
-        if std_col in data.columns:
-            actual_mapping[std_col] = std_col
-
-    # If we don't have all standard columns, look for ticker-specific columns
-    # (like "Open MMM", "Close MMM", etc.)
-    if len(actual_mapping) < len(standard_cols):
-        for col in data.columns:
-            for std_col in standard_cols:
-                # Check if column starts with standard name (e.g., "Open MMM" starts with "Open")
-                if col.startswith(std_col + " ") or col == std_col:
-                    actual_mapping[col] = std_col
-                # Also check lowercase variations
-                elif col.lower().startswith(std_col.lower() + " ") or col.lower() == std_col.lower():
-                    actual_mapping[col] = std_col
+    return load_bulk(list(tickers), start, end)
 
-    # Rename columns if needed
-    if actual_mapping:
-        data = data.rename(columns=actual_mapping)
+@st.cache_data
+def load_data(symbol, start, end, interval="1d"):
+    """
+    Loads historical stock data for a given symbol, date range and bar interval
+    (1m, 5m, 1h or 1d). Bars are served from the local price store; only missing
+    date ranges are downloaded.
+    """
+    data = get_price_store(interval).get(symbol, start, end)
 
     # Debug info
     st.sidebar.write("Available columns:", ", ".join(data.columns))
 
     return data
 
+def pick_interval(symbol, start, end, timeframe):
+    """
+    Chooses the native interval to build timeframe from: the finest one already
+    stored for the whole window, else the coarsest one that can build it (the
+    smallest download, and the longest history Yahoo serves).
+    """
+    intervals = source_intervals(timeframe)
+    for interval in intervals:
+        if get_price_store(interval).covers(symbol, start, end):
+            return interval
+    return intervals[-1]
+
+def load_timeframe(symbol, start, end, timeframe="1d"):
+    """
+    Loads bars at any timeframe (e.g. 15m, 4h, 1wk, 1mo) by resampling the finest
+    stored data locally, so switching timeframes does not download again.
+    """
+    interval = pick_interval(symbol, start, end, timeframe)
+    data = load_data(symbol, start, end, interval)
+    return data if interval == timeframe else resample_ohlcv(data, timeframe)
+
 @st.cache_data
 def convert_df_to_csv(df):
     """Converts a DataFrame to a CSV file for download."""
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+# Default number of points per trace sent to the browser; a chart is rarely more
+# than a couple of thousand pixels wide, so more points than this are not visible
+DEFAULT_MAX_POINTS = 2000
+
+# Columns of an OHLCV frame and how each one is combined over a bucket of rows
+OHLC_AGGREGATIONS = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum',
+}
+
+
+def _positions(index):
+    """Numeric x coordinates of an index: nanoseconds for dates, else row numbers."""
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    return np.arange(len(index), dtype=np.float64)
+
+
+def _bucket_ids(n, n_buckets):
+    """Assigns each of n rows to one of n_buckets contiguous, equally sized buckets."""
+    size = -(-n // n_buckets)
+    return np.arange(n) // size
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Positions of the minimum and maximum of y in each of n_buckets equal row
+    buckets, plus the first and last valid points. NaNs are skipped.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    size = -(-n // n_buckets)
+    pad = (-n) % size
+    valid = ~np.isnan(y)
+    low = np.concatenate([np.where(valid, y, np.inf), np.full(pad, np.inf)]).reshape(-1, size)
+    high = np.concatenate([np.where(valid, y, -np.inf), np.full(pad, -np.inf)]).reshape(-1, size)
+    starts = np.arange(len(low)) * size
+    candidates = np.concatenate([starts + low.argmin(axis=1), starts + high.argmax(axis=1)])
+    candidates = candidates[candidates < n]
+    candidates = candidates[valid[candidates]]
+    ends = np.flatnonzero(valid)[[0, -1]] if valid.any() else np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate([candidates, ends]))
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: positions of `threshold` points of the line
+    (x, y) that best keep its visual shape. The first and last valid points are
+    always kept and NaN points are skipped.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if threshold >= n:
+        return valid
+    if threshold < 3:
+        raise ValueError("threshold must be at least 3")
+
+    xs, ys = x[valid], y[valid]
+    # Interior points 1..n-2 are split into threshold-2 buckets; the last point
+    # closes the list so every bucket has a following bucket to average
+    edges = np.append(np.linspace(1, n - 1, threshold - 1).astype(np.int64), n)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(xs, edges[:-1]) / counts
+    avg_y = np.add.reduceat(ys, edges[:-1]) / counts
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        ax, ay = xs[a], ys[a]
+        # Twice the area of the triangle (a, candidate, next bucket average)
+        areas = np.abs((ax - avg_x[i + 1]) * (ys[start:end] - ay)
+                       - (ax - xs[start:end]) * (avg_y[i + 1] - ay))
+        a = start + int(areas.argmax())
+        selected[i + 1] = a
+    return valid[selected]
+
+
+def downsample_line(x, y, max_points=DEFAULT_MAX_POINTS):
+    """
+    Positions of at most max_points points of the line (x, y). Long series are first
+    reduced to the per-bucket minima and maxima, which keeps every spike, and LTTB
+    then picks the final points from those candidates (MinMaxLTTB).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= max_points:
+        return np.flatnonzero(~np.isnan(y))
+    candidates = np.arange(len(y))
+    if len(y) > 4 * max_points:
+        candidates = minmax_indices(y, 2 * max_points)
+    x = np.asarray(x, dtype=np.float64)
+    return candidates[lttb_indices(x[candidates], y[candidates], max_points)]
+
+
+def downsample_series(series, max_points=DEFAULT_MAX_POINTS):
+    """Returns the LTTB-selected points of a Series; max_points=None keeps every point."""
+    if max_points is None or len(series) <= max_points:
+        return series
+    keep = downsample_line(_positions(series.index), series.to_numpy(dtype=np.float64), max_points)
+    return series.iloc[keep]
+
+
+def aggregate_ohlc(df, max_points=DEFAULT_MAX_POINTS):
+    """
+    Merges runs of consecutive bars so at most max_points remain: each bucket keeps
+    the first Open, highest High, lowest Low, last Close and total Volume, and is
+    stamped with the date of its first bar. Other columns are dropped.
+    """
+    aggregations = {col: how for col, how in OHLC_AGGREGATIONS.items() if col in df.columns}
+    if max_points is None or len(df) <= max_points or not aggregations:
+        return df
+    buckets = _bucket_ids(len(df), max_points)
+    bars = df[list(aggregations)].groupby(buckets).agg(aggregations)
+    bars.index = df.index[np.flatnonzero(np.diff(buckets, prepend=-1))]
+    return bars
+
+
+def aggregate_extreme(series, max_points=DEFAULT_MAX_POINTS):
+    """
+    Keeps the value furthest from zero in each run of consecutive rows, so bar
+    charts such as the MACD histogram keep their peaks. Stamped like aggregate_ohlc.
+    """
+    n = len(series)
+    if max_points is None or n <= max_points:
+        return series
+    values = series.to_numpy(dtype=np.float64)
+    size = -(-n // max_points)
+    pad = (-n) % size
+    magnitude = np.concatenate([np.nan_to_num(np.abs(values), nan=-1.0), np.full(pad, -1.0)])
+    starts = np.arange(0, n, size)
+    keep = starts + magnitude.reshape(-1, size).argmax(axis=1)
+    keep = np.minimum(keep, n - 1)
+    return pd.Series(values[keep], index=series.index[starts], name=series.name)
+
+
+def figure_size(fig):
+    """Size in bytes of the JSON that Plotly sends to the browser for fig."""
+    return len(fig.to_json().encode('utf-8'))
+
+
+if __name__ == "__main__":
+    import logging
+    import time
+    from plotting import plot_stock_chart
+
+    # plot_stock_chart renders through Streamlit; outside `streamlit run` those calls are no-ops
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    # Three years of one-minute bars
+    rng = np.random.default_rng(0)
+    n = 3 * 252 * 390
+    close = 100 + rng.standard_normal(n).cumsum() * 0.05
+    df = pd.DataFrame({
+        'Open': close + rng.standard_normal(n) * 0.01,
+        'High': close + rng.random(n) * 0.05,
+        'Low': close - rng.random(n) * 0.05,
+        'Close': close,
+        'Volume': rng.integers(100, 10_000, n),
+    }, index=pd.date_range('2022-01-03 09:30', periods=n, freq='min'))
+
+    indicator_params = {
+        "volume_flag": True, "sma_flag": True, "sma_periods": 20,
+        "bb_flag": True, "bb_periods": 20, "bb_std": 2,
+        "rsi_flag": True, "rsi_periods": 14, "rsi_upper": 70, "rsi_lower": 30,
+        "macd_flag": True, "macd_fast": 12, "macd_slow": 26, "macd_signal": 9,
+        "atr_flag": True, "atr_period": 14, "obv_flag": True,
+        "stoch_flag": True, "stoch_k": 14, "stoch_d": 3,
+    }
+    for max_points in (None, 5000, DEFAULT_MAX_POINTS):
+        start = time.perf_counter()
+        fig = plot_stock_chart(df.copy(), 'TEST', {'TEST': 'Test Corp'}, indicator_params, max_points=max_points)
+        elapsed = time.perf_counter() - start
+        points = sum(len(trace.x) for trace in fig.data)
+        print(f"max_points={str(max_points):>5}  {n:,} rows  {points:>10,} points  "
+              f"figure {figure_size(fig) / 2**20:7.2f} MiB  built in {elapsed:.2f} s")
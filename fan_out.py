@@ -0,0 +1,111 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Independent branches run at the same time for one query, at most this many at once
+DEFAULT_MAX_CONCURRENCY = 3
+
+
+class Branch:
+    """
+    One independent sub-task of a fan-out query. make_agent builds a fresh agent
+    for every query, since agents keep per-run state and are not safe to share
+    between threads; task is formatted with the user's question.
+    """
+
+    def __init__(self, name, make_agent, task):
+        self.name = name
+        self.make_agent = make_agent
+        self.task = task
+
+
+class BranchResult:
+    def __init__(self, name, content=None, error=None, seconds=0.0):
+        self.name = name
+        self.content = content
+        self.error = error
+        self.seconds = seconds
+
+
+def _content(response):
+    if hasattr(response, 'content'):
+        return response.content
+    return response if isinstance(response, str) else str(response)
+
+
+def _run_branch(branch, question):
+    start = time.perf_counter()
+    try:
+        response = branch.make_agent().run(message=branch.task.format(question=question))
+        return BranchResult(branch.name, content=_content(response), seconds=time.perf_counter() - start)
+    except Exception as e:
+        return BranchResult(branch.name, error=e, seconds=time.perf_counter() - start)
+
+
+def synthesis_prompt(question, results):
+    """The synthesis step's input: the question followed by every branch's findings."""
+    sections = []
+    for result in results:
+        findings = result.content if result.error is None else f"(unavailable: {result.error})"
+        sections.append(f"## {result.name}\n{findings}")
+    return (f"Question: {question}\n\n"
+            "Specialists researched the question in parallel. Their findings:\n\n"
+            + "\n\n".join(sections)
+            + "\n\nCombine these findings into a single answer to the question.")
+
+
+class FanOutTeam:
+    """
+    Runs every branch concurrently (at most max_concurrency per query) and has a
+    synthesis agent merge their findings, so latency is close to the slowest
+    branch plus the synthesis rather than the sum of all branches. run() takes the
+    same arguments as an agno Team, so the chat page can use either; with
+    stream=True the synthesis answer is streamed. A failed branch is reported to
+    the synthesis step instead of failing the whole query.
+    """
+
+    def __init__(self, branches, make_synthesizer, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.branches = branches
+        self.make_synthesizer = make_synthesizer
+        self.max_concurrency = max_concurrency
+
+    def run_branches(self, question):
+        """Returns a BranchResult per branch, in branch order."""
+        workers = max(1, min(self.max_concurrency, len(self.branches)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fan-out') as pool:
+            # Each branch runs in a copy of the caller's context, so spans recorded
+            # by span_profiler nest under the query that started them
+            futures = [pool.submit(contextvars.copy_context().run, _run_branch, branch, question)
+                       for branch in self.branches]
+            return [future.result() for future in futures]
+
+    def run(self, message, stream=False, **kwargs):
+        results = self.run_branches(message)
+        return self.make_synthesizer().run(message=synthesis_prompt(message, results), stream=stream, **kwargs)
+
+
+if __name__ == "__main__":
+    from chat_streaming import FakeTeam
+
+    # Local fake agents: the branches take 3.0, 2.0 and 4.0 s, the synthesis 1.5 s
+    def fake_agent(seconds, text):
+        return lambda: FakeTeam(text=text, first_token_delay=seconds, token_delay=0.0, chunk_size=len(text))
+
+    branches = [
+        Branch("Market data", fake_agent(3.0, "Price 100, up 2% on the week."), "Market data for: {question}"),
+        Branch("Fundamentals", fake_agent(2.0, "P/E 30, revenue +20% YoY."), "Fundamentals for: {question}"),
+        Branch("Web research", fake_agent(4.0, "Analysts raised targets."), "News for: {question}"),
+    ]
+    synthesizer = fake_agent(1.5, "Overall: constructive.")
+
+    for limit in (1, 2, 3):
+        team = FanOutTeam(branches, synthesizer, max_concurrency=limit)
+        start = time.perf_counter()
+        results = team.run_branches("How is NVDA doing?")
+        fanned = time.perf_counter() - start
+        answer = team.make_synthesizer().run(message=synthesis_prompt("How is NVDA doing?", results))
+        total = time.perf_counter() - start
+        branch_sum = sum(result.seconds for result in results)
+        print(f"max_concurrency={limit}  branches {fanned:4.1f} s (sum {branch_sum:4.1f} s, "
+              f"slowest {max(r.seconds for r in results):4.1f} s)  with synthesis {total:4.1f} s  "
+              f"-> {answer.content}")
@@ -1,93 +1,116 @@
-from agno.agent import Agent
+import functools
 import os
-import agentops
-from agno.models.google import Gemini
-from agno.tools.yfinance import YFinanceTools
-from agno.tools.serper import SerperTools
-from agno.team.team import Team
-from linkup import LinkupClient
+import threading
 from dotenv import load_dotenv
+from tool_cache import cache_tools
+from upstream import limit_tools
+from fan_out import Branch, FanOutTeam
+from span_profiler import instrument
 
 # Load environment variables
 load_dotenv()
 
+# agno, its tools and the Linkup client are imported inside the factories below,
+# so importing this module stays cheap wherever it happens
+
 AGENTOPS_API_KEY = os.getenv("AGENTOPS_API_KEY") 
-agentops.init(
-    api_key=AGENTOPS_API_KEY,
-    default_tags=['agno']
-)
+
+@functools.lru_cache(maxsize=None)
+def init_telemetry():
+    """Starts the agentops session once per process, when the first agent is built."""
+    import agentops
+    agentops.init(
+        api_key=AGENTOPS_API_KEY,
+        default_tags=['agno']
+    )
+
+def make_model():
+    """Builds the Gemini model for one agent or team."""
+    from agno.models.google import Gemini
+
+    init_telemetry()
+    return Gemini(id="gemini-2.5-flash-lite", api_key=os.getenv("GEMINI_API_KEY"))
+
 # Initialize the financial analyst agent with Linkup search capability
-financial_analyst = Agent(
-    name="Financial Analyst with Linkup Search",
-    role="Expert in financial analysis and market research using Linkup search",
-    model=Gemini(id="gemini-2.5-flash-lite", api_key=os.getenv("GEMINI_API_KEY")),
-    tools=[
-        # Stock market data and analysis
-        YFinanceTools(
-            stock_price=True,
-            company_info=True,
-            stock_fundamentals=True,
-            income_statements=True,
-            key_financial_ratios=True,
-            analyst_recommendations=True,
-            historical_prices=True,
-            company_news=True,
-            technical_indicators=True
-        ),
-        # Web search for latest information from trusted financial sources
-        LinkupClient(api_key=os.getenv("LINKUP_API_KEY"))
-    ],
-    instructions=[
-        # Core analysis approach
-        "You are a proactive and autonomous financial analyst providing specific stock recommendations and financial analysis.",
-        "When a stock symbol or company name is mentioned, immediately gather and analyze the following:",
-        "1. Current price and recent price action",
-        "2. Key financial metrics (P/E, P/S, growth rates, margins, etc.)",
-        "3. Recent news and market sentiment",
-        "4. Analyst ratings and price targets",
-        "5. Technical analysis indicators",
-        "6. Industry position and competitive advantages",
-        "7. Potential risks and challenges",
-        "\nThen provide a comprehensive analysis with clear buy/sell/hold recommendation.",
-        "\nFor general queries without specific stocks, analyze the overall market and provide 3-5 top stock picks with rationale.",
-        "\nUse the Linkup search tool to gather the latest information from these trusted financial domains:",
-        "- Market Data: finance.yahoo.com, google.com/finance, marketwatch.com, investing.com",
-        "- Financial News: bloomberg.com, reuters.com, cnbc.com, wsj.com, seekingalpha.com",
-        "- Research: morningstar.com, zacks.com, tipranks.com, fool.com, investorplace.com",
-        "- Technical Analysis: tradingview.com, finviz.com",
-        
-        # Response format
-        "Structure responses with clear, bold headings for each section.",
-        "Always include the following sections for stock analysis:",
-        "1. **Current Snapshot** (price, market cap, key stats)",
-        "2. **Fundamental Analysis** (financial health, growth, valuation)",
-        "3. **Technical Analysis** (price trends, support/resistance, indicators)",
-        "4. **Market Sentiment** (news, analyst ratings, insider activity)",
-        "5. **Investment Thesis** (bull/bear cases, risks, opportunities)",
-        "6. **Recommendation** (clear buy/sell/hold with price target and timeframe)",
-        "\nUse bullet points for clarity and include relevant metrics in tables when appropriate.",
-        
-        # Analysis guidelines
-        "For any stock query, automatically provide a complete analysis without asking for additional information.",
-        "When specific metrics or timeframes aren't mentioned, use these defaults:",
-        "- Timeframe: 1 year for price targets",
-        "- Risk tolerance: Moderate (balanced growth and stability)",
-        "- Investment horizon: Long-term (3-5 years) unless specified otherwise",
-        "\nFor general market queries, identify and analyze 3-5 top opportunities across different sectors.",
-        "Always include both quantitative metrics and qualitative analysis.",
-        "Highlight potential catalysts and risks for each recommendation.",
-        
-        # Risk disclosure
-        "Include a brief risk disclosure at the end of recommendations.",
-        "Note that all investments carry risk and past performance is not indicative of future results.",
-        
-        # Efficiency
-        "Be direct and avoid unnecessary disclaimers or hedging.",
-        "Prioritize actionable information over general advice.",
-        "Update recommendations based on the most current market data available.",
-        "When appropriate, provide alternative investment options or hedging strategies."
-    ]
-)
+def make_financial_analyst():
+    """Builds the financial analyst agent; every team run gets its own."""
+    from agno.agent import Agent
+    from agno.tools.yfinance import YFinanceTools
+    from linkup import LinkupClient
+
+    return instrument(Agent(
+        name="Financial Analyst with Linkup Search",
+        role="Expert in financial analysis and market research using Linkup search",
+        model=make_model(),
+        tools=[
+            # Stock market data and analysis; results are shared through the tool cache, and
+            # calls that miss it wait for the rate limit shared with the chart and screener
+            cache_tools(limit_tools(YFinanceTools(
+                stock_price=True,
+                company_info=True,
+                stock_fundamentals=True,
+                income_statements=True,
+                key_financial_ratios=True,
+                analyst_recommendations=True,
+                historical_prices=True,
+                company_news=True,
+                technical_indicators=True
+            ), 'yahoo')),
+            # Web search for latest information from trusted financial sources
+            cache_tools(limit_tools(LinkupClient(api_key=os.getenv("LINKUP_API_KEY")), 'linkup', methods=['search']),
+                        methods=['search'])
+        ],
+        instructions=[
+            # Core analysis approach
+            "You are a proactive and autonomous financial analyst providing specific stock recommendations and financial analysis.",
+            "When a stock symbol or company name is mentioned, immediately gather and analyze the following:",
+            "1. Current price and recent price action",
+            "2. Key financial metrics (P/E, P/S, growth rates, margins, etc.)",
+            "3. Recent news and market sentiment",
+            "4. Analyst ratings and price targets",
+            "5. Technical analysis indicators",
+            "6. Industry position and competitive advantages",
+            "7. Potential risks and challenges",
+            "\nThen provide a comprehensive analysis with clear buy/sell/hold recommendation.",
+            "\nFor general queries without specific stocks, analyze the overall market and provide 3-5 top stock picks with rationale.",
+            "\nUse the Linkup search tool to gather the latest information from these trusted financial domains:",
+            "- Market Data: finance.yahoo.com, google.com/finance, marketwatch.com, investing.com",
+            "- Financial News: bloomberg.com, reuters.com, cnbc.com, wsj.com, seekingalpha.com",
+            "- Research: morningstar.com, zacks.com, tipranks.com, fool.com, investorplace.com",
+            "- Technical Analysis: tradingview.com, finviz.com",
+            
+            # Response format
+            "Structure responses with clear, bold headings for each section.",
+            "Always include the following sections for stock analysis:",
+            "1. **Current Snapshot** (price, market cap, key stats)",
+            "2. **Fundamental Analysis** (financial health, growth, valuation)",
+            "3. **Technical Analysis** (price trends, support/resistance, indicators)",
+            "4. **Market Sentiment** (news, analyst ratings, insider activity)",
+            "5. **Investment Thesis** (bull/bear cases, risks, opportunities)",
+            "6. **Recommendation** (clear buy/sell/hold with price target and timeframe)",
+            "\nUse bullet points for clarity and include relevant metrics in tables when appropriate.",
+            
+            # Analysis guidelines
+            "For any stock query, automatically provide a complete analysis without asking for additional information.",
+            "When specific metrics or timeframes aren't mentioned, use these defaults:",
+            "- Timeframe: 1 year for price targets",
+            "- Risk tolerance: Moderate (balanced growth and stability)",
+            "- Investment horizon: Long-term (3-5 years) unless specified otherwise",
+            "\nFor general market queries, identify and analyze 3-5 top opportunities across different sectors.",
+            "Always include both quantitative metrics and qualitative analysis.",
+            "Highlight potential catalysts and risks for each recommendation.",
+            
+            # Risk disclosure
+            "Include a brief risk disclosure at the end of recommendations.",
+            "Note that all investments carry risk and past performance is not indicative of future results.",
+            
+            # Efficiency
+            "Be direct and avoid unnecessary disclaimers or hedging.",
+            "Prioritize actionable information over general advice.",
+            "Update recommendations based on the most current market data available.",
+            "When appropriate, provide alternative investment options or hedging strategies."
+        ]
+    ))
 
 # List of trusted financial websites for research
 TRUSTED_FINANCIAL_DOMAINS = [
@@ -118,59 +141,178 @@ def get_trusted_search_query(query: str) -> str:
     return f"{query} ({site_restrictions})"
 
 # Create Web Research Agent with SerperTools
-web_research_agent = Agent(
-    name="Web Research Agent",
-    model=Gemini(id="gemini-2.5-flash-lite", api_key=os.getenv("GEMINI_API_KEY")),
-    tools=[
-        SerperTools(
-            api_key=os.getenv("SERPER_API_KEY"),
-            # country="us",
-            language="en",
-            num_results=5,  # Limit to top 5 most relevant results
-            # date_range="1y"  # Focus on recent information
-        )
-    ],
-    description="You are a web research specialist that finds and analyzes information from trusted financial sources using Serper's search capabilities.",
-    instructions=[
-        "When given a research query:",
-        f"1. Prioritize information from these trusted financial domains: {', '.join(TRUSTED_FINANCIAL_DOMAINS[:5])} and others",
-        "2. Use the search_news tool for current market news and developments",
-        "3. Use the search tool for general financial information and analysis",
-        "4. Use search_scholar for academic research and in-depth analysis",
-        "5. For specific companies or stocks, include their ticker symbol in the search",
-        "6. Provide accurate citations for all information sources including URLs and publication dates",
-        "7. For financial analysis, focus on: stock performance, company news, and market trends",
-        "8. Format the response clearly with proper headings and sections",
-        "9. Include direct links to sources when available",
-        "10. If information is conflicting between sources, present multiple perspectives",
-        "11. Always verify facts from multiple trusted sources before presenting as fact"
-    ],
-    markdown=True,
-    show_tool_calls=True,
-)
+def make_web_research_agent():
+    """Builds a web research agent; the fan-out team needs a fresh one per query."""
+    from agno.agent import Agent
+    from agno.tools.serper import SerperTools
+
+    return instrument(Agent(
+        name="Web Research Agent",
+        model=make_model(),
+        tools=[
+            cache_tools(limit_tools(SerperTools(
+                api_key=os.getenv("SERPER_API_KEY"),
+                # country="us",
+                language="en",
+                num_results=5,  # Limit to top 5 most relevant results
+                # date_range="1y"  # Focus on recent information
+            ), 'serper'))
+        ],
+        description="You are a web research specialist that finds and analyzes information from trusted financial sources using Serper's search capabilities.",
+        instructions=[
+            "When given a research query:",
+            f"1. Prioritize information from these trusted financial domains: {', '.join(TRUSTED_FINANCIAL_DOMAINS[:5])} and others",
+            "2. Use the search_news tool for current market news and developments",
+            "3. Use the search tool for general financial information and analysis",
+            "4. Use search_scholar for academic research and in-depth analysis",
+            "5. For specific companies or stocks, include their ticker symbol in the search",
+            "6. Provide accurate citations for all information sources including URLs and publication dates",
+            "7. For financial analysis, focus on: stock performance, company news, and market trends",
+            "8. Format the response clearly with proper headings and sections",
+            "9. Include direct links to sources when available",
+            "10. If information is conflicting between sources, present multiple perspectives",
+            "11. Always verify facts from multiple trusted sources before presenting as fact"
+        ],
+        markdown=True,
+        show_tool_calls=True,
+    ))
 
 # Create Financial Team
-finance_team = Team(
-    name="Financial Analysis Team",
-    mode="route",
-    model=Gemini(id="gemini-2.5-flash-lite", api_key=os.getenv("GEMINI_API_KEY")),
-    members=[financial_analyst, web_research_agent],
-    show_tool_calls=True,
-    markdown=True,
-    description="A team of financial experts that provides comprehensive stock and market analysis.",
-    instructions=[
-        "Route financial queries to the most appropriate agent based on the request type:",
-        "1. For general financial analysis, market trends, and stock recommendations, use the Financial Analyst.",
-        "2. For detailed financial statements, company fundamentals, and raw financial data, use the Financial Data Agent.",
-        "3. If uncertain which agent to use, default to the Financial Analyst.",
-        "4. Always ensure responses are clear, well-formatted, and include relevant financial metrics.",
-        "5. When comparing stocks or analyzing multiple companies, use consistent metrics and time periods."
-    ],
-    show_members_responses=True,
-)
+def make_finance_team():
+    """
+    Builds the routing team with its own member agents. Agents and teams keep
+    per-run state, so concurrent runs each need a separate team.
+    """
+    from agno.team.team import Team
+
+    return instrument(Team(
+        name="Financial Analysis Team",
+        mode="route",
+        model=make_model(),
+        members=[make_financial_analyst(), make_web_research_agent()],
+        show_tool_calls=True,
+        markdown=True,
+        description="A team of financial experts that provides comprehensive stock and market analysis.",
+        instructions=[
+            "Route financial queries to the most appropriate agent based on the request type:",
+            "1. For general financial analysis, market trends, and stock recommendations, use the Financial Analyst.",
+            "2. For detailed financial statements, company fundamentals, and raw financial data, use the Financial Data Agent.",
+            "3. If uncertain which agent to use, default to the Financial Analyst.",
+            "4. Always ensure responses are clear, well-formatted, and include relevant financial metrics.",
+            "5. When comparing stocks or analyzing multiple companies, use consistent metrics and time periods."
+        ],
+        show_members_responses=True,
+    ))
+
+# --- Parallel fan-out team ---
+# Independent parts of an analysis run concurrently and a synthesis agent merges
+# them, instead of one routed agent making every tool call in sequence
+FAN_OUT_MAX_CONCURRENCY = int(os.getenv("FAN_OUT_MAX_CONCURRENCY", "3"))
+
+def make_market_data_agent():
+    """Builds an agent limited to price action, technicals and analyst ratings."""
+    from agno.agent import Agent
+    from agno.tools.yfinance import YFinanceTools
+
+    return instrument(Agent(
+        name="Market Data Analyst",
+        model=make_model(),
+        tools=[
+            cache_tools(limit_tools(YFinanceTools(
+                stock_price=True,
+                historical_prices=True,
+                technical_indicators=True,
+                analyst_recommendations=True
+            ), 'yahoo'))
+        ],
+        instructions=[
+            "Report current price and recent price action, key technical indicators with support/resistance levels, and analyst ratings and price targets.",
+            "Be concise and factual; use bullet points and tables with the exact figures retrieved.",
+        ],
+        markdown=True,
+    ))
+
+def make_fundamentals_agent():
+    """Builds an agent limited to company financials and valuation."""
+    from agno.agent import Agent
+    from agno.tools.yfinance import YFinanceTools
+
+    return instrument(Agent(
+        name="Fundamentals Analyst",
+        model=make_model(),
+        tools=[
+            cache_tools(limit_tools(YFinanceTools(
+                company_info=True,
+                stock_fundamentals=True,
+                income_statements=True,
+                key_financial_ratios=True
+            ), 'yahoo'))
+        ],
+        instructions=[
+            "Report market cap, valuation (P/E, P/S), growth rates, margins, balance-sheet health and key financial ratios.",
+            "Be concise and factual; use bullet points and tables with the exact figures retrieved.",
+        ],
+        markdown=True,
+    ))
+
+def make_synthesis_agent():
+    """Builds the agent that merges the fan-out branches into the final answer."""
+    from agno.agent import Agent
+
+    return instrument(Agent(
+        name="Synthesis Analyst",
+        model=make_model(),
+        instructions=[
+            "You combine research from specialist analysts into one comprehensive answer; do not call tools.",
+            "Structure responses with clear, bold headings for each section.",
+            "For stock analysis include: **Current Snapshot**, **Fundamental Analysis**, **Technical Analysis**, "
+            "**Market Sentiment**, **Investment Thesis** and **Recommendation** (buy/sell/hold with price target and timeframe).",
+            "If a specialist's findings are unavailable, say which part of the analysis is missing.",
+            "Include a brief risk disclosure at the end of recommendations.",
+        ],
+        markdown=True,
+    ))
+
+def make_fan_out_team():
+    """
+    Builds the fan-out team. It only holds the agent factories and creates fresh
+    agents for every question, so one instance serves every session.
+    """
+    return instrument(FanOutTeam(
+        branches=[
+            Branch("Market data", make_market_data_agent,
+                   "Gather current market data, technicals and analyst ratings relevant to: {question}"),
+            Branch("Fundamentals", make_fundamentals_agent,
+                   "Gather company fundamentals and valuation relevant to: {question}"),
+            Branch("Web research", make_web_research_agent,
+                   "Research the latest news and market sentiment relevant to: {question}"),
+        ],
+        make_synthesizer=make_synthesis_agent,
+        max_concurrency=FAN_OUT_MAX_CONCURRENCY,
+    ))
+
+# Shared instances are built on first use rather than at import, so importing this
+# module does not create model clients or start telemetry
+_SHARED = {
+    'financial_analyst': make_financial_analyst,
+    'web_research_agent': make_web_research_agent,
+    'finance_team': make_finance_team,
+    'finance_fan_out_team': make_fan_out_team,
+}
+_shared_lock = threading.Lock()
+
+def __getattr__(name):
+    if name not in _SHARED:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _shared_lock:
+        if name not in globals():
+            globals()[name] = _SHARED[name]()
+    return globals()[name]
 
 # Example usage
 if __name__ == "__main__":
+    finance_team = make_finance_team()
+
     # Test with a general market query (goes to financial_analyst)
     print("=== General Market Analysis ===")
     finance_team.print_response("What are the top 3 tech stocks to watch this quarter?", stream=True)
@@ -1,92 +1,416 @@
+import hashlib
+
 import pandas as pd
 import numpy as np
 
+from kernels import rolling_max, rolling_min, rolling_std
+from lru_cache import LRUCache
+
+# Indicator outputs keyed by (input fingerprint, indicator, params); bounded to ~256 MB
+INDICATOR_CACHE = LRUCache(
+    max_entries=512,
+    max_bytes=256 * 2**20,
+    sizeof=lambda outputs: sum(values.nbytes for values in outputs.values()),
+)
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def _frame(values):
+    """Wraps a 1-D array as a Series or a 2-D (time x ticker) array as a DataFrame."""
+    return pd.Series(values) if values.ndim == 1 else pd.DataFrame(values)
+
+
+def _rolling_mean(values, window):
+    return _frame(values).rolling(window=window).mean().to_numpy()
+
+
+def _rolling_std(values, window):
+    # Block-centred kernel: pandas' running sums lose precision on long trending series
+    return rolling_std(values, window)
+
+
+class _Inputs:
+    """
+    Raw NumPy views of the price columns plus a memo of shared intermediates,
+    so indicators requested together reuse one shift, diff or rolling window.
+    The kernels below only index along axis 0, so the same code serves one
+    ticker (1-D arrays) and a whole panel (2-D time x ticker arrays).
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.memo = {}
+
+    def has(self, *columns):
+        return all(col in self.df.columns for col in columns)
+
+    def array(self, column, dtype=np.float64):
+        key = ('array', column, dtype)
+        if key not in self.memo:
+            self.memo[key] = self.df[column].to_numpy(dtype=dtype)
+        return self.memo[key]
+
+    @property
+    def index(self):
+        return self.df.index
+
+    def shared(self, key, func):
+        if key not in self.memo:
+            self.memo[key] = func()
+        return self.memo[key]
+
+    def prev_close(self):
+        def shift():
+            close = self.array('Close')
+            prev = np.full_like(close, np.nan)
+            prev[1:] = close[:-1]
+            return prev
+        return self.shared('prev_close', shift)
+
+    def ema(self, values_key, values, span):
+        return self.shared(('ema', values_key, span),
+                           lambda: _frame(values).ewm(span=span, adjust=False).mean().to_numpy())
+
+
+def _sma(inputs, period):
+    if not inputs.has('Close'):
+        return {}
+    return {f'SMA_{period}': inputs.shared(('sma', period),
+                                           lambda: _rolling_mean(inputs.array('Close'), period))}
+
+
+def _bollinger_bands(inputs, period=20, std_dev=2):
+    if not inputs.has('Close'):
+        return {}
+    middle = _sma(inputs, period)[f'SMA_{period}']
+    std = inputs.shared(('std', period), lambda: _rolling_std(inputs.array('Close'), period))
+    return {
+        f'SMA_{period}': middle,
+        'Upper_Band': middle + std * std_dev,
+        'Lower_Band': middle - std * std_dev,
+    }
+
+
+def _rsi(inputs, period=14):
+    if not inputs.has('Close'):
+        return {}
+
+    def gains_and_losses():
+        close = inputs.array('Close')
+        delta = close - inputs.prev_close()
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        # Rows before a ticker's first close (panel rows before listing) do not exist
+        unlisted = ~np.logical_or.accumulate(~np.isnan(close), axis=0)
+        gain[unlisted] = loss[unlisted] = np.nan
+        return gain, loss
+
+    gain, loss = inputs.shared('gains_and_losses', gains_and_losses)
+    avg_gain = _rolling_mean(gain, period)
+    avg_loss = _rolling_mean(loss, period)
+
+    # Avoid division by zero
+    avg_loss = np.where(avg_loss == 0, 0.00001, avg_loss)
+
+    rs = avg_gain / avg_loss
+    return {'RSI': 100 - (100 / (1 + rs))}
+
+
+def _macd(inputs, fast_period=12, slow_period=26, signal_period=9):
+    if not inputs.has('Close'):
+        return {}
+    close = inputs.array('Close')
+    macd = inputs.ema('Close', close, fast_period) - inputs.ema('Close', close, slow_period)
+    signal = _frame(macd).ewm(span=signal_period, adjust=False).mean().to_numpy()
+    return {
+        'MACD': macd,
+        'MACD_Signal': signal,
+        'MACD_Histogram': macd - signal,
+    }
+
+
+def _atr(inputs, period=14):
+    if not inputs.has('High', 'Low', 'Close'):
+        return {}
+
+    def true_range():
+        high, low = inputs.array('High'), inputs.array('Low')
+        prev_close = inputs.prev_close()
+        return np.maximum(np.maximum(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+    tr = inputs.shared('true_range', true_range)
+    return {'ATR': _rolling_mean(tr, period)}
+
+
+def _obv(inputs):
+    if not inputs.has('Close', 'Volume'):
+        return {}
+    close, prev_close = inputs.array('Close'), inputs.prev_close()
+    volume = inputs.array('Volume', dtype=None)
+    signed = np.where(close > prev_close, volume, np.where(close < prev_close, -volume, 0))
+    return {'OBV': signed.cumsum(axis=0)}
+
+
+def _stochastic(inputs, k_period=14, d_period=3):
+    if not inputs.has('High', 'Low', 'Close'):
+        return {}
+    lowest_low = rolling_min(inputs.array('Low'), k_period)
+    highest_high = rolling_max(inputs.array('High'), k_period)
+    k = 100 * ((inputs.array('Close') - lowest_low) / (highest_high - lowest_low))
+    d = _rolling_mean(k, d_period)
+    return {'%K': k, '%D': d}
+
+
+# Indicator name -> kernel; each kernel returns {output column: array}
+INDICATORS = {
+    'sma': _sma,
+    'bollinger_bands': _bollinger_bands,
+    'rsi': _rsi,
+    'macd': _macd,
+    'atr': _atr,
+    'obv': _obv,
+    'stochastic': _stochastic,
+}
+
+
+def _buffer(values):
+    """Returns a contiguous numeric buffer for values, hashing object arrays first."""
+    if values.dtype.kind in 'biufcmM':
+        return np.ascontiguousarray(values).view(np.uint8)
+    return pd.util.hash_array(values)
+
+
+def fingerprint(df):
+    """Returns a content hash of df's index and price columns."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_buffer(df.index.to_numpy()))
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            digest.update(col.encode())
+            digest.update(_buffer(df[col].to_numpy()))
+    return digest.hexdigest()
+
+
+def compute_indicators(df, requests, cache=INDICATOR_CACHE):
+    """
+    Computes several indicators in one pass over the price arrays.
+    requests is a list of indicator names or (name, params) pairs, e.g.
+    [('sma', {'period': 20}), ('rsi', {'period': 14}), 'obv'].
+    Returns a DataFrame holding only the requested outputs, indexed like df.
+    Indicators whose input columns are missing are skipped.
+    Results are memoized in cache by input fingerprint, indicator and params;
+    pass cache=None to always recompute.
+    """
+    inputs = _Inputs(df)
+    data_key = fingerprint(df) if cache is not None else None
+    outputs = {}
+    for request in requests:
+        name, params = (request, {}) if isinstance(request, str) else request
+        if cache is None:
+            outputs.update(INDICATORS[name](inputs, **params))
+            continue
+
+        key = (data_key, name, tuple(sorted(params.items())))
+        result = cache.get(key)
+        if result is None:
+            result = INDICATORS[name](inputs, **params)
+            for values in result.values():
+                values.flags.writeable = False
+            cache.put(key, result)
+        outputs.update(result)
+    return pd.DataFrame(outputs, index=df.index)
+
+
+class _PanelInputs(_Inputs):
+    """_Inputs over a (Ticker, Field) panel; each field is a (time x ticker) array."""
+
+    def __init__(self, panel):
+        super().__init__(panel)
+        self.fields = set(panel.columns.get_level_values('Field'))
+        self.tickers = list(dict.fromkeys(panel.columns.get_level_values('Ticker')))
+
+    def has(self, *columns):
+        return all(col in self.fields for col in columns)
+
+    def array(self, column, dtype=np.float64):
+        key = ('array', column, dtype)
+        if key not in self.memo:
+            matrix = self.df.xs(column, axis=1, level='Field').reindex(columns=self.tickers)
+            self.memo[key] = matrix.to_numpy(dtype=dtype)
+        return self.memo[key]
+
+
+def compute_panel_indicators(panel, requests):
+    """
+    Computes indicators for every ticker of a (Ticker, Field) panel at once, as
+    returned by bulk_loader.load_bulk. Takes the same requests as compute_indicators
+    and returns {output name: DataFrame indexed by date with one column per ticker}.
+    Tickers listed later than others simply carry leading NaNs.
+    """
+    inputs = _PanelInputs(panel)
+    outputs = {}
+    for request in requests:
+        name, params = (request, {}) if isinstance(request, str) else request
+        outputs.update(INDICATORS[name](inputs, **params))
+
+    frames = {}
+    listed = None
+    if inputs.has('Close'):
+        listed = np.logical_or.accumulate(~np.isnan(inputs.array('Close')), axis=0)
+    for name, values in outputs.items():
+        frame = pd.DataFrame(values, index=panel.index, columns=inputs.tickers)
+        frames[name] = frame.where(listed) if listed is not None else frame
+    return frames
+
+
+class _ArrayInputs(_Inputs):
+    """_Inputs over {column: array} without a DataFrame, e.g. views of shared memory."""
+
+    def __init__(self, arrays, memo=None):
+        super().__init__(None)
+        self.arrays = arrays
+        if memo is not None:
+            self.memo = memo
+
+    def has(self, *columns):
+        return all(col in self.arrays for col in columns)
+
+    def array(self, column, dtype=np.float64):
+        key = ('array', column, dtype)
+        if key not in self.memo:
+            # No copy when the array already has the requested dtype
+            self.memo[key] = np.asarray(self.arrays[column], dtype=dtype)
+        return self.memo[key]
+
+
+def compute_array_indicators(arrays, requests, memo=None):
+    """
+    Computes indicators straight from price arrays: 1-D for one ticker or 2-D
+    (time x ticker), keyed by column name. Takes the same requests as
+    compute_indicators and returns {output name: array}. Passing the same memo
+    dict to several calls over the same arrays shares their intermediates
+    (rolling windows, EMAs, true range), which is what parameter sweeps need.
+    """
+    inputs = _ArrayInputs(arrays, memo)
+    outputs = {}
+    for request in requests:
+        name, params = (request, {}) if isinstance(request, str) else request
+        outputs.update(INDICATORS[name](inputs, **params))
+    return outputs
+
+
+def indicator_requests(indicator_params):
+    """Builds the indicator engine request list for the indicators enabled in the sidebar."""
+    requests = []
+    if indicator_params['sma_flag']:
+        requests.append(('sma', {'period': indicator_params['sma_periods']}))
+    if indicator_params['bb_flag']:
+        requests.append(('bollinger_bands', {'period': indicator_params['bb_periods'],
+                                             'std_dev': indicator_params['bb_std']}))
+    if indicator_params['rsi_flag']:
+        requests.append(('rsi', {'period': indicator_params['rsi_periods']}))
+    if indicator_params['macd_flag']:
+        requests.append(('macd', {'fast_period': indicator_params['macd_fast'],
+                                  'slow_period': indicator_params['macd_slow'],
+                                  'signal_period': indicator_params['macd_signal']}))
+    if indicator_params['atr_flag']:
+        requests.append(('atr', {'period': indicator_params['atr_period']}))
+    if indicator_params['obv_flag']:
+        requests.append('obv')
+    if indicator_params['stoch_flag']:
+        requests.append(('stochastic', {'k_period': indicator_params['stoch_k'],
+                                        'd_period': indicator_params['stoch_d']}))
+    return requests
+
+
+def add_indicators(df, requests):
+    """Computes the requested indicators and writes their outputs into df."""
+    result = compute_indicators(df, requests)
+    for col in result.columns:
+        df[col] = result[col]
+    return df
+
+
 def calculate_macd(df, fast_period=12, slow_period=26, signal_period=9):
     """Calculates MACD, MACD Signal, and MACD Histogram."""
-    if 'Close' not in df.columns:
-        return df
-
-    df[f'EMA_{fast_period}'] = df['Close'].ewm(span=fast_period, adjust=False).mean()
-    df[f'EMA_{slow_period}'] = df['Close'].ewm(span=slow_period, adjust=False).mean()
-    df['MACD'] = df[f'EMA_{fast_period}'] - df[f'EMA_{slow_period}']
-    df['MACD_Signal'] = df['MACD'].ewm(span=signal_period, adjust=False).mean()
-    df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
-    return df
+    return add_indicators(df, [('macd', {'fast_period': fast_period, 'slow_period': slow_period,
+                                         'signal_period': signal_period})])
+
 
 def calculate_atr(df, period=14):
     """Calculates Average True Range (ATR)."""
-    if not all(col in df.columns for col in ['High', 'Low', 'Close']):
-        return df
-
-    df['TR'] = np.maximum(
-        np.maximum(
-            df['High'] - df['Low'],
-            np.abs(df['High'] - df['Close'].shift(1))
-        ),
-        np.abs(df['Low'] - df['Close'].shift(1))
-    )
-    df['ATR'] = df['TR'].rolling(window=period).mean()
-    return df
+    return add_indicators(df, [('atr', {'period': period})])
+
 
 def calculate_obv(df):
     """Calculates On-Balance Volume (OBV)."""
-    if not all(col in df.columns for col in ['Close', 'Volume']):
-        return df
-
-    df['OBV'] = np.where(
-        df['Close'] > df['Close'].shift(1),
-        df['Volume'],
-        np.where(
-            df['Close'] < df['Close'].shift(1),
-            -df['Volume'],
-            0
-        )
-    ).cumsum()
-    return df
+    return add_indicators(df, ['obv'])
+
 
 def calculate_stochastic(df, k_period=14, d_period=3):
     """Calculates the Stochastic Oscillator (%K and %D)."""
-    if not all(col in df.columns for col in ['High', 'Low', 'Close']):
-        return df
+    return add_indicators(df, [('stochastic', {'k_period': k_period, 'd_period': d_period})])
 
-    df['Lowest_Low'] = df['Low'].rolling(window=k_period).min()
-    df['Highest_High'] = df['High'].rolling(window=k_period).max()
-    df['%K'] = 100 * ((df['Close'] - df['Lowest_Low']) / (df['Highest_High'] - df['Lowest_Low']))
-    df['%D'] = df['%K'].rolling(window=d_period).mean()
-    return df
 
 def calculate_rsi(df, period=14):
     """Calculates the Relative Strength Index (RSI)."""
-    if 'Close' not in df.columns:
-        return df
-
-    delta = df['Close'].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-
-    # Avoid division by zero
-    avg_loss = avg_loss.replace(0, 0.00001)
+    return add_indicators(df, [('rsi', {'period': period})])
 
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    return df
 
 def calculate_sma(df, period):
     """Calculates Simple Moving Average (SMA)."""
-    if 'Close' not in df.columns:
-        return df
-    df[f'SMA_{period}'] = df['Close'].rolling(window=period).mean()
-    return df
+    return add_indicators(df, [('sma', {'period': period})])
+
 
 def calculate_bollinger_bands(df, period=20, std_dev=2):
     """Calculates Bollinger Bands (Middle, Upper, Lower)."""
-    if 'Close' not in df.columns:
-        return df
-    df = calculate_sma(df, period) # Ensure SMA is calculated
-    df[f'STD_{period}'] = df['Close'].rolling(window=period).std()
-    df['Upper_Band'] = df[f'SMA_{period}'] + (df[f'STD_{period}'] * std_dev)
-    df['Lower_Band'] = df[f'SMA_{period}'] - (df[f'STD_{period}'] * std_dev)
-    return df
\ No newline at end of file
+    return add_indicators(df, [('bollinger_bands', {'period': period, 'std_dev': std_dev})])
+
+
+if __name__ == "__main__":
+    import timeit
+
+    # Per-ticker loop versus one panel call over a synthetic S&P 500-sized universe
+    rng = np.random.default_rng(0)
+    n_rows, n_tickers = 2520, 500
+    index = pd.bdate_range('2015-01-01', periods=n_rows)
+    tickers = [f'T{i:03d}' for i in range(n_tickers)]
+    close = 100 + rng.standard_normal((n_rows, n_tickers)).cumsum(axis=0)
+    listing = rng.integers(0, n_rows // 2, n_tickers)
+    close[np.arange(n_rows)[:, None] < listing] = np.nan
+    fields = {
+        'Open': close,
+        'High': close + rng.random(close.shape),
+        'Low': close - rng.random(close.shape),
+        'Close': close,
+        'Volume': np.where(np.isnan(close), np.nan, rng.integers(1, 1_000_000, close.shape)),
+    }
+    panel = pd.concat({field: pd.DataFrame(values, index=index, columns=tickers)
+                       for field, values in fields.items()}, axis=1, names=['Field', 'Ticker'])
+    panel = panel.swaplevel(axis=1).sort_index(axis=1)
+    requests = [
+        ('sma', {'period': 20}),
+        ('bollinger_bands', {'period': 20, 'std_dev': 2}),
+        ('rsi', {'period': 14}),
+        ('macd', {'fast_period': 12, 'slow_period': 26, 'signal_period': 9}),
+        ('atr', {'period': 14}),
+        'obv',
+        ('stochastic', {'k_period': 14, 'd_period': 3}),
+    ]
+    frames = {ticker: panel[ticker].dropna(how='all') for ticker in tickers}
+
+    def per_ticker_loop():
+        return {ticker: compute_indicators(frame, requests, cache=None) for ticker, frame in frames.items()}
+
+    loop_results = per_ticker_loop()
+    panel_results = compute_panel_indicators(panel, requests)
+    for ticker in tickers[:25]:
+        for name, values in loop_results[ticker].items():
+            np.testing.assert_allclose(panel_results[name][ticker].loc[values.index], values,
+                                       rtol=1e-9, atol=1e-9, err_msg=f'{ticker} {name}')
+
+    loop_time = min(timeit.repeat(per_ticker_loop, number=1, repeat=3))
+    panel_time = min(timeit.repeat(lambda: compute_panel_indicators(panel, requests), number=1, repeat=3))
+    print(f"{n_tickers} tickers x {n_rows} rows, {len(requests)} indicators")
+    print(f"  per-ticker loop: {loop_time * 1e3:8.1f} ms ({loop_time / n_tickers * 1e3:.3f} ms/ticker)")
+    print(f"  panel:           {panel_time * 1e3:8.1f} ms ({panel_time / n_tickers * 1e3:.3f} ms/ticker)")
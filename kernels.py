@@ -0,0 +1,160 @@
+import numpy as np
+
+
+def _as_float_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _block_scans(values, window, ufunc, fill):
+    """
+    Splits values into blocks of `window` rows and returns the within-block prefix
+    and suffix scans of ufunc along the first axis, each trimmed back to len(values).
+    """
+    n = len(values)
+    pad = (-n) % window
+    if pad:
+        values = np.concatenate([values, np.full((pad,) + values.shape[1:], fill)])
+    blocks = values.reshape((-1, window) + values.shape[1:])
+    prefix = ufunc.accumulate(blocks, axis=1).reshape(values.shape)[:n]
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(values.shape)[:n]
+    return prefix, suffix
+
+
+def _rolling_extreme(values, window, ufunc, fill):
+    # van Herk/Gil-Werman: every window spans at most two blocks, so its extreme is
+    # ufunc(suffix scan at its start, prefix scan at its end) -- O(n) for any window.
+    values = _as_float_array(values)
+    n = len(values)
+    out = np.full(values.shape, np.nan)
+    if window > n:
+        return out
+    if window == 1:
+        out[:] = values
+        return out
+    prefix, suffix = _block_scans(values, window, ufunc, fill)
+    out[window - 1:] = ufunc(suffix[:n - window + 1], prefix[window - 1:])
+    return out
+
+
+def rolling_min(values, window):
+    """
+    Rolling minimum along the first axis (each column of a 2-D array is independent);
+    NaN until the window is full and whenever it holds a NaN.
+    """
+    return _rolling_extreme(values, window, np.minimum, np.inf)
+
+
+def rolling_max(values, window):
+    """
+    Rolling maximum along the first axis (each column of a 2-D array is independent);
+    NaN until the window is full and whenever it holds a NaN.
+    """
+    return _rolling_extreme(values, window, np.maximum, -np.inf)
+
+
+def _nan_windows(nan, window):
+    """Boolean mask (per window end, along the first axis) of trailing windows that contain a NaN."""
+    counts = np.concatenate([np.zeros((1,) + nan.shape[1:]), nan.cumsum(axis=0)])
+    return counts[window:] > counts[:-window]
+
+
+def _constant_windows(values, window):
+    """Boolean mask (per window end, along the first axis) of trailing windows holding one repeated value."""
+    changes = np.concatenate([np.zeros((1,) + values.shape[1:]), (values[1:] != values[:-1]).cumsum(axis=0)])
+    return changes[window - 1:] == changes[:len(values) - window + 1]
+
+
+def _blocks(values, window):
+    """Reshapes values, zero-padded to a multiple of window rows, into (n_blocks, window, ...)."""
+    pad = (-len(values)) % window
+    if pad:
+        values = np.concatenate([values, np.zeros((pad,) + values.shape[1:])])
+    return values.reshape((-1, window) + values.shape[1:])
+
+
+def _full_windows(block_result, first, n, window):
+    """Flattens per-block window results into one row per full trailing window."""
+    rows = block_result.reshape((-1,) + block_result.shape[2:])
+    return np.concatenate([first[None], rows])[:n - window + 1]
+
+
+def rolling_var(values, window, ddof=1):
+    """
+    Rolling variance along the first axis matching Series.rolling(window).var(ddof).
+    Each block is centred on its own mean and the part of a window lying in the
+    previous block is shifted onto the current block's centre, so the sums of
+    squared deviations stay well conditioned even for long trending series.
+    """
+    values = _as_float_array(values)
+    n = len(values)
+    out = np.full(values.shape, np.nan)
+    if window <= ddof or window > n:
+        return out
+
+    nan = np.isnan(values)
+    valid = _blocks((~nan).astype(np.float64), window)
+    filled = _blocks(np.where(nan, 0.0, values), window)
+    counts = valid.sum(axis=1)
+    centres = np.divide(filled.sum(axis=1), counts, out=np.zeros(counts.shape), where=counts > 0)
+    centred = (filled - centres[:, None]) * valid
+
+    sums = np.add.accumulate(centred, axis=1)
+    squares = np.add.accumulate(centred * centred, axis=1)
+    head_sums = sums[:-1, -1:] - sums[:-1]
+    head_squares = squares[:-1, -1:] - squares[:-1]
+    head_counts = (window - 1 - np.arange(window)).reshape((window,) + (1,) * (values.ndim - 1))
+    shift = (centres[:-1] - centres[1:])[:, None]
+    window_sums = sums[1:] + head_sums + head_counts * shift
+    window_squares = (squares[1:] + head_squares + 2 * shift * head_sums
+                      + head_counts * shift * shift)
+
+    s1 = _full_windows(window_sums, sums[0, -1], n, window)
+    s2 = _full_windows(window_squares, squares[0, -1], n, window)
+    var = np.maximum((s2 - s1 * s1 / window) / (window - ddof), 0.0)
+    var[_constant_windows(values, window)] = 0.0
+    var[_nan_windows(nan, window)] = np.nan
+    out[window - 1:] = var
+    return out
+
+
+def rolling_std(values, window, ddof=1):
+    """Rolling standard deviation along the first axis matching Series.rolling(window).std(ddof)."""
+    return np.sqrt(rolling_var(values, window, ddof))
+
+
+if __name__ == "__main__":
+    import timeit
+    import pandas as pd
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    rng = np.random.default_rng(0)
+    window = 20
+    for n in (1_000, 100_000, 10_000_000):
+        values = 100 + rng.standard_normal(n).cumsum()
+        values[rng.integers(0, n, max(n // 1000, 1))] = np.nan
+        series = pd.Series(values)
+        repeat = 3 if n < 10_000_000 else 1
+        number = max(1, 100_000 // n)
+
+        # Exact two-pass references on a sample of windows
+        sample = np.sort(rng.choice(n - window + 1, min(n - window + 1, 10_000), replace=False))
+        windows = sliding_window_view(values, window)[sample]
+        references = {
+            'min': windows.min(axis=1),
+            'max': windows.max(axis=1),
+            'std': windows.std(axis=1, ddof=1),
+        }
+
+        for name, kernel, pandas_path in [
+            ('min', lambda: rolling_min(values, window), lambda: series.rolling(window).min()),
+            ('max', lambda: rolling_max(values, window), lambda: series.rolling(window).max()),
+            ('std', lambda: rolling_std(values, window), lambda: series.rolling(window).std()),
+        ]:
+            expected = references[name]
+            ours_error = np.nanmax(np.abs(kernel()[window - 1:][sample] - expected))
+            pandas_error = np.nanmax(np.abs(pandas_path().to_numpy()[window - 1:][sample] - expected))
+            ours = min(timeit.repeat(kernel, number=number, repeat=repeat)) / number
+            theirs = min(timeit.repeat(pandas_path, number=number, repeat=repeat)) / number
+            print(f"{n:>10,} rows  rolling {name:<4}  kernel {ours * 1e3:9.3f} ms  "
+                  f"pandas {theirs * 1e3:9.3f} ms  ({theirs / ours:4.1f}x)  "
+                  f"max error kernel {ours_error:.1e} pandas {pandas_error:.1e}")
@@ -1,7 +1,41 @@
 # app.py
-import streamlit as st
+import os
 import time
-from finance_team import finance_team
+import uuid
+import pandas as pd
+import streamlit as st
+from chat_streaming import FakeTeam, format_metrics, render_stream
+from data_loader import get_sp500_components
+from response_cache import RESPONSE_CACHE, company_aliases
+from team_runner import TEAM_RUNNER, RunnerBusy
+from tool_cache import TOOL_CACHE
+import upstream
+
+# FINTELLIGENCE_FAKE_TEAM=1 answers from a local fake model that needs no API keys,
+# for measuring time-to-first-token and total latency of the page
+# finance_team only imports agno, the model SDKs and telemetry inside its factories,
+# so nothing heavy loads before the first run builds a team
+def make_finance_team():
+    from finance_team import make_finance_team
+    return make_finance_team()
+
+def make_fan_out_team():
+    # The fan-out team builds fresh agents for every query, so it can be shared
+    from finance_team import finance_fan_out_team
+    return finance_fan_out_team
+
+if os.getenv("FINTELLIGENCE_FAKE_TEAM"):
+    make_finance_team = make_fan_out_team = FakeTeam
+
+# Route sends a question to one specialist; fan-out runs market data, fundamentals
+# and web research in parallel and merges them. Each value builds the team for one
+# run, so concurrent sessions never share a team's run state.
+TEAM_MODES = {
+    "Route to one specialist": make_finance_team,
+    "Parallel fan-out": make_fan_out_team,
+}
+# Seconds a question waits for a free slot in the runner before it is turned away
+SUBMIT_TIMEOUT = 5
 # --- Streamlit Page Configuration ---
 st.set_page_config(
     page_title="Fintelligence",
@@ -14,11 +48,49 @@ st.set_page_config(
 # --- Page Title and Description ---
 st.markdown(f"<h1 style='color: #1407fa;'>💬 Multi-Agentic Financial Intelligence</h1>", unsafe_allow_html=True)
 
+def load_ticker_aliases():
+    """Teaches the response cache the S&P 500 tickers and company names, once per process."""
+    if RESPONSE_CACHE.aliases is not None:
+        return
+    try:
+        tickers, tickers_companies_dict = get_sp500_components()
+    except Exception:
+        # Without the list, only $-prefixed and upper-case tickers are recognized
+        return
+    RESPONSE_CACHE.set_aliases(company_aliases(tickers_companies_dict), set(tickers))
+
 # --- Main Application Logic ---
 def main():
     """
     Main function to run the Streamlit chatbot application.
     """
+    team_mode = st.sidebar.radio("Team mode", list(TEAM_MODES))
+    make_team = TEAM_MODES[team_mode]
+    session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+    # Tool results are cached across sessions; show how much upstream work that saves
+    with st.sidebar.expander("Tool cache"):
+        stats = TOOL_CACHE.stats()
+        if stats:
+            st.dataframe(pd.DataFrame(stats).T.round(3), use_container_width=True)
+        else:
+            st.caption("No tool calls yet.")
+
+    # Near-duplicate questions are answered from recent responses
+    load_ticker_aliases()
+    with st.sidebar.expander("Response cache"):
+        st.dataframe(pd.Series(RESPONSE_CACHE.stats(), name="value").round(3), use_container_width=True)
+        if st.button("Clear response cache"):
+            RESPONSE_CACHE.clear()
+
+    # Tool calls that miss the cache share per-provider rate limits with the data loaders
+    with st.sidebar.expander("Upstream APIs"):
+        st.dataframe(pd.DataFrame(upstream.stats()).T.round(3), use_container_width=True)
+
+    # Team runs from every session share one bounded worker pool
+    with st.sidebar.expander("Team runs"):
+        st.dataframe(pd.Series(TEAM_RUNNER.stats(), name="value").round(3), use_container_width=True)
+
     # Initialize chat history in session state if it doesn't exist
     if "messages" not in st.session_state:
         st.session_state.messages = []
@@ -27,6 +99,8 @@ def main():
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
+            if message.get("metrics"):
+                st.caption(format_metrics(message["metrics"]))
 
     # Accept user input
     if prompt := st.chat_input("What is your financial question?"):
@@ -40,32 +114,42 @@ def main():
         with st.chat_message("assistant"):
             message_placeholder = st.empty()
             full_response = ""
+            metrics = None
             try:
-                with st.spinner("Thinking..."): # Add spinner here
-                    # Get response from the finance team
-                    response = finance_team.run(message=prompt)
-                    
-                    # Process and display the response
-                    if hasattr(response, 'content'):
-                        full_response = response.content
-                    elif isinstance(response, str):
-                        full_response = response
-                    else:
-                        full_response = str(response)
-                        
-                    # Display the response with streaming effect
-                    for i in range(0, len(full_response), 5):
-                        message_placeholder.markdown(full_response[:i+5] + "▌")
-                        time.sleep(0.01)  # Small delay for streaming effect
-                    
-                message_placeholder.markdown(full_response)
+                cached = RESPONSE_CACHE.lookup(prompt)
+                if cached is not None:
+                    full_response, metrics = render_stream([cached.content], message_placeholder)
+                    metrics["cached"] = {
+                        "question": cached.question,
+                        "similarity": cached.similarity,
+                        "age_s": time.time() - cached.created,
+                    }
+                else:
+                    with st.spinner("Thinking..."): # Add spinner here
+                        # The run streams from a worker thread. Leaving the page or
+                        # sending a new question stops this script, and the finally
+                        # cancels the run so its worker is freed for other sessions.
+                        run = TEAM_RUNNER.submit(make_team, prompt, session_id=session_id,
+                                                 timeout=SUBMIT_TIMEOUT)
+                        try:
+                            full_response, metrics = render_stream(run, message_placeholder)
+                        finally:
+                            run.cancel()
+                    metrics["queue_s"] = run.queue_s()
+                    # A cancelled or failed run streams nothing; never serve that to others
+                    if full_response.strip():
+                        RESPONSE_CACHE.store(prompt, full_response, metrics["total_s"])
+                st.caption(format_metrics(metrics))
 
+            except RunnerBusy:
+                st.warning("Fintelligence is busy answering other questions. Please try again in a moment.")
+                full_response = "Sorry, too many questions are being answered right now. Please try again shortly."
             except Exception as e:
                 st.error(f"An error occurred: {e}")
                 full_response = "Sorry, I encountered an error while processing your request."
 
             # Add assistant response to chat history
-            st.session_state.messages.append({"role": "assistant", "content": full_response})
+            st.session_state.messages.append({"role": "assistant", "content": full_response, "metrics": metrics})
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
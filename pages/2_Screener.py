@@ -0,0 +1,140 @@
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+from data_loader import get_sp500_components, load_universe
+from indicators import compute_panel_indicators, indicator_requests
+from signals import latest_signals
+import upstream
+
+# --- Streamlit Page Configuration ---
+st.set_page_config(
+    page_title="S&P 500 Screener",
+    page_icon="🔎",
+    layout="wide",
+)
+
+st.markdown("<h1 style='color: #1407fa;'>🔎 S&P 500 Technical Screener</h1>", unsafe_allow_html=True)
+
+# Ready-made filters, written as DataFrame.query expressions over the results table
+PRESETS = {
+    "All": "",
+    "RSI oversold and MACD bullish": "RSI_Signal == 'OVERSOLD' and MACD_Cross == 'BULLISH'",
+    "RSI overbought and MACD bearish": "RSI_Signal == 'OVERBOUGHT' and MACD_Cross == 'BEARISH'",
+    "Above SMA with strengthening MACD": "SMA_Signal == 'BULLISH' and MACD_Trend == 'STRENGTHENING'",
+    "Below lower Bollinger Band": "BB_Signal == 'OVERSOLD'",
+    "Stochastic oversold": "Stoch_Signal == 'OVERSOLD'",
+}
+
+
+def main():
+    """
+    Scans every S&P 500 constituent with the Technical Analysis Summary rules.
+    """
+    st.sidebar.header("Screener Parameters")
+    lookback_days = st.sidebar.number_input("Lookback (days)", min_value=60, max_value=3650, value=365, step=30)
+
+    exp_sma = st.sidebar.expander("SMA")
+    sma_periods = exp_sma.number_input("SMA Periods", min_value=1, max_value=200, value=20, step=1)
+
+    exp_bb = st.sidebar.expander("Bollinger Bands")
+    bb_periods = exp_bb.number_input("BB Periods", min_value=1, max_value=50, value=20, step=1)
+    bb_std = exp_bb.number_input("# of standard deviations", min_value=1, max_value=4, value=2, step=1)
+
+    exp_rsi = st.sidebar.expander("Relative Strength Index")
+    rsi_periods = exp_rsi.number_input("RSI Periods", min_value=1, max_value=50, value=20, step=1)
+    rsi_upper = exp_rsi.number_input("RSI Upper", min_value=50, max_value=90, value=70, step=1)
+    rsi_lower = exp_rsi.number_input("RSI Lower", min_value=10, max_value=50, value=30, step=1)
+
+    exp_macd = st.sidebar.expander("MACD")
+    macd_fast = exp_macd.number_input("Fast Period", min_value=5, max_value=30, value=12, step=1)
+    macd_slow = exp_macd.number_input("Slow Period", min_value=10, max_value=50, value=26, step=1)
+    macd_signal = exp_macd.number_input("Signal Period", min_value=3, max_value=20, value=9, step=1)
+
+    exp_stoch = st.sidebar.expander("Stochastic Oscillator")
+    stoch_k = exp_stoch.number_input("K Period", min_value=5, max_value=30, value=14, step=1)
+    stoch_d = exp_stoch.number_input("D Period", min_value=1, max_value=10, value=3, step=1)
+
+    exp_atr = st.sidebar.expander("Average True Range")
+    atr_period = exp_atr.number_input("ATR Period", min_value=5, max_value=30, value=14, step=1)
+
+    indicator_params = {
+        "volume_flag": False,
+        "sma_flag": True,
+        "sma_periods": sma_periods,
+        "bb_flag": True,
+        "bb_periods": bb_periods,
+        "bb_std": bb_std,
+        "rsi_flag": True,
+        "rsi_periods": rsi_periods,
+        "rsi_upper": rsi_upper,
+        "rsi_lower": rsi_lower,
+        "macd_flag": True,
+        "macd_fast": macd_fast,
+        "macd_slow": macd_slow,
+        "macd_signal": macd_signal,
+        "atr_flag": True,
+        "atr_period": atr_period,
+        "obv_flag": False,
+        "stoch_flag": True,
+        "stoch_k": stoch_k,
+        "stoch_d": stoch_d,
+    }
+
+    if st.sidebar.button("Refresh data"):
+        # Only the days missing from the price store are downloaded, usually just today's bar
+        load_universe.clear()
+
+    available_tickers, tickers_companies_dict = get_sp500_components()
+    end_date = datetime.date.today() + datetime.timedelta(days=1)
+    start_date = end_date - datetime.timedelta(days=int(lookback_days))
+
+    with st.spinner(f"Loading {len(available_tickers)} tickers..."):
+        panel, failures = load_universe(tuple(available_tickers), start_date, end_date)
+
+    if panel.empty:
+        st.error("No price data could be loaded.")
+        return
+
+    outputs = compute_panel_indicators(panel, indicator_requests(indicator_params))
+    close = panel.xs("Close", axis=1, level="Field")
+    results = latest_signals(outputs, close, indicator_params)
+    results.insert(0, "Company", results.index.map(tickers_companies_dict))
+
+    # --- Filtering and sorting ---
+    col1, col2, col3 = st.columns([2, 3, 2])
+    preset = col1.selectbox("Preset", list(PRESETS))
+    query = col2.text_input(
+        "Filter (pandas query)",
+        value=PRESETS[preset],
+        help="For example: RSI < 30 and MACD_Cross == 'BULLISH'",
+    )
+    sort_by = col3.selectbox("Sort by", results.columns, index=results.columns.get_loc("RSI"))
+    ascending = col3.checkbox("Ascending", value=True)
+
+    filtered = results
+    if query.strip():
+        try:
+            filtered = results.query(query)
+        except Exception as e:
+            st.error(f"Invalid filter: {e}")
+    filtered = filtered.sort_values(sort_by, ascending=ascending)
+
+    st.caption(
+        f"{len(filtered)} of {len(results)} tickers match · data through "
+        f"{panel.index[-1]:%Y-%m-%d}"
+    )
+    st.dataframe(filtered, use_container_width=True)
+
+    if failures:
+        with st.expander(f"{len(failures)} tickers could not be loaded"):
+            st.write(failures)
+
+    # Downloads share the Yahoo rate limit with the chart and the chat agents
+    with st.sidebar.expander("Upstream APIs"):
+        st.dataframe(pd.DataFrame(upstream.stats()).T.round(3), use_container_width=True)
+
+
+if __name__ == "__main__":
+    main()
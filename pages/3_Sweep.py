@@ -0,0 +1,99 @@
+import datetime
+import os
+
+import streamlit as st
+
+from backtest import METRICS
+from data_loader import get_sp500_components, load_universe
+from sweep import PARAM_SPACE, grid, panel_arrays, random_sample, sweep
+
+# --- Streamlit Page Configuration ---
+st.set_page_config(
+    page_title="Parameter Sweep",
+    page_icon="🧪",
+    layout="wide",
+)
+
+st.markdown("<h1 style='color: #1407fa;'>🧪 Indicator Parameter Sweep</h1>", unsafe_allow_html=True)
+
+METRIC_LABELS = {
+    'total_return': "Total return",
+    'cagr': "CAGR",
+    'volatility': "Volatility",
+    'sharpe': "Sharpe ratio",
+    'max_drawdown': "Max drawdown",
+    'exposure': "Exposure",
+    'trades': "Trades",
+    'hit_rate': "Hit rate",
+}
+
+
+def main():
+    """
+    Backtests many settings of one Technical Analysis Summary rule across a set of
+    tickers on a process pool and ranks them.
+    """
+    available_tickers, tickers_companies_dict = get_sp500_components()
+
+    st.sidebar.header("Sweep Parameters")
+    lookback_days = st.sidebar.number_input("Lookback (days)", min_value=365, max_value=36500, value=3650, step=365)
+    universe = st.sidebar.multiselect(
+        "Tickers",
+        available_tickers,
+        format_func=tickers_companies_dict.get,
+        help="Leave empty to sweep every S&P 500 constituent",
+    )
+    rule = st.sidebar.selectbox("Rule", list(PARAM_SPACE))
+    search = st.sidebar.radio("Search", ["Grid", "Random sample"], horizontal=True)
+    full_grid = grid(rule)
+    samples = len(full_grid)
+    if search == "Random sample":
+        samples = st.sidebar.number_input("Combinations", min_value=1, max_value=len(full_grid),
+                                          value=min(500, len(full_grid)), step=50)
+    metric = st.sidebar.selectbox("Rank by", METRICS, index=METRICS.index('sharpe'), format_func=METRIC_LABELS.get)
+    allow_short = st.sidebar.checkbox("Short on bearish signals")
+    cost_bps = st.sidebar.number_input("Cost per trade (bps)", min_value=0.0, max_value=100.0, value=5.0, step=1.0)
+    workers = st.sidebar.number_input("Worker processes", min_value=1, max_value=os.cpu_count() or 1,
+                                      value=os.cpu_count() or 1, step=1)
+
+    space = PARAM_SPACE[rule]
+    st.write(f"**{rule}** over " + ", ".join(f"`{name}` {min(values)}–{max(values)}" for name, values in space.items())
+             + f" · {samples} of {len(full_grid)} combinations")
+
+    if not st.button("Run sweep", type="primary"):
+        return
+
+    tickers = tuple(universe or available_tickers)
+    end_date = datetime.date.today() + datetime.timedelta(days=1)
+    start_date = end_date - datetime.timedelta(days=int(lookback_days))
+    with st.spinner(f"Loading {len(tickers)} tickers..."):
+        panel, failures = load_universe(tickers, start_date, end_date)
+    if panel.empty:
+        st.error("No price data could be loaded.")
+        return
+
+    combos = full_grid if search == "Grid" else random_sample(rule, samples)
+    arrays, loaded = panel_arrays(panel)
+    with st.spinner(f"Backtesting {len(combos)} combinations on {len(loaded)} tickers..."):
+        results, stats = sweep(arrays, rule, combos, metric=metric, allow_short=allow_short, cost_bps=cost_bps,
+                               max_workers=int(workers))
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Combinations", f"{stats['combinations']:,}")
+    col2.metric("Tickers", f"{stats['tickers']:,}")
+    col3.metric("Combinations / s", f"{stats['combinations_per_s']:,.1f}")
+    col4.metric("Backtests / s", f"{stats['backtests_per_s']:,.0f}")
+
+    st.caption(
+        f"Metrics are averaged over tickers · {stats['workers']} worker processes · "
+        f"{stats['seconds']:.1f} s · data through {panel.index[-1]:%Y-%m-%d}"
+    )
+    st.dataframe(results, use_container_width=True)
+
+    if failures:
+        with st.expander(f"{len(failures)} tickers could not be loaded"):
+            st.write(failures)
+
+
+if __name__ == "__main__":
+    main()
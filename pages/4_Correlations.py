@@ -0,0 +1,145 @@
+import datetime
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from correlation import RollingCovariance, top_pairs
+from data_loader import get_sp500_components, load_universe
+
+# --- Streamlit Page Configuration ---
+st.set_page_config(
+    page_title="Correlations",
+    page_icon="🔗",
+    layout="wide",
+)
+
+st.markdown("<h1 style='color: #1407fa;'>🔗 S&P 500 Correlations</h1>", unsafe_allow_html=True)
+
+PRECISIONS = {"float64": np.float64, "float32 (half the memory)": np.float32}
+
+
+@st.cache_resource(show_spinner=False)
+def get_tracker(tickers, window, precision):
+    """One rolling covariance per universe, window and precision, shared by every session."""
+    return {
+        'tracker': RollingCovariance(tickers, window, dtype=PRECISIONS[precision]),
+        'last': None,
+        'lock': threading.Lock(),
+    }
+
+
+def advance(state, returns):
+    """
+    Brings the shared tracker up to the last row of returns: new days are added
+    one at a time, and a full warm-up only happens the first time or when the
+    history no longer continues from the tracker's last day.
+    Returns (correlation matrix, beta matrix, description of the work done).
+    """
+    with state['lock']:
+        tracker = state['tracker']
+        start = time.perf_counter()
+        if state['last'] is None or state['last'] not in returns.index:
+            tracker.warm_up(returns.to_numpy())
+            work = f"warmed up from {min(len(returns), tracker.window)} days"
+        else:
+            new = returns.loc[returns.index > state['last']].to_numpy()
+            for row in new:
+                tracker.update(row)
+            work = f"{len(new)} new days added incrementally"
+        state['last'] = returns.index[-1]
+        corr, beta = tracker.corr(), tracker.beta()
+        return corr, beta, f"{work} in {(time.perf_counter() - start) * 1000:.1f} ms"
+
+
+def main():
+    """
+    Rolling correlation and beta matrices across the S&P 500, kept up to date
+    incrementally as new days are loaded.
+    """
+    st.sidebar.header("Correlation Parameters")
+    lookback_days = st.sidebar.number_input("Lookback (days)", min_value=60, max_value=3650, value=365, step=30)
+    window = st.sidebar.number_input("Rolling window (days)", min_value=10, max_value=250, value=60, step=5)
+    precision = st.sidebar.radio("Precision", list(PRECISIONS))
+    pairs_count = st.sidebar.number_input("Pairs to list", min_value=5, max_value=100, value=20, step=5)
+
+    if st.sidebar.button("Refresh data"):
+        # Only the days missing from the price store are downloaded, usually just today's bar
+        load_universe.clear()
+
+    available_tickers, tickers_companies_dict = get_sp500_components()
+    end_date = datetime.date.today() + datetime.timedelta(days=1)
+    start_date = end_date - datetime.timedelta(days=int(lookback_days))
+
+    with st.spinner(f"Loading {len(available_tickers)} tickers..."):
+        panel, failures = load_universe(tuple(available_tickers), start_date, end_date)
+
+    if panel.empty:
+        st.error("No price data could be loaded.")
+        return
+
+    close = panel.xs("Close", axis=1, level="Field")
+    returns = close.pct_change(fill_method=None).iloc[1:]
+    tickers = tuple(returns.columns)
+    state = get_tracker(tickers, int(window), precision)
+    corr, beta, work = advance(state, returns)
+
+    st.caption(
+        f"{len(tickers)} tickers · {window}-day window ending {returns.index[-1]:%Y-%m-%d} · {work} · "
+        f"state {state['tracker'].nbytes() / 2**20:.1f} MB"
+    )
+
+    # --- Heatmap ---
+    shown = st.multiselect(
+        "Heatmap tickers",
+        tickers,
+        format_func=lambda t: f"{t} - {tickers_companies_dict.get(t, t)}",
+        help="Leave empty to show the whole universe",
+    )
+    positions = [tickers.index(t) for t in shown] if shown else list(range(len(tickers)))
+    labels = [tickers[i] for i in positions]
+    fig = go.Figure(go.Heatmap(
+        z=corr[np.ix_(positions, positions)],
+        x=labels,
+        y=labels,
+        zmin=-1,
+        zmax=1,
+        colorscale="RdBu",
+        hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>",
+    ))
+    fig.update_layout(height=700, yaxis=dict(autorange="reversed"), margin=dict(l=0, r=0, t=30, b=0))
+    st.plotly_chart(fig, use_container_width=True)
+
+    # --- Top pairs ---
+    def with_names(pairs):
+        pairs.insert(1, "First Company", pairs["First"].map(tickers_companies_dict))
+        pairs.insert(3, "Second Company", pairs["Second"].map(tickers_companies_dict))
+        return pairs
+
+    col1, col2 = st.columns(2)
+    col1.subheader("Most correlated")
+    col1.dataframe(with_names(top_pairs(corr, tickers, n=int(pairs_count))), use_container_width=True)
+    col2.subheader("Least correlated")
+    col2.dataframe(with_names(top_pairs(corr, tickers, n=int(pairs_count), most=False)), use_container_width=True)
+
+    # --- Betas ---
+    st.subheader("Betas")
+    benchmark = st.selectbox("Against", tickers, format_func=lambda t: f"{t} - {tickers_companies_dict.get(t, t)}")
+    j = tickers.index(benchmark)
+    betas = pd.DataFrame({
+        "Company": [tickers_companies_dict.get(t, t) for t in tickers],
+        "Beta": beta[:, j],
+        "Correlation": corr[:, j],
+    }, index=pd.Index(tickers, name="Ticker")).drop(benchmark).sort_values("Beta", ascending=False)
+    st.dataframe(betas, use_container_width=True)
+
+    if failures:
+        with st.expander(f"{len(failures)} tickers could not be loaded"):
+            st.write(failures)
+
+
+if __name__ == "__main__":
+    main()
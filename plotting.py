@@ -1,25 +1,379 @@
+import time
+
 import streamlit as st
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import numpy as np
 import pandas as pd
-from indicators import (
-    calculate_macd, calculate_atr, calculate_obv,
-    calculate_stochastic, calculate_rsi, calculate_sma,
-    calculate_bollinger_bands
-)
+from indicators import add_indicators, fingerprint, indicator_requests
+from lru_cache import LRUCache
+from downsampling import DEFAULT_MAX_POINTS, aggregate_extreme, aggregate_ohlc, downsample_series
+
+# Chart layouts: 'overlay' draws every indicator on its own y-axis over the price
+# chart (SVG); 'stacked' gives price, volume and each oscillator a pane on a shared
+# x-axis and draws lines with WebGL; 'auto' picks 'stacked' for long histories
+CHART_MODES = ('auto', 'overlay', 'stacked')
+STACKED_ROW_THRESHOLD = 10000
+
+# Built figure parts keyed by (input fingerprint, part, params, max_points, mode)
+FIGURE_PART_CACHE = LRUCache(max_entries=128)
+# Number of reruns kept in the chart build timing table
+BUILD_HISTORY = 20
+
+# y-axis of every pane in overlay mode
+OVERLAY_AXES = {
+    'price': 'y',
+    'volume': 'y2',
+    'rsi': 'y3',
+    'macd': 'y4',
+    'atr': 'y5',
+    'obv': 'y6',
+    'stochastic': 'y7',
+}
+
+def _line(series, max_points):
+    """x and y of a line trace, reduced with LTTB to at most max_points points."""
+    points = downsample_series(series, max_points)
+    return dict(x=points.index, y=points)
+
+def _add_threshold(fig, value, yref, name, color):
+    """Draws a horizontal line across the chart as a shape rather than a full-length trace."""
+    fig.add_shape(
+        type='line',
+        xref='paper', x0=0, x1=1,
+        yref=yref, y0=value, y1=value,
+        line=dict(color=color, dash='dash'),
+        name=name,
+        showlegend=True
+    )
+
+def chart_mode_for(rows, mode='auto'):
+    """Resolves 'auto' to 'stacked' above STACKED_ROW_THRESHOLD rows and 'overlay' below."""
+    if mode not in CHART_MODES:
+        raise ValueError(f"Unknown chart mode {mode!r}; expected one of {CHART_MODES}")
+    if mode == 'auto':
+        return 'stacked' if rows > STACKED_ROW_THRESHOLD else 'overlay'
+    return mode
+
+class _Chart:
+    """
+    Places traces on the panes of a figure: overlaid y-axes of a single plot, or
+    rows of a shared-x subplot grid in stacked mode.
+    """
+
+    def __init__(self, mode, panes):
+        self.stacked = mode == 'stacked'
+        self.rows = {pane: row for row, pane in enumerate(panes, start=1)}
+        if self.stacked:
+            self.fig = make_subplots(
+                rows=len(panes),
+                cols=1,
+                shared_xaxes=True,
+                vertical_spacing=0.02,
+                row_heights=[3] + [1] * (len(panes) - 1)
+            )
+        else:
+            self.fig = go.Figure()
+        # WebGL lines stay interactive with many points; SVG keeps the overlay look
+        self.Line = go.Scattergl if self.stacked else go.Scatter
+
+    def add(self, trace, pane):
+        if self.stacked:
+            self.fig.add_trace(trace, row=self.rows[pane], col=1)
+        else:
+            # add_trace copies the trace, so cached parts are left untouched
+            self.fig.add_trace(trace)
+            self.fig.data[-1].yaxis = OVERLAY_AXES[pane]
+
+    def yref(self, pane):
+        if self.stacked:
+            row = self.rows[pane]
+            return 'y' if row == 1 else f'y{row}'
+        return OVERLAY_AXES[pane]
+
+    def axis(self, pane, title, range=None, **overlay):
+        """Titles the pane's y-axis; overlay holds the placement used in overlay mode."""
+        if self.stacked:
+            self.fig.update_yaxes(title_text=title, range=range, row=self.rows[pane], col=1)
+        else:
+            axis = dict(title=title, overlaying='y', side='right', **overlay)
+            if range is not None:
+                axis['range'] = range
+            self.fig.update_layout({'yaxis' + OVERLAY_AXES[pane][1:]: axis})
+
+class _Part:
+    """Traces, threshold lines and y-axis settings that one indicator adds to its pane."""
+
+    def __init__(self):
+        self.traces = []
+        self.thresholds = []
+        self.axis = None
+
+def _price_part(df, Line, max_points, column=None):
+    part = _Part()
+    if column is not None:
+        part.traces.append(Line(
+            **_line(df[column], max_points),
+            name=column,
+            line=dict(color='blue')
+        ))
+        return part
+    # Candles are merged over runs of rows to fit the point budget
+    bars = aggregate_ohlc(df, max_points)
+    part.traces.append(go.Candlestick(
+        x=bars.index,
+        open=bars['Open'],
+        high=bars['High'],
+        low=bars['Low'],
+        close=bars['Close'],
+        name='Price'
+    ))
+    return part
+
+def _volume_part(df, Line, max_points):
+    part = _Part()
+    bars = aggregate_ohlc(df[['Volume']], max_points)
+    part.traces.append(go.Bar(
+        x=bars.index,
+        y=bars['Volume'],
+        name='Volume'
+    ))
+    part.axis = dict(title="Volume")
+    return part
+
+def _sma_part(df, Line, max_points, period):
+    part = _Part()
+    part.traces.append(Line(
+        **_line(df[f'SMA_{period}'], max_points),
+        name=f'SMA ({period})',
+        line=dict(color='blue')
+    ))
+    return part
+
+def _bollinger_part(df, Line, max_points, period, std_dev):
+    part = _Part()
+    part.traces.append(Line(
+        **_line(df['Upper_Band'], max_points),
+        name=f'Upper Band ({period}, {std_dev})',
+        line=dict(color='rgba(250, 0, 0, 0.5)')
+    ))
+    part.traces.append(Line(
+        **_line(df['Lower_Band'], max_points),
+        name=f'Lower Band ({period}, {std_dev})',
+        line=dict(color='rgba(250, 0, 0, 0.5)')
+    ))
+    return part
+
+def _rsi_part(df, Line, max_points, period, upper, lower):
+    part = _Part()
+    part.traces.append(Line(
+        **_line(df['RSI'], max_points),
+        name='RSI',
+        line=dict(color='purple')
+    ))
+    part.thresholds.append((upper, f'RSI Upper ({upper})', 'rgba(250, 0, 0, 0.5)'))
+    part.thresholds.append((lower, f'RSI Lower ({lower})', 'rgba(0, 250, 0, 0.5)'))
+    part.axis = dict(title="RSI", range=[0, 100], anchor="free", position=1.0)
+    return part
+
+def _macd_part(df, Line, max_points, fast_period, slow_period, signal_period):
+    part = _Part()
+    part.traces.append(Line(
+        **_line(df['MACD'], max_points),
+        name='MACD',
+        line=dict(color='blue')
+    ))
+    part.traces.append(Line(
+        **_line(df['MACD_Signal'], max_points),
+        name='MACD Signal',
+        line=dict(color='red')
+    ))
+    histogram = aggregate_extreme(df['MACD_Histogram'], max_points)
+    part.traces.append(go.Bar(
+        x=histogram.index,
+        y=histogram,
+        name='MACD Histogram',
+        marker=dict(
+            # Numeric colours mapped through a two-step scale validate far faster
+            # than one colour string per bar
+            color=(histogram >= 0).astype(np.int8),
+            colorscale=[[0, 'red'], [1, 'green']],
+            cmin=0,
+            cmax=1,
+            opacity=0.7
+        )
+    ))
+    part.axis = dict(title="MACD", anchor="free", position=0.95)
+    return part
+
+def _atr_part(df, Line, max_points, period):
+    part = _Part()
+    part.traces.append(Line(
+        **_line(df['ATR'], max_points),
+        name=f'ATR ({period})',
+        line=dict(color='orange')
+    ))
+    part.axis = dict(title="ATR", anchor="free", position=0.90)
+    return part
 
-def plot_stock_chart(df, ticker, tickers_companies_dict, indicator_params):
+def _obv_part(df, Line, max_points):
+    part = _Part()
+    part.traces.append(Line(
+        **_line(df['OBV'], max_points),
+        name='OBV',
+        line=dict(color='brown')
+    ))
+    part.axis = dict(title="OBV", anchor="free", position=0.85)
+    return part
+
+def _stochastic_part(df, Line, max_points, k_period, d_period):
+    part = _Part()
+    part.traces.append(Line(
+        **_line(df['%K'], max_points),
+        name='%K',
+        line=dict(color='blue')
+    ))
+    part.traces.append(Line(
+        **_line(df['%D'], max_points),
+        name='%D',
+        line=dict(color='red')
+    ))
+    part.thresholds.append((80, 'Overbought (80)', 'rgba(250, 0, 0, 0.5)'))
+    part.thresholds.append((20, 'Oversold (20)', 'rgba(0, 250, 0, 0.5)'))
+    part.axis = dict(title="Stochastic", range=[0, 100], anchor="free", position=0.80)
+    return part
+
+# Figure part name -> builder(df, Line, max_points, **params); parts are drawn in this order
+# and each one goes on the pane named in PART_PANES (default: its own pane)
+PART_BUILDERS = {
+    'price': _price_part,
+    'volume': _volume_part,
+    'sma': _sma_part,
+    'bollinger_bands': _bollinger_part,
+    'rsi': _rsi_part,
+    'macd': _macd_part,
+    'atr': _atr_part,
+    'obv': _obv_part,
+    'stochastic': _stochastic_part,
+}
+PART_PANES = {'sma': 'price', 'bollinger_bands': 'price'}
+
+def chart_parts(df, indicator_params):
+    """
+    Lists the (part name, params) pairs to draw for the indicators enabled in the
+    sidebar. params hold every setting a part's traces depend on, indicator periods
+    included, because they are part of its cache key.
+    """
+    has = lambda *cols: all(col in df.columns for col in cols)
+    parts = []
+    if indicator_params["volume_flag"] and has('Volume'):
+        parts.append(('volume', {}))
+    if indicator_params["sma_flag"] and has('Close'):
+        parts.append(('sma', {'period': indicator_params["sma_periods"]}))
+    if indicator_params["bb_flag"] and has('Close'):
+        parts.append(('bollinger_bands', {'period': indicator_params["bb_periods"],
+                                          'std_dev': indicator_params["bb_std"]}))
+    if indicator_params["rsi_flag"] and has('Close'):
+        parts.append(('rsi', {'period': indicator_params["rsi_periods"],
+                              'upper': indicator_params["rsi_upper"],
+                              'lower': indicator_params["rsi_lower"]}))
+    if indicator_params["macd_flag"] and has('Close'):
+        parts.append(('macd', {'fast_period': indicator_params["macd_fast"],
+                               'slow_period': indicator_params["macd_slow"],
+                               'signal_period': indicator_params["macd_signal"]}))
+    if indicator_params["atr_flag"] and has('High', 'Low', 'Close'):
+        parts.append(('atr', {'period': indicator_params["atr_period"]}))
+    if indicator_params["obv_flag"] and has('Close', 'Volume'):
+        parts.append(('obv', {}))
+    if indicator_params["stoch_flag"] and has('High', 'Low', 'Close'):
+        parts.append(('stochastic', {'k_period': indicator_params["stoch_k"],
+                                     'd_period': indicator_params["stoch_d"]}))
+    return parts
+
+def build_figure(df, parts, max_points=DEFAULT_MAX_POINTS, mode='overlay', cache=FIGURE_PART_CACHE):
+    """
+    Assembles a figure from parts, a list of (part name, params) pairs starting with
+    'price'; df must already hold the indicator columns the parts draw. Each part is
+    built once per (input fingerprint, part, params, max_points, mode) and reused
+    from cache afterwards, so toggling one indicator only rebuilds its own traces.
+    Pass cache=None to rebuild everything. Returns (figure, parts served from cache).
+    """
+    panes = list(dict.fromkeys(PART_PANES.get(name, name) for name, _ in parts))
+    chart = _Chart(mode, panes)
+    fig = chart.fig
+    data_key = fingerprint(df) if cache is not None else None
+    hits = 0
+    for name, params in parts:
+        key = (data_key, name, tuple(sorted(params.items())), max_points, mode)
+        part = cache.get(key) if cache is not None else None
+        if part is None:
+            part = PART_BUILDERS[name](df, chart.Line, max_points, **params)
+            if cache is not None:
+                cache.put(key, part)
+        else:
+            hits += 1
+
+        pane = PART_PANES.get(name, name)
+        for trace in part.traces:
+            chart.add(trace, pane)
+        for value, label, color in part.thresholds:
+            _add_threshold(fig, value, chart.yref(pane), label, color)
+        if part.axis is not None:
+            chart.axis(pane, **part.axis)
+
+    fig.update_layout(
+        yaxis_title='Price',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        height=450 + 170 * (len(panes) - 1) if chart.stacked else 800
+    )
+    fig.update_xaxes(rangeslider_visible=False)
+    if chart.stacked:
+        fig.update_xaxes(title_text='Date', row=len(panes), col=1)
+    else:
+        fig.update_layout(xaxis_title='Date')
+    return fig, hits
+
+def _record_build_time(**timing):
+    """Shows this rerun's figure-build timing and keeps the last few in the session."""
+    history = st.session_state.setdefault('chart_build_times', [])
+    history.append(timing)
+    del history[:-BUILD_HISTORY]
+    st.caption(
+        f"Figure built in {timing['indicators_ms'] + timing['figure_ms']:.0f} ms "
+        f"(indicators {timing['indicators_ms']:.0f} ms, figure {timing['figure_ms']:.0f} ms; "
+        f"{timing['cached_parts']} of {timing['parts']} parts from cache)"
+    )
+    with st.expander("Chart build timings"):
+        st.dataframe(pd.DataFrame(history[::-1]).round(1), use_container_width=True)
+
+def plot_stock_chart(df, ticker, tickers_companies_dict, indicator_params, max_points=DEFAULT_MAX_POINTS,
+                     mode='auto'):
     """
     Generates and displays a stock chart with selected technical indicators.
+    Every trace is downsampled to at most max_points points (LTTB for lines, merged
+    bars for candles and histograms); mode is one of CHART_MODES. Traces are reused
+    from FIGURE_PART_CACHE when their inputs are unchanged. Returns the figure.
     """
     title_str = f"{tickers_companies_dict[ticker]}'s stock price"
 
     try:
-        fig = go.Figure()
+        start = time.perf_counter()
+
+        # Compute every enabled indicator in one pass with shared intermediates
+        df = add_indicators(df, indicator_requests(indicator_params))
+        indicators_done = time.perf_counter()
 
         # Check if we have the necessary columns for a candlestick chart
         required_ohlc_cols = ['Open', 'High', 'Low', 'Close']
         has_ohlc = all(col in df.columns for col in required_ohlc_cols)
+        price = ('price', {})
+        cache = FIGURE_PART_CACHE
 
         if not has_ohlc:
             st.error(f"Missing required columns for candlestick chart: {', '.join([col for col in required_ohlc_cols if col not in df.columns])}")
@@ -32,252 +386,34 @@ def plot_stock_chart(df, ticker, tickers_companies_dict, indicator_params):
                     price_col = col_candidate
                     break
 
-            if price_col:
-                fig.add_trace(go.Scatter(
-                    x=df.index,
-                    y=df[price_col],
-                    name=price_col,
-                    line=dict(color='blue')
-                ))
-            else:
+            if not price_col:
                 # Just use the first numeric column if no common price column is found
                 numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
                 if len(numeric_cols) > 0:
                     price_col = numeric_cols[0]
-                    fig.add_trace(go.Scatter(
-                        x=df.index,
-                        y=df[price_col],
-                        name=price_col,
-                        line=dict(color='blue')
-                    ))
                 else:
                     st.error("No numeric columns found for plotting.")
                     return # Exit if no data to plot
 
-        else:
-            # Add candlestick trace
-            fig.add_trace(go.Candlestick(
-                x=df.index,
-                open=df['Open'],
-                high=df['High'],
-                low=df['Low'],
-                close=df['Close'],
-                name='Price'
-            ))
-
-        # Add Volume if requested and available
-        if indicator_params["volume_flag"] and 'Volume' in df.columns:
-            fig.add_trace(go.Bar(
-                x=df.index,
-                y=df['Volume'],
-                name='Volume',
-                yaxis='y2'
-            ))
-            fig.update_layout(
-                yaxis2=dict(
-                    title="Volume",
-                    overlaying="y",
-                    side="right"
-                )
-            )
-
-        # Add SMA if requested
-        if indicator_params["sma_flag"] and 'Close' in df.columns:
-            df = calculate_sma(df, indicator_params["sma_periods"])
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df[f'SMA_{indicator_params["sma_periods"]}'],
-                name=f'SMA ({indicator_params["sma_periods"]})',
-                line=dict(color='blue')
-            ))
-
-        # Add Bollinger Bands if requested
-        if indicator_params["bb_flag"] and 'Close' in df.columns:
-            df = calculate_bollinger_bands(df, indicator_params["bb_periods"], indicator_params["bb_std"])
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['Upper_Band'],
-                name=f'Upper Band ({indicator_params["bb_periods"]}, {indicator_params["bb_std"]})',
-                line=dict(color='rgba(250, 0, 0, 0.5)')
-            ))
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['Lower_Band'],
-                name=f'Lower Band ({indicator_params["bb_periods"]}, {indicator_params["bb_std"]})',
-                line=dict(color='rgba(250, 0, 0, 0.5)')
-            ))
-
-        # Add RSI if requested
-        if indicator_params["rsi_flag"] and 'Close' in df.columns:
-            df = calculate_rsi(df, indicator_params["rsi_periods"])
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['RSI'],
-                name='RSI',
-                yaxis='y3',
-                line=dict(color='purple')
-            ))
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=[indicator_params["rsi_upper"]] * len(df),
-                name=f'RSI Upper ({indicator_params["rsi_upper"]})',
-                yaxis='y3',
-                line=dict(color='rgba(250, 0, 0, 0.5)', dash='dash')
-            ))
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=[indicator_params["rsi_lower"]] * len(df),
-                name=f'RSI Lower ({indicator_params["rsi_lower"]})',
-                yaxis='y3',
-                line=dict(color='rgba(0, 250, 0, 0.5)', dash='dash')
-            ))
-            fig.update_layout(
-                yaxis3=dict(
-                    title="RSI",
-                    anchor="free",
-                    overlaying="y",
-                    side="right",
-                    position=1.0,
-                    range=[0, 100]
-                )
-            )
-
-        # Add MACD if requested
-        if indicator_params["macd_flag"] and 'Close' in df.columns:
-            df = calculate_macd(df, indicator_params["macd_fast"], indicator_params["macd_slow"], indicator_params["macd_signal"])
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['MACD'],
-                name='MACD',
-                yaxis='y4',
-                line=dict(color='blue')
-            ))
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['MACD_Signal'],
-                name='MACD Signal',
-                yaxis='y4',
-                line=dict(color='red')
-            ))
-            fig.add_trace(go.Bar(
-                x=df.index,
-                y=df['MACD_Histogram'],
-                name='MACD Histogram',
-                yaxis='y4',
-                marker=dict(
-                    color=np.where(df['MACD_Histogram'] >= 0, 'green', 'red'),
-                    opacity=0.7
-                )
-            ))
-            fig.update_layout(
-                yaxis4=dict(
-                    title="MACD",
-                    anchor="free",
-                    overlaying="y",
-                    side="right",
-                    position=0.95
-                )
-            )
-
-        # Add ATR if requested
-        if indicator_params["atr_flag"] and all(col in df.columns for col in ['High', 'Low', 'Close']):
-            df = calculate_atr(df, indicator_params["atr_period"])
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['ATR'],
-                name=f'ATR ({indicator_params["atr_period"]})',
-                yaxis='y5',
-                line=dict(color='orange')
-            ))
-            fig.update_layout(
-                yaxis5=dict(
-                    title="ATR",
-                    anchor="free",
-                    overlaying="y",
-                    side="right",
-                    position=0.90
-                )
-            )
-
-        # Add OBV if requested
-        if indicator_params["obv_flag"] and all(col in df.columns for col in ['Close', 'Volume']):
-            df = calculate_obv(df)
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['OBV'],
-                name='OBV',
-                yaxis='y6',
-                line=dict(color='brown')
-            ))
-            fig.update_layout(
-                yaxis6=dict(
-                    title="OBV",
-                    anchor="free",
-                    overlaying="y",
-                    side="right",
-                    position=0.85
-                )
-            )
+            price = ('price', {'column': price_col})
+            # The input fingerprint only covers the OHLCV columns
+            cache = None
 
-        # Add Stochastic Oscillator if requested
-        if indicator_params["stoch_flag"] and all(col in df.columns for col in ['High', 'Low', 'Close']):
-            df = calculate_stochastic(df, indicator_params["stoch_k"], indicator_params["stoch_d"])
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['%K'],
-                name='%K',
-                yaxis='y7',
-                line=dict(color='blue')
-            ))
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['%D'],
-                name='%D',
-                yaxis='y7',
-                line=dict(color='red')
-            ))
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=[80] * len(df),
-                name='Overbought (80)',
-                yaxis='y7',
-                line=dict(color='rgba(250, 0, 0, 0.5)', dash='dash')
-            ))
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=[20] * len(df),
-                name='Oversold (20)',
-                yaxis='y7',
-                line=dict(color='rgba(0, 250, 0, 0.5)', dash='dash')
-            ))
-            fig.update_layout(
-                yaxis7=dict(
-                    title="Stochastic",
-                    anchor="free",
-                    overlaying="y",
-                    side="right",
-                    position=0.80,
-                    range=[0, 100]
-                )
-            )
-
-        # Update layout
-        fig.update_layout(
-            title=title_str,
-            xaxis_title='Date',
-            yaxis_title='Price',
-            xaxis_rangeslider_visible=False,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            height=800
-        )
+        parts = [price] + chart_parts(df, indicator_params)
+        fig, hits = build_figure(df, parts, max_points, chart_mode_for(len(df), mode), cache)
+        fig.update_layout(title=title_str)
+        figure_done = time.perf_counter()
 
         st.plotly_chart(fig, use_container_width=True)
+        if max_points is not None and len(df) > max_points:
+            st.caption(f"Showing at most {max_points:,} points per trace for {len(df):,} rows; zoom in by narrowing the date range.")
+        _record_build_time(
+            indicators_ms=(indicators_done - start) * 1e3,
+            figure_ms=(figure_done - indicators_done) * 1e3,
+            parts=len(parts),
+            cached_parts=hits,
+        )
+        return fig
 
     except Exception as e:
         st.error(f"Error generating chart: {str(e)}")
@@ -0,0 +1,264 @@
+import functools
+import json
+import os
+import threading
+
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay, USMartinLutherKingJr, USMemorialDay,
+    USPresidentsDay, USThanksgivingDay, nearest_workday, sunday_to_monday,
+)
+from pandas.tseries.offsets import CustomBusinessDay
+
+DEFAULT_STORE_DIR = os.getenv("PRICE_STORE_DIR", ".price_store")
+
+# Bar intervals downloaded from Yahoo, finest first; coarser views are resampled locally
+NATIVE_INTERVALS = ("1m", "5m", "1h", "1d")
+# How far back Yahoo serves each intraday interval, and the longest window per request, in days
+INTRADAY_LOOKBACK_DAYS = {"1m": 29, "5m": 59, "1h": 729}
+MAX_REQUEST_DAYS = {"1m": 7}
+# Intraday bars are stored as naive wall-clock times of the exchange
+EXCHANGE_TZ = "America/New_York"
+
+
+def yfinance_fetcher(symbol, start, end, interval="1d"):
+    """
+    Downloads OHLCV bars for one symbol over [start, end) from Yahoo Finance, under
+    the shared Yahoo rate limit and over its pooled session. Intraday windows longer
+    than Yahoo allows per request are fetched in pieces. Network and throttling
+    errors are raised (and retried by the provider); a window without bars comes
+    back empty.
+    """
+    import yfinance as yf
+    from yfinance.exceptions import YFPricesMissingError
+    from schema import normalize_schema
+    from upstream import get_provider
+
+    yahoo = get_provider("yahoo")
+
+    def download(window_start, window_end):
+        # yf.download logs failures and returns an empty frame; with raise_errors
+        # history raises them, so a failed download is never recorded as covered
+        try:
+            return yf.Ticker(symbol, session=yahoo.session).history(
+                start=window_start, end=window_end, interval=interval, actions=False, raise_errors=True)
+        except YFPricesMissingError:
+            # Yahoo has no bars in the window; _merge decides whether that can be right
+            return pd.DataFrame()
+
+    step = pd.Timedelta(days=MAX_REQUEST_DAYS.get(interval, 36500))
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    windows = pd.date_range(start, end, freq=step, inclusive="left")
+    frames = [yahoo.call(download, s, min(s + step, end)) for s in windows]
+    frames = [normalize_schema(frame) for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    data = pd.concat(frames)
+    if data.index.tz is not None:
+        data.index = data.index.tz_convert(EXCHANGE_TZ).tz_localize(None)
+    return data[~data.index.duplicated(keep="last")]
+
+
+class _ExchangeHolidays(AbstractHolidayCalendar):
+    """Full-day NYSE holidays; unscheduled closures are not included."""
+    rules = [
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas Day", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+SESSION_DAY = CustomBusinessDay(calendar=_ExchangeHolidays())
+
+
+def has_sessions(start, end):
+    """
+    True when [start, end) holds a trading session that has already closed, so a
+    download of it must return bars. Weekends, holidays and today never do.
+    """
+    start, end = _to_day(start), min(_to_day(end), _to_day(pd.Timestamp.now()))
+    return start < end and len(pd.date_range(start, end - pd.Timedelta(days=1), freq=SESSION_DAY)) > 0
+
+
+def _to_day(value):
+    """Converts a date-like value to a midnight Timestamp."""
+    return pd.Timestamp(value).normalize()
+
+
+def _slice(data, start, end):
+    """Returns the rows of data whose index falls in [start, end)."""
+    if data.empty:
+        return data
+    return data.loc[(data.index >= start) & (data.index < end)]
+
+
+def _merge_ranges(ranges):
+    """Merges overlapping or touching [start, end) ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _missing_ranges(covered, start, end):
+    """Returns the parts of [start, end) that are not inside any covered range."""
+    missing = []
+    cursor = start
+    for cov_start, cov_end in covered:
+        if cov_end <= cursor:
+            continue
+        if cov_start >= end:
+            break
+        if cov_start > cursor:
+            missing.append((cursor, cov_start))
+        cursor = max(cursor, cov_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+class PriceStore:
+    """
+    Local per-ticker Parquet store of OHLCV bars at one interval (daily by default).
+    Only the date ranges not already on disk are fetched, merged in and persisted,
+    so widening a window by one day costs one bar of network I/O. Intraday stores
+    only reach back as far as Yahoo serves that interval.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, fetcher=None, interval="1d"):
+        self.root = root
+        self.interval = interval
+        self.fetcher = fetcher or functools.partial(yfinance_fetcher, interval=interval)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _lock(self, symbol):
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _data_path(self, symbol):
+        return os.path.join(self.root, f"{symbol}.parquet")
+
+    def _meta_path(self, symbol):
+        return os.path.join(self.root, f"{symbol}.json")
+
+    def coverage(self, symbol):
+        """Returns the list of [start, end) Timestamp ranges already fetched for a symbol."""
+        try:
+            with open(self._meta_path(symbol)) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+        return [[pd.Timestamp(s), pd.Timestamp(e)] for s, e in meta.get("coverage", [])]
+
+    def read(self, symbol):
+        """Reads every stored bar for a symbol, or an empty frame if nothing is stored."""
+        path = self._data_path(symbol)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_parquet(path)
+
+    def _write(self, symbol, data, coverage):
+        # Write to temporary files first so a crash never leaves a half-written store
+        data_path = self._data_path(symbol)
+        meta_path = self._meta_path(symbol)
+        data.to_parquet(data_path + ".tmp")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({"coverage": [[s.isoformat(), e.isoformat()] for s, e in coverage]}, f)
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def earliest(self):
+        """The oldest day Yahoo still serves at this interval, or None for daily bars."""
+        days = INTRADAY_LOOKBACK_DAYS.get(self.interval)
+        return _to_day(pd.Timestamp.now()) - pd.Timedelta(days=days) if days else None
+
+    def _clamp(self, start):
+        earliest = self.earliest()
+        return max(_to_day(start), earliest) if earliest is not None else _to_day(start)
+
+    def covers(self, symbol, start, end):
+        """True when every bar of [start, end) is already stored, with nothing to download."""
+        earliest = self.earliest()
+        return (earliest is None or _to_day(start) >= earliest) and not self.missing(symbol, start, end)
+
+    def get(self, symbol, start, end):
+        """
+        Returns bars for symbol in [start, end), downloading only the missing ranges.
+        Today's bar is never marked as covered because it may still be forming, nor
+        is a range that came back empty although it holds trading sessions.
+        """
+        start, end = self._clamp(start), _to_day(end)
+        if start >= end:
+            return self.read(symbol).iloc[0:0]
+
+        with self._lock(symbol):
+            missing = self.missing(symbol, start, end)
+            fetched = [(s, e, self.fetcher(symbol, s, e)) for s, e in missing]
+            data = self._merge(symbol, fetched)
+
+        return _slice(data, start, end)
+
+    def missing(self, symbol, start, end):
+        """Returns the [start, end) ranges of a window that are not stored yet."""
+        return _missing_ranges(self.coverage(symbol), self._clamp(start), _to_day(end))
+
+    def put(self, symbol, data, start, end):
+        """Merges externally fetched bars covering [start, end) into the store."""
+        with self._lock(symbol):
+            self._merge(symbol, [(_to_day(start), _to_day(end), data)])
+
+    def _merge(self, symbol, fetched):
+        # Caller holds the symbol lock; fetched is a list of (start, end, frame)
+        data = self.read(symbol)
+        if not fetched:
+            return data
+
+        frames = [data] if not data.empty else []
+        frames += [frame for _, _, frame in fetched if frame is not None and not frame.empty]
+        if frames:
+            data = pd.concat(frames)
+            data = data[~data.index.duplicated(keep="last")].sort_index()
+            data.index.name = "Date"
+
+        today = _to_day(pd.Timestamp.now())
+        # An empty download is only trusted when the range cannot hold a session;
+        # otherwise it is a failure and the range stays missing so it is retried
+        new_ranges = [[s, min(e, today)] for s, e, frame in fetched
+                      if s < today and ((frame is not None and not frame.empty) or not has_sessions(s, e))]
+        self._write(symbol, data, _merge_ranges(self.coverage(symbol) + new_ranges))
+        return data
+
+    def clear(self, symbol=None):
+        """Deletes the stored bars for one symbol, or for every symbol."""
+        names = os.listdir(self.root) if symbol is None else [f"{symbol}.parquet", f"{symbol}.json"]
+        for name in names:
+            path = os.path.join(self.root, name)
+            if os.path.isfile(path):
+                os.remove(path)
+
+
+_default_stores = {}
+_default_store_lock = threading.Lock()
+
+
+def get_price_store(interval="1d"):
+    """Returns the process-wide PriceStore for an interval, backed by yfinance."""
+    with _default_store_lock:
+        if interval not in _default_stores:
+            root = DEFAULT_STORE_DIR if interval == "1d" else os.path.join(DEFAULT_STORE_DIR, interval)
+            _default_stores[interval] = PriceStore(root, interval=interval)
+        return _default_stores[interval]
@@ -0,0 +1,222 @@
+import json
+import time
+
+from fan_out import Branch, FanOutTeam
+from span_profiler import load_traces
+from tool_cache import cache_tools
+
+# Characters per streamed chunk when a recording has no chunking of its own
+DEFAULT_CHUNK_SIZE = 16
+
+
+class ReplayChunk:
+    """Stand-in for an agno streamed content event."""
+
+    event = "RunResponseContent"
+
+    def __init__(self, content):
+        self.content = content
+
+
+class ReplayResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+def _arguments(text):
+    """Tool arguments from a recording: JSON, or AgentOps' 'name=value, ...' form."""
+    if not text:
+        return {}
+    try:
+        arguments = json.loads(text)
+    except ValueError:
+        return dict(part.strip().split("=", 1) for part in text.split(",") if "=" in part)
+    return arguments if isinstance(arguments, dict) else {}
+
+
+def _key(arguments):
+    return json.dumps(arguments, sort_keys=True, default=repr)
+
+
+class ReplayFunction:
+    def __init__(self, entrypoint):
+        self.entrypoint = entrypoint
+
+
+class ReplayTools:
+    """
+    Toolkit-shaped replay of recorded tool calls: functions[name].entrypoint(**arguments)
+    returns the recorded result after the recorded latency. A call with arguments
+    that were not recorded gets the first recorded result of that tool.
+    """
+
+    def __init__(self, calls, latency_scale=1.0, sleep=time.sleep):
+        self.latency_scale = latency_scale
+        self.sleep = sleep
+        self.upstream_calls = 0
+        self._calls = {}
+        for name, arguments, result, seconds in calls:
+            self._calls.setdefault(name, {}).setdefault(_key(arguments), (result, seconds))
+        self.functions = {name: ReplayFunction(self._entrypoint(name)) for name in self._calls}
+
+    def _entrypoint(self, name):
+        def entrypoint(**arguments):
+            recorded = self._calls[name]
+            result, seconds = recorded.get(_key(arguments)) or next(iter(recorded.values()))
+            self.upstream_calls += 1
+            if seconds > 0:
+                self.sleep(seconds * self.latency_scale)
+            return result
+        entrypoint.__name__ = name
+        return entrypoint
+
+
+class ReplayAgent:
+    """
+    Replays one recorded agent or team run. steps are ('think', seconds) for time
+    the agent spent on its own (mostly waiting on the model), ('tool', name,
+    arguments) and ('member', agent); after them the answer arrives after
+    `first_chunk_s` and streams over `stream_s`. A route team whose last step is
+    a member forwards that member's answer, as agno's route mode does.
+    """
+
+    def __init__(self, name, steps, answer, first_chunk_s=0.0, stream_s=0.0, tools=None,
+                 latency_scale=1.0, chunk_size=DEFAULT_CHUNK_SIZE, sleep=time.sleep):
+        self.name = name
+        self.steps = steps
+        self.answer = answer
+        self.first_chunk_s = first_chunk_s
+        self.stream_s = stream_s
+        self.tools = [tools] if tools is not None else []
+        self.members = [step[1] for step in steps if step[0] == 'member']
+        self.latency_scale = latency_scale
+        self.chunk_size = chunk_size
+        self.sleep = sleep
+
+    def _pause(self, seconds):
+        # sleep(0) still costs a system call; a 4 kB answer streams in ~250 chunks
+        if seconds > 0:
+            self.sleep(seconds * self.latency_scale)
+
+    def _chunks(self, message):
+        for i, step in enumerate(self.steps):
+            if step[0] == 'think':
+                self._pause(step[1])
+            elif step[0] == 'tool':
+                self.tools[0].functions[step[1]].entrypoint(**step[2])
+            elif i == len(self.steps) - 1:
+                yield from step[1].run(message=message, stream=True)
+                return
+            else:
+                step[1].run(message=message)
+        self._pause(self.first_chunk_s)
+        pieces = [self.answer[i:i + self.chunk_size] for i in range(0, len(self.answer), self.chunk_size)]
+        delay = self.stream_s / max(len(pieces) - 1, 1)
+        for i, piece in enumerate(pieces):
+            if i:
+                self._pause(delay)
+            yield ReplayChunk(piece)
+
+    def run(self, message, stream=False, **kwargs):
+        if stream:
+            return self._chunks(message)
+        return ReplayResponse("".join(chunk.content for chunk in self._chunks(message)))
+
+
+def _tool_calls(trace):
+    return [(span.name, _arguments(span.attributes.get('arguments')), span.attributes.get('result', ""), span.seconds)
+            for span in trace.spans if span.kind == 'tool']
+
+
+def _build_agent(trace, span, tools, **options):
+    steps = []
+    cursor = span.start_ns
+    for child in sorted(trace.children(span), key=lambda child: child.start_ns):
+        # LLM spans are not steps: their time, and any gap, is the agent's own time
+        if child.kind == 'llm':
+            continue
+        if child.start_ns > cursor:
+            steps.append(('think', (child.start_ns - cursor) / 1e9))
+        if child.kind == 'tool':
+            steps.append(('tool', child.name, _arguments(child.attributes.get('arguments'))))
+        else:
+            steps.append(('member', _build_agent(trace, child, tools, **options)))
+        cursor = max(cursor, child.end_ns)
+
+    # Without a recorded first chunk (a non-streamed run) the answer arrives at the end
+    end = (span.start_ns + int(span.attributes['first_chunk_s'] * 1e9)
+           if 'first_chunk_s' in span.attributes else span.end_ns)
+    return ReplayAgent(span.name, steps, span.attributes.get('output', ""),
+                       first_chunk_s=max(end - cursor, 0) / 1e9, stream_s=max(span.end_ns - end, 0) / 1e9,
+                       tools=tools, **options)
+
+
+def replay_team(trace, latency_scale=1.0, tool_cache=None, chunk_size=DEFAULT_CHUNK_SIZE, sleep=time.sleep):
+    """
+    Builds a team that replays a recorded trace with the same run() interface as
+    finance_team: a route team or single agent becomes a ReplayAgent tree, a
+    fan-out run a FanOutTeam of replayed branches. Latencies are multiplied by
+    latency_scale; with tool_cache, replayed tool calls go through that cache.
+    """
+    tools = ReplayTools(_tool_calls(trace), latency_scale=latency_scale, sleep=sleep)
+    if tool_cache is not None:
+        cache_tools(tools, cache=tool_cache)
+    options = {'latency_scale': latency_scale, 'chunk_size': chunk_size, 'sleep': sleep}
+    root = trace.root
+    if root.attributes.get('mode') != 'fan_out':
+        return _build_agent(trace, root, tools, **options)
+    # The synthesizer is the agent that starts once every branch has finished
+    agents = sorted(trace.children(root), key=lambda child: child.start_ns)
+    agents = [child for child in agents if child.kind in ('agent', 'team')]
+    synthesizer = agents[-1]
+    return FanOutTeam(
+        branches=[Branch(span.name, lambda span=span: _build_agent(trace, span, tools, **options), "{question}")
+                  for span in agents[:-1]],
+        make_synthesizer=lambda: _build_agent(trace, synthesizer, tools, **options),
+        max_concurrency=len(agents) - 1,
+    )
+
+
+def recorded_latency(trace):
+    """(seconds to the first answer chunk, total seconds) of the recorded run."""
+    root = trace.root
+    first = min((span.start_ns + span.attributes['first_chunk_s'] * 1e9 for span in trace.spans
+                 if 'first_chunk_s' in span.attributes), default=root.end_ns)
+    return (first - root.start_ns) / 1e9, root.seconds
+
+
+def load_fixture(path):
+    """The first recorded run in a fixture file (a SpanRecorder file or an AgentOps export)."""
+    return load_traces(path)[0]
+
+
+if __name__ == "__main__":
+    import argparse
+    import span_profiler
+
+    parser = argparse.ArgumentParser(description="Record finance_team runs as replay fixtures, or replay one.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help="run the live team and save the run as a fixture")
+    record.add_argument('question')
+    record.add_argument('--out', required=True)
+    record.add_argument('--fan-out', action='store_true', help="record the parallel fan-out team")
+    play = commands.add_parser('play', help="replay a fixture and print the answer")
+    play.add_argument('path')
+    play.add_argument('--latency-scale', type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        # Agents built from here on record full tool results and answers
+        span_profiler.RECORDER = span_profiler.SpanRecorder(args.out, payloads=True)
+        import finance_team
+        team = finance_team.finance_fan_out_team if args.fan_out else finance_team.make_finance_team()
+        for chunk in team.run(message=args.question, stream=True):
+            pass
+        print(f"Recorded to {args.out}")
+    else:
+        trace = load_fixture(args.path)
+        start = time.perf_counter()
+        for chunk in replay_team(trace, latency_scale=args.latency_scale).run(message="", stream=True):
+            print(chunk.content, end="", flush=True)
+        print(f"\n\nReplayed in {time.perf_counter() - start:.2f} s "
+              f"(recorded {trace.root.seconds:.2f} s x {args.latency_scale})")
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+from downsampling import OHLC_AGGREGATIONS
+from price_store import EXCHANGE_TZ, NATIVE_INTERVALS
+
+# Regular US equity session, in exchange-local time
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION_MINUTES = 390
+
+# Timeframe -> fixed bar width (intraday, counted from the session open) or calendar period
+TIMEFRAMES = {
+    '1m': pd.Timedelta(minutes=1),
+    '5m': pd.Timedelta(minutes=5),
+    '15m': pd.Timedelta(minutes=15),
+    '30m': pd.Timedelta(minutes=30),
+    '1h': pd.Timedelta(hours=1),
+    '4h': pd.Timedelta(hours=4),
+    '1d': 'D',
+    '1wk': 'W',
+    '1mo': 'M',
+    '3mo': 'Q',
+    '1y': 'Y',
+}
+CALENDAR_PERIODS_PER_YEAR = {'D': 252, 'W': 52, 'M': 12, 'Q': 4, 'Y': 1}
+AGGREGATIONS = {**OHLC_AGGREGATIONS, 'Adj Close': 'last'}
+
+
+def is_intraday(timeframe):
+    return isinstance(TIMEFRAMES[timeframe], pd.Timedelta)
+
+
+def periods_per_year(timeframe):
+    """Bars per year at timeframe, for annualizing returns and volatility."""
+    width = TIMEFRAMES[timeframe]
+    if isinstance(width, pd.Timedelta):
+        return 252 * -(-SESSION_MINUTES // int(width / pd.Timedelta(minutes=1)))
+    return CALENDAR_PERIODS_PER_YEAR[width]
+
+
+def can_build(timeframe, interval):
+    """True when bars at timeframe can be built from bars at a native interval."""
+    target, source = TIMEFRAMES[timeframe], TIMEFRAMES[interval]
+    if not isinstance(target, pd.Timedelta):
+        # Daily and longer bars group whole sessions, whatever they were built from
+        return True
+    # Intraday bars only merge evenly into wider intraday bars
+    return isinstance(source, pd.Timedelta) and target % source == pd.Timedelta(0)
+
+
+def source_intervals(timeframe):
+    """The native intervals timeframe can be built from, finest first."""
+    return [interval for interval in NATIVE_INTERVALS if can_build(timeframe, interval)]
+
+
+def _local(index):
+    # Exchange-local wall-clock times, so sessions and calendar days line up
+    if index.tz is not None:
+        return index.tz_convert(EXCHANGE_TZ).tz_localize(None)
+    return index
+
+
+def _bins(index, timeframe):
+    """(bin key per row, label per row) for grouping rows into bars of timeframe."""
+    local = _local(index)
+    days = local.normalize()
+    width = TIMEFRAMES[timeframe]
+    if isinstance(width, pd.Timedelta):
+        # Bins start at the session open, so 1h bars run 9:30-10:30 and never span two sessions
+        starts = days + SESSION_OPEN + ((local - days - SESSION_OPEN) // width) * width
+        return starts.asi8, starts
+    # Calendar bars are stamped with their first session, as Yahoo does for 1wk/1mo
+    return (days.to_period(width).asi8 if width != 'D' else days.asi8), days
+
+
+def resample_ohlcv(df, timeframe):
+    """
+    Builds bars of timeframe from finer OHLCV bars: first Open, highest High,
+    lowest Low, last Close and Adj Close, summed Volume. Intraday bars are
+    counted from the session open; daily and longer bars group whole sessions by
+    exchange-local date and are labelled with their first session. Columns
+    without an aggregation (dividends, splits) are dropped.
+    """
+    aggregations = {col: how for col, how in AGGREGATIONS.items() if col in df.columns}
+    df = df.dropna(subset=[col for col in ('Close',) if col in df.columns])
+    if df.empty or not aggregations:
+        return df[list(aggregations)]
+    keys, labels = _bins(df.index, timeframe)
+    bars = df[list(aggregations)].groupby(keys, sort=False).agg(aggregations)
+    bars.index = pd.DatetimeIndex(labels[np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))], name=df.index.name)
+    return bars
+
+
+if __name__ == "__main__":
+    import time
+
+    # A year of synthetic 1-minute bars for regular sessions, then every coarser view
+    rng = np.random.default_rng(0)
+    sessions = pd.bdate_range('2024-01-01', periods=252)
+    index = (sessions.repeat(SESSION_MINUTES)
+             + SESSION_OPEN + pd.to_timedelta(np.tile(np.arange(SESSION_MINUTES), len(sessions)), unit='min'))
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, len(index))))
+    minutes = pd.DataFrame({'Open': close, 'High': close * 1.0005, 'Low': close * 0.9995, 'Close': close,
+                            'Volume': rng.integers(100, 10_000, len(index))}, index=index)
+    print(f"{len(minutes):,} one-minute bars")
+    for timeframe in ('5m', '1h', '4h', '1d', '1wk', '1mo', '3mo'):
+        start = time.perf_counter()
+        bars = resample_ohlcv(minutes, timeframe)
+        elapsed = (time.perf_counter() - start) * 1e3
+        print(f"{timeframe:>4}: {len(bars):>6,} bars in {elapsed:6.1f} ms, "
+              f"first {bars.index[0]}, volume conserved: {bars['Volume'].sum() == minutes['Volume'].sum()}")
@@ -0,0 +1,284 @@
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# Answers quote live prices, so they are reused for a limited time only
+DEFAULT_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "900"))
+# Minimum cosine similarity between two questions for one to reuse the other's answer
+DEFAULT_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.6"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+EMBEDDING_DIM = 2048
+
+# Company-name suffixes dropped when building aliases ("NVIDIA Corporation" -> "nvidia")
+_NAME_SUFFIXES = re.compile(
+    r"[,.]?\s+(inc|incorporated|corp|corporation|company|co|ltd|plc|holdings|group|"
+    r"class [a-c]|\(the\)|the)\.?$", re.IGNORECASE)
+_WORD = re.compile(r"[A-Za-z0-9$.&'-]+")
+_FILLER = {
+    'a', 'an', 'the', 'of', 'for', 'on', 'about', 'me', 'please', 'can', 'you', 'give',
+    'tell', 'what', 'is', 'are', 'do', 'does', 'how', 'stock', 'stocks', 'share', 'shares',
+    'i', 'my', 'we', 'our', 'to', 'in', 'at', 'with', 'this', 'which', 'should', 'would',
+    'will', 'be', 'it', 'its', 'any', 'some',
+}
+_NUMBER_WORDS = {
+    'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
+    'six': '6', 'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10',
+}
+
+
+def company_aliases(tickers_companies_dict):
+    """Maps lower-cased company names, without suffixes like 'Inc.', to their tickers."""
+    aliases = {}
+    for ticker, name in tickers_companies_dict.items():
+        short = name
+        while True:
+            stripped = _NAME_SUFFIXES.sub("", short).strip()
+            if stripped == short:
+                break
+            short = stripped
+        for alias in {name.lower(), short.lower()}:
+            if alias:
+                aliases[alias] = ticker
+    return aliases
+
+
+def normalize_query(text, aliases=None, tickers=None):
+    """
+    Returns (normalized text, frozenset of tickers mentioned). Tickers are taken
+    from $-prefixed words, upper-case words found in tickers (any upper-case word
+    of 1-5 letters when tickers is None) and capitalized company names in aliases;
+    each mention is replaced by the ticker in the text. Lower-case words are never
+    read as tickers, so 'now' or 'price target' do not match NOW or Target.
+    """
+    mentioned = set()
+    if aliases:
+        # Longest names first so "Meta Platforms" wins over "Meta"
+        for alias in sorted(aliases, key=len, reverse=True):
+            pattern = re.compile(r"(?<![\w$])" + re.escape(alias) + r"(?!\w)", re.IGNORECASE)
+
+            def replace(match, ticker=aliases[alias]):
+                if not match.group(0)[0].isupper():
+                    return match.group(0)
+                mentioned.add(ticker)
+                return ticker
+            text = pattern.sub(replace, text)
+
+    words = []
+    for word in _WORD.findall(text):
+        word = word.strip(".'-")
+        if not word:
+            continue
+        symbol = word.lstrip("$").upper()
+        if word.startswith("$") or (word.isupper() and (
+                symbol in tickers if tickers is not None else re.fullmatch(r"[A-Z]{1,5}", symbol))):
+            mentioned.add(symbol)
+            words.append(symbol)
+        else:
+            words.append(word.lower())
+    return " ".join(words), frozenset(mentioned)
+
+
+def _features(text):
+    """Word unigrams (minus filler words) and character trigrams of the normalized text."""
+    words = [word for word in text.split() if word not in _FILLER]
+    features = [f"w:{word}" for word in words]
+    for word in words:
+        padded = f" {word} "
+        features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+def content_words(text, tickers=frozenset()):
+    """
+    Stems of the words of a normalized question that carry its meaning: filler
+    words and the tickers (matched separately) are left out. A stem is the first
+    five letters without a plural 's', so 'analyze' and 'analysis' agree while
+    'buy' and 'sell' or 'tech' and 'energy' do not.
+    """
+    stems = set()
+    for word in text.split():
+        if word in _FILLER or word in tickers:
+            continue
+        word = _NUMBER_WORDS.get(word, word)
+        if len(word) > 3 and word.endswith('s'):
+            word = word[:-1]
+        stems.add(word[:5])
+    return frozenset(stems)
+
+
+def embed(text):
+    """
+    Local text embedding: hashed word and character-trigram counts, L2-normalized,
+    so cosine similarity is a dot product. Trigrams let 'analyze' match 'analysis'.
+    """
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for feature in _features(text):
+        bucket = zlib.crc32(feature.encode())
+        vector[bucket % EMBEDDING_DIM] += 1.0 if bucket & 1 << 31 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class CachedResponse:
+    def __init__(self, question, content, seconds, created, similarity=1.0):
+        self.question = question
+        self.content = content
+        self.seconds = seconds
+        self.created = created
+        self.similarity = similarity
+
+
+class ResponseCache:
+    """
+    Semantic cache of team answers. A question reuses a stored answer when it
+    mentions exactly the same tickers and content words, the answer is younger
+    than ttl seconds and the two questions' embeddings have cosine similarity of
+    at least threshold. The embedding alone cannot tell 'buy' from 'sell' or
+    'tech' from 'energy' in otherwise identical questions, so the content words
+    have to match.
+    Holds at most max_entries answers, evicting expired ones first and then the
+    least recently used.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, threshold=DEFAULT_THRESHOLD, max_entries=DEFAULT_MAX_ENTRIES,
+                 aliases=None, tickers=None, clock=time.time):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.aliases = aliases
+        self.tickers = tickers
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        self._entries = []      # CachedResponse per row of _vectors
+        self._keys = []         # (tickers, content words) per row
+        self._used = []         # last use time per row
+        self.counts = {'lookups': 0, 'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0,
+                       'expired': 0, 'saved_s': 0.0}
+
+    def set_aliases(self, aliases, tickers=None):
+        """Sets the company-name aliases and known tickers used to normalize questions."""
+        self.aliases = aliases
+        self.tickers = tickers
+
+    def _key(self, question):
+        """(tickers, content words, embedding) of a question."""
+        text, tickers = normalize_query(question, self.aliases, self.tickers)
+        return (tickers, content_words(text, tickers)), embed(text)
+
+    def _drop(self, rows):
+        keep = np.setdiff1d(np.arange(len(self._entries)), rows)
+        self._vectors = self._vectors[keep]
+        self._entries = [self._entries[i] for i in keep]
+        self._keys = [self._keys[i] for i in keep]
+        self._used = [self._used[i] for i in keep]
+
+    def _expire(self, now):
+        expired = [i for i, entry in enumerate(self._entries) if now - entry.created >= self.ttl]
+        if expired:
+            self._drop(expired)
+            self.counts['expired'] += len(expired)
+
+    def lookup(self, question):
+        """Returns a CachedResponse for a similar recent question, or None."""
+        key, vector = self._key(question)
+        now = self.clock()
+        with self._lock:
+            self.counts['lookups'] += 1
+            self._expire(now)
+            candidates = [i for i, stored in enumerate(self._keys) if stored == key]
+            if candidates:
+                similarities = self._vectors[candidates] @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    row = candidates[best]
+                    entry = self._entries[row]
+                    self._used[row] = now
+                    self.counts['hits'] += 1
+                    self.counts['saved_s'] += entry.seconds
+                    return CachedResponse(entry.question, entry.content, entry.seconds, entry.created,
+                                          similarity=float(similarities[best]))
+            self.counts['misses'] += 1
+            return None
+
+    def store(self, question, content, seconds):
+        """
+        Stores the answer to question; seconds is how long the team took to produce it.
+        Empty answers (a cancelled or failed run) are not stored.
+        """
+        if not content or not content.strip():
+            return
+        key, vector = self._key(question)
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            if len(self._entries) >= self.max_entries:
+                # Least recently used first
+                excess = len(self._entries) - self.max_entries + 1
+                self._drop(np.argsort(self._used, kind='stable')[:excess])
+                self.counts['evictions'] += excess
+            self._vectors = np.vstack([self._vectors, vector[None]])
+            self._entries.append(CachedResponse(question, content, seconds, now))
+            self._keys.append(key)
+            self._used.append(now)
+            self.counts['stores'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._drop(np.arange(len(self._entries)))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Returns the counters, current size and hit rate."""
+        with self._lock:
+            stats = dict(self.counts, entries=len(self._entries))
+        stats['hit_rate'] = stats['hits'] / stats['lookups'] if stats['lookups'] else 0.0
+        return stats
+
+
+# Process-wide cache shared by every chat session
+RESPONSE_CACHE = ResponseCache()
+
+
+if __name__ == "__main__":
+    aliases = company_aliases({
+        'NVDA': 'Nvidia', 'AMD': 'Advanced Micro Devices', 'AAPL': 'Apple Inc.',
+        'TGT': 'Target Corporation', 'NOW': 'ServiceNow', 'META': 'Meta Platforms',
+    })
+    cache = ResponseCache(aliases=aliases, tickers=set(aliases.values()))
+    cache.store("analyze NVDA", "NVDA analysis ...", seconds=9.0)
+    cache.store("What are the top 3 tech stocks to watch this quarter?", "Top picks ...", seconds=12.0)
+    cache.store("What is the outlook for the energy sector?", "Energy outlook ...", seconds=10.0)
+    cache.store("What is the outlook for bonds?", "Bond outlook ...", seconds=10.0)
+    cache.store("Should I buy NVDA?", "Buy case ...", seconds=11.0)
+
+    # (question, whether it should reuse a stored answer)
+    for question, expected in [
+        ("NVIDIA stock analysis?", True),
+        ("Analyze Nvidia", True),
+        ("can you analyze $nvda for me", True),
+        ("analyze AMD", False),
+        ("NVDA price target", False),
+        ("Compare NVDA and AMD", False),
+        ("top three tech stocks to watch this quarter?", True),
+        ("which tech stocks should I watch this quarter", False),
+        ("Energy sector outlook?", True),
+        ("What is the outlook for the tech sector?", False),
+        ("Outlook for bonds", True),
+        ("What is the outlook for bond yields?", False),
+        ("Should I buy Nvidia stock?", True),
+        ("Should I sell NVDA?", False),
+        ("Should I short NVDA?", False),
+    ]:
+        hit = cache.lookup(question)
+        text, tickers = normalize_query(question, aliases, set(aliases.values()))
+        result = f"hit  ({hit.similarity:.2f}) <- {hit.question!r}" if hit else "miss"
+        flag = "" if (hit is not None) == expected else "  UNEXPECTED"
+        print(f"{question!r:52} tickers {sorted(tickers)!s:16} {result}{flag}")
+    print(cache.stats())
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+# Lower-cased yfinance field names mapped to the names used throughout the app
+FIELD_NAMES = {
+    'open': 'Open',
+    'high': 'High',
+    'low': 'Low',
+    'close': 'Close',
+    'adj close': 'Adj Close',
+    'adj_close': 'Adj Close',
+    'adjclose': 'Adj Close',
+    'volume': 'Volume',
+}
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Adj Close']
+
+
+def _canonical(names):
+    """Maps raw field labels to standard names, leaving unknown labels untouched."""
+    return [FIELD_NAMES.get(str(name).strip().lower(), name) for name in names]
+
+
+def _field_level(columns):
+    """Returns the index of the MultiIndex level holding price fields."""
+    best, best_hits = 0, -1
+    for i, values in enumerate(columns.levels):
+        hits = sum(str(v).strip().lower() in FIELD_NAMES for v in values)
+        if hits > best_hits:
+            best, best_hits = i, hits
+    return best
+
+
+def _enforce_dtypes(data, price_dtype):
+    """Casts price columns to price_dtype and Volume to int64, one block per dtype."""
+    fields = data.columns.get_level_values(-1) if isinstance(data.columns, pd.MultiIndex) else data.columns
+    fields = np.asarray(fields, dtype=object)
+    dtypes = data.dtypes.to_numpy()
+    cast_price = np.isin(fields, PRICE_FIELDS) & (dtypes != np.dtype(price_dtype))
+    cast_volume = (fields == 'Volume') & (dtypes != np.dtype(np.int64))
+    if not cast_price.any() and not cast_volume.any():
+        return data
+
+    keep = ~(cast_price | cast_volume)
+    blocks = [data.iloc[:, keep]]
+    if cast_price.any():
+        blocks.append(data.iloc[:, cast_price].astype(price_dtype))
+    if cast_volume.any():
+        # Volume has no meaningful NaN; missing bars trade nothing
+        blocks.append(data.iloc[:, cast_volume].fillna(0).astype(np.int64))
+    positions = np.concatenate([np.flatnonzero(keep), np.flatnonzero(cast_price), np.flatnonzero(cast_volume)])
+    return pd.concat(blocks, axis=1).iloc[:, np.argsort(positions)]
+
+
+def _flat_frame(data, fields, price_dtype):
+    """
+    Single-ticker path: rebuilds the frame column by column from its arrays,
+    which is cheaper than the block-wise relabel and cast for a handful of columns.
+    """
+    columns = {}
+    for field, (_, series) in zip(fields, data.items()):
+        values = series.to_numpy()
+        if field in PRICE_FIELDS:
+            values = values.astype(price_dtype, copy=False)
+        elif field == 'Volume' and values.dtype != np.int64:
+            # Volume has no meaningful NaN; missing bars trade nothing
+            values = np.nan_to_num(values.astype(np.float64, copy=False), nan=0).astype(np.int64)
+        columns[field] = values
+    index = data.index if isinstance(data.index, pd.DatetimeIndex) else pd.to_datetime(data.index)
+    return pd.DataFrame(columns, index=index.rename('Date'), copy=False)
+
+
+def normalize_schema(data, price_dtype=np.float64):
+    """
+    Normalizes a yfinance download to standard field names and compact dtypes.
+    MultiIndex columns are reordered to (Ticker, Field); a frame holding a single
+    ticker is returned with flat Open/High/Low/Close/Volume columns.
+    """
+    if data.empty:
+        return data
+
+    if not isinstance(data.columns, pd.MultiIndex):
+        return _flat_frame(data, _canonical(data.columns), price_dtype)
+
+    columns = data.columns
+    level = _field_level(columns)
+    fields = _canonical(columns.get_level_values(level))
+    if columns.nlevels != 2:
+        return _flat_frame(data, fields, price_dtype)
+    tickers = columns.get_level_values(1 - level)
+    if tickers.nunique() == 1:
+        return _flat_frame(data, fields, price_dtype)
+
+    data = data.set_axis(
+        pd.MultiIndex.from_arrays([tickers, fields], names=['Ticker', 'Field']),
+        axis=1,
+    )
+    data = data.sort_index(axis=1, level=0, sort_remaining=False)
+
+    index = data.index if isinstance(data.index, pd.DatetimeIndex) else pd.to_datetime(data.index)
+    data.index = index.rename('Date')
+
+    return _enforce_dtypes(data, price_dtype)
+
+
+def drop_missing_bars(data):
+    """
+    Drops rows without any price, such as the days before a ticker listed in a
+    multi-ticker download. Volume is ignored because missing volume becomes 0.
+    """
+    prices = [field for field in PRICE_FIELDS if field in data.columns]
+    return data.dropna(subset=prices, how='all') if prices else data.dropna(how='all')
+
+
+def split_tickers(panel):
+    """Splits a (Ticker, Field) panel into a {ticker: DataFrame} dict of flat frames."""
+    if not isinstance(panel.columns, pd.MultiIndex):
+        return {}
+    return {
+        ticker: drop_missing_bars(panel.xs(ticker, axis=1, level='Ticker'))
+        for ticker in panel.columns.get_level_values('Ticker').unique()
+    }
+
+
+if __name__ == "__main__":
+    import timeit
+
+    def legacy_standardize(data):
+        """The former flatten-and-startswith mapping, kept for comparison."""
+        data = data.copy()
+        data.columns = [' '.join(col).strip() for col in data.columns.values]
+        mapping = {}
+        for col in data.columns:
+            for std_col in ['Open', 'High', 'Low', 'Close', 'Volume', 'Adj Close']:
+                if col.startswith(std_col + " ") or col == std_col:
+                    mapping[col] = std_col
+                elif col.lower().startswith(std_col.lower() + " ") or col.lower() == std_col.lower():
+                    mapping[col] = std_col
+        return data.rename(columns=mapping)
+
+    rows = 2520
+    index = pd.bdate_range('2015-01-01', periods=rows)
+    for n_tickers in (1, 50, 500):
+        tickers = [f'T{i:03d}' for i in range(n_tickers)]
+        columns = pd.MultiIndex.from_product([['Close', 'High', 'Low', 'Open', 'Volume'], tickers],
+                                             names=['Price', 'Ticker'])
+        raw = pd.DataFrame(np.random.rand(rows, len(columns)) * 100, index=index, columns=columns)
+        raw['Volume'] = raw['Volume'].round()
+        new = min(timeit.repeat(lambda: normalize_schema(raw), number=5, repeat=3)) / 5
+        old = min(timeit.repeat(lambda: legacy_standardize(raw), number=5, repeat=3)) / 5
+        print(f"{n_tickers:>4} tickers x {rows} rows: normalize_schema {new * 1e3:8.2f} ms  "
+              f"legacy {old * 1e3:8.2f} ms")
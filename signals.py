@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+BULLISH, BEARISH = 'BULLISH', 'BEARISH'
+OVERBOUGHT, OVERSOLD, NEUTRAL = 'OVERBOUGHT', 'OVERSOLD', 'NEUTRAL'
+STRENGTHENING, WEAKENING = 'STRENGTHENING', 'WEAKENING'
+
+
+def _labels(like, conditions, choices, default):
+    """
+    Vectorised if/elif/else: evaluates the rule for every element of like, which may
+    be a scalar, Series or DataFrame, and returns labels of the same shape.
+    """
+    labels = np.select([np.asarray(c) for c in conditions], choices, default).astype(object)
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(labels, index=like.index, columns=like.columns)
+    if isinstance(like, pd.Series):
+        return pd.Series(labels, index=like.index, name=like.name)
+    return labels.item()
+
+
+# Each *_rule returns (conditions, labels, default label) for np.select, so the
+# same rule can produce labels (the *_signal functions) or positions (backtest.py)
+def sma_rule(close, sma):
+    """BULLISH when the close is above its SMA, else BEARISH."""
+    return [close > sma], [BULLISH], BEARISH
+
+
+def sma_signal(close, sma):
+    """Labels for sma_rule."""
+    return _labels(close, *sma_rule(close, sma))
+
+
+def rsi_rule(rsi, upper=70, lower=30):
+    """OVERBOUGHT above upper, OVERSOLD below lower, else NEUTRAL."""
+    return [rsi > upper, rsi < lower], [OVERBOUGHT, OVERSOLD], NEUTRAL
+
+
+def rsi_signal(rsi, upper=70, lower=30):
+    """Labels for rsi_rule."""
+    return _labels(rsi, *rsi_rule(rsi, upper, lower))
+
+
+def macd_cross_rule(macd, macd_signal):
+    """BULLISH when MACD is above its signal line, else BEARISH."""
+    return [macd > macd_signal], [BULLISH], BEARISH
+
+
+def macd_cross_signal(macd, macd_signal):
+    """Labels for macd_cross_rule."""
+    return _labels(macd, *macd_cross_rule(macd, macd_signal))
+
+
+def macd_trend(histogram):
+    """STRENGTHENING when the MACD histogram is positive, else WEAKENING."""
+    return _labels(histogram, [histogram > 0], [STRENGTHENING], WEAKENING)
+
+
+def bollinger_rule(close, upper_band, lower_band):
+    """OVERBOUGHT above the upper band, OVERSOLD below the lower band, else NEUTRAL."""
+    return [close > upper_band, close < lower_band], [OVERBOUGHT, OVERSOLD], NEUTRAL
+
+
+def bollinger_signal(close, upper_band, lower_band):
+    """Labels for bollinger_rule."""
+    return _labels(close, *bollinger_rule(close, upper_band, lower_band))
+
+
+def stochastic_rule(k, upper=80, lower=20):
+    """OVERBOUGHT when %K is above upper, OVERSOLD below lower, else NEUTRAL."""
+    return [k > upper, k < lower], [OVERBOUGHT, OVERSOLD], NEUTRAL
+
+
+def stochastic_signal(k, upper=80, lower=20):
+    """Labels for stochastic_rule."""
+    return _labels(k, *stochastic_rule(k, upper, lower))
+
+
+def atr_percent(atr, close):
+    """ATR as a percentage of the close."""
+    return (atr / close) * 100
+
+
+def latest_signals(outputs, close, indicator_params):
+    """
+    Evaluates the Technical Analysis Summary rules on the last bar of every ticker.
+    outputs is the {name: date x ticker DataFrame} dict from compute_panel_indicators
+    and close the matching date x ticker close prices. Returns one row per ticker;
+    signals are left empty where the underlying value is missing.
+    """
+    last = {name: frame.iloc[-1] for name, frame in outputs.items()}
+    latest_close = close.iloc[-1]
+    table = {'Close': latest_close}
+
+    def add_signal(column, label, *inputs):
+        valid = np.logical_and.reduce([value.notna() for value in inputs])
+        table[column] = label.where(valid)
+
+    sma_col = f"SMA_{indicator_params['sma_periods']}"
+    if indicator_params['sma_flag'] and sma_col in last:
+        table['SMA'] = last[sma_col]
+        add_signal('SMA_Signal', sma_signal(latest_close, last[sma_col]), latest_close, last[sma_col])
+
+    if indicator_params['rsi_flag'] and 'RSI' in last:
+        table['RSI'] = last['RSI']
+        add_signal('RSI_Signal',
+                   rsi_signal(last['RSI'], indicator_params['rsi_upper'], indicator_params['rsi_lower']),
+                   last['RSI'])
+
+    if indicator_params['macd_flag'] and 'MACD' in last:
+        table['MACD'] = last['MACD']
+        add_signal('MACD_Cross', macd_cross_signal(last['MACD'], last['MACD_Signal']),
+                   last['MACD'], last['MACD_Signal'])
+        add_signal('MACD_Trend', macd_trend(last['MACD_Histogram']), last['MACD_Histogram'])
+
+    if indicator_params['bb_flag'] and 'Upper_Band' in last:
+        table['BB_Upper'] = last['Upper_Band']
+        table['BB_Lower'] = last['Lower_Band']
+        add_signal('BB_Signal', bollinger_signal(latest_close, last['Upper_Band'], last['Lower_Band']),
+                   latest_close, last['Upper_Band'], last['Lower_Band'])
+
+    if indicator_params['stoch_flag'] and '%K' in last:
+        table['Stoch_K'] = last['%K']
+        table['Stoch_D'] = last['%D']
+        add_signal('Stoch_Signal', stochastic_signal(last['%K']), last['%K'])
+
+    if indicator_params['atr_flag'] and 'ATR' in last:
+        table['ATR'] = last['ATR']
+        table['ATR_Pct'] = atr_percent(last['ATR'], latest_close)
+
+    result = pd.DataFrame(table)
+    result.index.name = 'Ticker'
+    return result
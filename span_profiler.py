@@ -0,0 +1,411 @@
+import contextlib
+import contextvars
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+import types
+import uuid
+
+import numpy as np
+
+from chat_streaming import chunk_text
+
+# TRACE_FILE=traces.jsonl records every team run's span tree to that file, one
+# trace per line, next to (not instead of) the hosted agentops telemetry.
+# TRACE_PAYLOADS=1 also keeps tool results and answers, so the runs can be replayed.
+TRACE_FILE = os.getenv("TRACE_FILE")
+TRACE_PAYLOADS = bool(os.getenv("TRACE_PAYLOADS"))
+KINDS = ('team', 'agent', 'tool', 'llm')
+
+# The span the code running in this context is inside of
+_current = contextvars.ContextVar('span', default=None)
+
+
+class Span:
+    """One timed operation: a team or agent run, a tool call or an LLM call. Times are in ns."""
+
+    def __init__(self, name, kind, trace_id, span_id, parent_id=None, start_ns=0, end_ns=None,
+                 attributes=None, tokens=None, status='ok'):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.attributes = attributes or {}
+        self.tokens = tokens or {}
+        self.status = status
+        self._parent = None
+
+    @property
+    def seconds(self):
+        return ((self.end_ns or self.start_ns) - self.start_ns) / 1e9
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in (
+            'name', 'kind', 'span_id', 'parent_id', 'start_ns', 'end_ns', 'attributes', 'tokens', 'status')}
+
+    @classmethod
+    def from_dict(cls, trace_id, data):
+        return cls(trace_id=trace_id, **data)
+
+
+class Trace:
+    """The spans of one top-level run, with the tree queries the report needs."""
+
+    def __init__(self, trace_id, spans, source=None):
+        self.trace_id = trace_id
+        self.spans = sorted(spans, key=lambda span: span.start_ns)
+        self.source = source
+        ids = {span.span_id for span in self.spans}
+        self._children = {}
+        for span in self.spans:
+            if span.parent_id in ids:
+                self._children.setdefault(span.parent_id, []).append(span)
+        self.roots = [span for span in self.spans if span.parent_id not in ids]
+
+    @property
+    def root(self):
+        return max(self.roots, key=lambda span: span.seconds)
+
+    def children(self, span):
+        return self._children.get(span.span_id, [])
+
+    def critical_path(self, span=None):
+        """
+        Returns [(span, seconds)] along the critical path under span (the root by
+        default): walking back from the span's end, the child that finished last is
+        on the path, then the one that finished last before it started, and so on.
+        seconds is the time each span is on the path itself, outside its children
+        on the path, so an agent's own seconds are mostly waiting on the model.
+        """
+        span = span or self.root
+        path = []
+        own = 0
+        cursor = span.end_ns
+        for child in sorted(self.children(span), key=lambda child: child.end_ns, reverse=True):
+            if child.start_ns >= cursor:
+                # Ran entirely in parallel with a child already on the path
+                continue
+            own += max(cursor - child.end_ns, 0)
+            path = self.critical_path(child) + path
+            cursor = child.start_ns
+        own += max(cursor - span.start_ns, 0)
+        return [(span, own / 1e9)] + path
+
+
+class SpanRecorder:
+    """
+    Records span trees to a JSON-lines file. span() opens a child of the span the
+    caller is currently inside (tracked with a context variable, so concurrent
+    runs on different threads keep separate trees); when a top-level span ends,
+    its whole trace is appended to the file as one line. With payloads, tool
+    arguments and results and agent answers are kept in full.
+    """
+
+    def __init__(self, path, clock=time.time_ns, payloads=False):
+        self.path = path
+        self.clock = clock
+        self.payloads = payloads
+        self._lock = threading.Lock()
+        self._open = {}     # trace id -> spans recorded so far
+
+    def start(self, name, kind, **attributes):
+        parent = _current.get()
+        trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        span = Span(name, kind, trace_id, uuid.uuid4().hex[:16],
+                    parent_id=parent.span_id if parent is not None else None,
+                    start_ns=self.clock(), attributes=attributes)
+        span._parent = parent
+        with self._lock:
+            self._open.setdefault(trace_id, []).append(span)
+        _current.set(span)
+        return span
+
+    def finish(self, span, error=None):
+        span.end_ns = self.clock()
+        if error is not None:
+            span.status = 'error'
+            span.attributes['error'] = repr(error)
+        _current.set(span._parent)
+        if span._parent is not None:
+            return
+        with self._lock:
+            spans = self._open.pop(span.trace_id, [])
+            for other in spans:
+                if other.end_ns is None:
+                    other.end_ns, other.status = span.end_ns, 'unfinished'
+            line = json.dumps({'trace_id': span.trace_id, 'spans': [other.to_dict() for other in spans]},
+                              default=str)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+    @contextlib.contextmanager
+    def span(self, name, kind, **attributes):
+        span = self.start(name, kind, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            self.finish(span, error=e)
+            raise
+        self.finish(span)
+
+
+RECORDER = SpanRecorder(TRACE_FILE, payloads=TRACE_PAYLOADS) if TRACE_FILE else None
+
+
+def _usage(response):
+    """Token counts from a Gemini or OpenAI-style response object, or {}."""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None:
+        counts = {'prompt_tokens': getattr(usage, 'prompt_token_count', None),
+                  'completion_tokens': getattr(usage, 'candidates_token_count', None),
+                  'total_tokens': getattr(usage, 'total_token_count', None)}
+    else:
+        usage = getattr(response, 'usage', None)
+        counts = {name: getattr(usage, name, None) for name in ('prompt_tokens', 'completion_tokens', 'total_tokens')}
+    return {name: int(count) for name, count in counts.items() if isinstance(count, int)}
+
+
+def _traced_iter(recorder, span, chunks):
+    # The span stays open while the caller consumes the stream; closing the
+    # generator early (a cancelled run) still finishes it
+    error = None
+    parts = []
+    try:
+        for chunk in chunks:
+            if span.kind == 'llm':
+                span.tokens = _usage(chunk) or span.tokens
+            text = chunk_text(chunk)
+            if text:
+                if not parts:
+                    span.attributes['first_chunk_s'] = (recorder.clock() - span.start_ns) / 1e9
+                parts.append(text)
+            yield chunk
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        if recorder.payloads and span.kind in ('agent', 'team'):
+            span.attributes['output'] = "".join(parts)
+        recorder.finish(span, error=error if not isinstance(error, GeneratorExit) else None)
+
+
+def _trace_call(recorder, func, name, kind, **attributes):
+    @functools.wraps(func)
+    def traced(*args, **kwargs):
+        span_attributes = dict(attributes)
+        if kind == 'tool':
+            arguments = json.dumps(dict(kwargs, **({'_args': args} if args else {})), sort_keys=True, default=repr)
+            span_attributes['arguments'] = arguments if recorder.payloads else arguments[:200]
+        span = recorder.start(name, kind, **span_attributes)
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            recorder.finish(span, error=e)
+            raise
+        if isinstance(result, types.GeneratorType):
+            return _traced_iter(recorder, span, result)
+        if kind == 'llm':
+            span.tokens = _usage(result)
+        elif recorder.payloads and kind == 'tool':
+            span.attributes['result'] = result if isinstance(result, str) else json.dumps(result, default=repr)
+        elif recorder.payloads:
+            content = getattr(result, 'content', result)
+            span.attributes['output'] = content if isinstance(content, str) else str(content)
+        recorder.finish(span)
+        return result
+    return traced
+
+
+def instrument(obj, recorder=None):
+    """
+    Records obj's runs as spans and returns it: a team (anything with members or
+    branches) or agent's run(), its model's invoke calls and its toolkits' tool
+    calls, recursing into team members. Does nothing when no recorder is given
+    and TRACE_FILE is unset.
+    """
+    recorder = recorder or RECORDER
+    if recorder is None or getattr(obj, '_span_recorder', None) is recorder:
+        return obj
+    name = getattr(obj, 'name', None) or type(obj).__name__
+    if hasattr(obj, 'branches'):
+        kind, attributes = 'team', {'mode': 'fan_out'}
+    elif getattr(obj, 'members', None):
+        kind, attributes = 'team', {'mode': getattr(obj, 'mode', None) or 'route'}
+    else:
+        kind, attributes = 'agent', {}
+    obj.run = _trace_call(recorder, obj.run, name, kind, **attributes)
+    model = getattr(obj, 'model', None)
+    if model is not None:
+        model_name = getattr(model, 'id', None) or type(model).__name__
+        for method in ('invoke', 'invoke_stream'):
+            if hasattr(model, method):
+                setattr(model, method, _trace_call(recorder, getattr(model, method), model_name, 'llm'))
+    for tools in getattr(obj, 'tools', None) or ():
+        functions = getattr(tools, 'functions', None)
+        if isinstance(functions, dict):
+            for tool_name, function in functions.items():
+                function.entrypoint = _trace_call(recorder, function.entrypoint, tool_name, 'tool')
+    for member in getattr(obj, 'members', None) or ():
+        instrument(member, recorder)
+    obj._span_recorder = recorder
+    return obj
+
+
+def _iso_ns(timestamp):
+    moment = datetime.datetime.fromisoformat(timestamp)
+    return int(moment.timestamp()) * 1_000_000_000 + moment.microsecond * 1000
+
+
+def _agentops_kind(span):
+    attributes = span.get('span_attributes') or {}
+    kind = ((attributes.get('agentops') or {}).get('span') or {}).get('kind') or span.get('span_type')
+    if '.team.' in span['span_name'] or kind == 'team':
+        return 'team'
+    return {'request': 'tool'}.get(kind, kind if kind in KINDS else 'agent')
+
+
+def load_agentops_trace(data, source=None):
+    """Converts a trace exported from AgentOps (a dict with 'trace' and 'spans') to a Trace."""
+    spans = []
+    for raw in data['spans']:
+        attributes = raw.get('span_attributes') or {}
+        kind = _agentops_kind(raw)
+        tool = attributes.get('tool') if isinstance(attributes.get('tool'), dict) else {}
+        if kind == 'tool' and tool.get('name'):
+            name = tool['name']
+        elif kind in ('agent', 'team'):
+            name = (attributes.get('agent') or {}).get('name') or raw['span_name'].split('.agno.')[0]
+        else:
+            name = raw['span_name'].rsplit('.llm', 1)[0]
+        metrics = raw.get('metrics') or {}
+        tokens = {key: int(metrics[key]) for key in ('prompt_tokens', 'completion_tokens', 'total_tokens')
+                  if metrics.get(key) is not None}
+        start_ns = _iso_ns(raw['start_time'])
+        span_attributes = {}
+        if kind == 'tool':
+            span_attributes['arguments'] = tool.get('parameters') or tool.get('formatted_args')
+            span_attributes['result'] = tool.get('result')
+        elif kind in ('agent', 'team') and (attributes.get('agent') or {}).get('output'):
+            span_attributes['output'] = attributes['agent']['output']
+        spans.append(Span(name, kind, data['trace']['trace_id'], raw['span_id'],
+                          parent_id=raw.get('parent_span_id') or None, start_ns=start_ns,
+                          end_ns=start_ns + int(raw['duration']), tokens=tokens,
+                          attributes={key: value for key, value in span_attributes.items() if value is not None},
+                          status='error' if raw.get('status_code') == 'ERROR' else 'ok'))
+    return Trace(data['trace']['trace_id'], spans, source=source)
+
+
+def load_traces(path):
+    """Returns the Traces in an AgentOps trace export or in a file written by SpanRecorder."""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, dict) and 'trace' in data:
+        return [load_agentops_trace(data, source=path)]
+    traces = []
+    for line in text.splitlines():
+        if line.strip():
+            record = json.loads(line)
+            spans = [Span.from_dict(record['trace_id'], span) for span in record['spans']]
+            traces.append(Trace(record['trace_id'], spans, source=path))
+    return traces
+
+
+def summarize(traces):
+    """
+    Aggregates traces into rows per (kind, name): count, p50/p95/max seconds,
+    total tokens, and seconds and share of the critical path. The 'run' row covers
+    whole runs (their root spans).
+    """
+    durations = {}
+    tokens = {}
+    critical = {}
+    for trace in traces:
+        durations.setdefault(('run', 'all runs'), []).append(trace.root.seconds)
+        for span in trace.spans:
+            durations.setdefault((span.kind, span.name), []).append(span.seconds)
+            used = span.tokens.get('total_tokens', 0)
+            tokens[(span.kind, span.name)] = tokens.get((span.kind, span.name), 0) + used
+            if span.kind == 'llm':
+                tokens[('run', 'all runs')] = tokens.get(('run', 'all runs'), 0) + used
+        for span, seconds in trace.critical_path():
+            critical[(span.kind, span.name)] = critical.get((span.kind, span.name), 0.0) + seconds
+    total_run = sum(durations.get(('run', 'all runs'), [])) or 1.0
+    rows = []
+    for key, values in durations.items():
+        values = np.array(values)
+        rows.append({
+            'kind': key[0], 'name': key[1], 'count': len(values),
+            'p50_s': float(np.percentile(values, 50)), 'p95_s': float(np.percentile(values, 95)),
+            'max_s': float(values.max()), 'tokens': tokens.get(key, 0),
+            'critical_s': critical.get(key, 0.0) if key[0] != 'run' else total_run,
+            'critical_share': critical.get(key, 0.0) / total_run if key[0] != 'run' else 1.0,
+        })
+    order = {kind: i for i, kind in enumerate(('run',) + KINDS)}
+    return sorted(rows, key=lambda row: (order.get(row['kind'], len(order)), -row['critical_s']))
+
+
+def format_report(rows):
+    lines = [f"{'kind':<6} {'name':<40} {'count':>5} {'p50 s':>8} {'p95 s':>8} {'max s':>8} "
+             f"{'tokens':>9} {'crit s':>8} {'crit %':>6}"]
+    for row in rows:
+        lines.append(f"{row['kind']:<6} {row['name'][:40]:<40} {row['count']:>5} {row['p50_s']:>8.3f} "
+                     f"{row['p95_s']:>8.3f} {row['max_s']:>8.3f} {row['tokens']:>9,} {row['critical_s']:>8.3f} "
+                     f"{row['critical_share']:>6.0%}")
+    return "\n".join(lines)
+
+
+def format_comparison(before, after):
+    """p50/p95 per span before and after a change, from two summarize() results."""
+    before = {(row['kind'], row['name']): row for row in before}
+    after = {(row['kind'], row['name']): row for row in after}
+    lines = [f"{'kind':<6} {'name':<40} {'p50 before':>10} {'p50 after':>10} {'p95 before':>10} "
+             f"{'p95 after':>10} {'change':>7}"]
+    for key in list(before) + [key for key in after if key not in before]:
+        old, new = before.get(key), after.get(key)
+        cells = [f"{row[stat]:>10.3f}" if row else f"{'-':>10}"
+                 for stat in ('p50_s',) for row in (old, new)]
+        cells += [f"{row[stat]:>10.3f}" if row else f"{'-':>10}"
+                  for stat in ('p95_s',) for row in (old, new)]
+        change = f"{new['p50_s'] / old['p50_s'] - 1:>+7.0%}" if old and new and old['p50_s'] else f"{'':>7}"
+        lines.append(f"{key[0]:<6} {key[1][:40]:<40} {' '.join(cells)} {change}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+
+    parser = argparse.ArgumentParser(description="Latency report for recorded or AgentOps-exported traces.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    report = commands.add_parser('report', help="per-span latency, tokens and critical path")
+    report.add_argument('paths', nargs='*', default=glob.glob(os.path.join(os.path.dirname(__file__), 'assets', 'trace_*.json')))
+    report.add_argument('--paths', dest='show_paths', action='store_true', help="print each run's critical path")
+    compare = commands.add_parser('compare', help="p50/p95 per span before and after a change")
+    compare.add_argument('--before', nargs='+', required=True)
+    compare.add_argument('--after', nargs='+', required=True)
+    args = parser.parse_args()
+
+    def load(paths):
+        return [trace for path in paths for trace in load_traces(path)]
+
+    if args.command == 'report':
+        traces = load(args.paths)
+        print(f"{len(traces)} runs from {len(args.paths)} file(s)\n")
+        print(format_report(summarize(traces)))
+        if args.show_paths:
+            for trace in traces:
+                print(f"\nCritical path of {trace.trace_id} ({trace.root.seconds:.2f} s):")
+                for span, seconds in trace.critical_path():
+                    print(f"  {span.kind:<6} {span.name[:50]:<50} {seconds:8.3f} s")
+    else:
+        print(format_comparison(summarize(load(args.before)), summarize(load(args.after))))
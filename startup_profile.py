@@ -0,0 +1,74 @@
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# Seconds a fresh interpreter may spend on the imports a page runs before it draws
+# anything. Anything expensive that is only needed later (agents, model clients,
+# telemetry, yfinance) has to be imported on first use to stay within these.
+IMPORT_BUDGETS = {
+    'Home.py': 2.0,
+    'pages/1_Fintelligence.py': 2.0,
+    'pages/2_Screener.py': 2.0,
+    'pages/3_Sweep.py': 2.0,
+    'pages/4_Correlations.py': 2.0,
+}
+
+
+def _module_level(nodes):
+    # Statements run at import, including the branches of module-level if/try
+    for node in nodes:
+        yield node
+        if isinstance(node, (ast.If, ast.Try)):
+            yield from _module_level(node.body + node.orelse + getattr(node, 'finalbody', []))
+
+
+def page_imports(path):
+    """Returns the import statements the page runs when it loads, as one block of source."""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    return "\n".join(ast.get_source_segment(source, node) for node in _module_level(ast.parse(source).body)
+                     if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def profile_imports(source, cwd=ROOT):
+    """
+    Runs source under `python -X importtime` in a fresh interpreter and returns
+    (total seconds, {top-level package: seconds spent in its own modules}).
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', source], cwd=cwd,
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    total = 0
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Only imports made directly by the source are unindented
+        if not name[1:].startswith(' '):
+            total += int(cumulative_us)
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return total / 1e6, {package: us / 1e6 for package, us in packages.items()}
+
+
+def check_page(page, repeat=3):
+    """Best of `repeat` cold imports of the page; returns (seconds, packages, within budget)."""
+    source = page_imports(os.path.join(ROOT, page))
+    total, packages = min((profile_imports(source) for _ in range(repeat)), key=lambda run: run[0])
+    return total, packages, total <= IMPORT_BUDGETS[page]
+
+
+if __name__ == "__main__":
+    # Usage: python startup_profile.py [page ...]; exits 1 when a page is over budget
+    over = False
+    for page in sys.argv[1:] or IMPORT_BUDGETS:
+        total, packages, ok = check_page(page)
+        over |= not ok
+        print(f"{page:<26} {total:6.3f} s  budget {IMPORT_BUDGETS[page]:.1f} s  {'ok' if ok else 'OVER BUDGET'}")
+        for package, seconds in sorted(packages.items(), key=lambda item: -item[1])[:8]:
+            print(f"    {package:<24} {seconds:6.3f} s")
+    sys.exit(1 if over else 0)
@@ -0,0 +1,322 @@
+import math
+from collections import deque
+
+NAN = float('nan')
+
+
+def _isnan(value):
+    return value != value
+
+
+class RollingStats:
+    """
+    O(1) rolling mean and sample standard deviation over a fixed window.
+    Uses add/remove Welford updates; like pandas' rolling(window), the result is
+    NaN until the window is full and while it contains any NaN.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.nan_count = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        # Length of the trailing run of identical values; a window of one repeated
+        # value is reported exactly (as pandas does) instead of with rounding residue
+        self.last = NAN
+        self.run = 0
+
+    def _add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def _remove(self, x):
+        self.count -= 1
+        if self.count == 0:
+            self.mean = self.m2 = 0.0
+            return
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (x - self.mean)
+
+    def update(self, x):
+        """Adds one value, dropping the oldest once the window is full; returns the mean."""
+        self.values.append(x)
+        self.run = self.run + 1 if x == self.last else 1
+        self.last = x
+        if _isnan(x):
+            self.nan_count += 1
+        else:
+            self._add(x)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if _isnan(old):
+                self.nan_count -= 1
+            else:
+                self._remove(old)
+        return self.current_mean()
+
+    def ready(self):
+        return len(self.values) == self.window and self.nan_count == 0
+
+    def current_mean(self):
+        if not self.ready():
+            return NAN
+        return self.last if self.run >= self.window else self.mean
+
+    def current_std(self):
+        if not self.ready() or self.window < 2:
+            return NAN
+        if self.run >= self.window:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+
+class RollingExtreme:
+    """O(1) amortized rolling min or max using a monotonic deque of (index, value)."""
+
+    def __init__(self, window, mode='min'):
+        self.window = window
+        self.better = (lambda a, b: a <= b) if mode == 'min' else (lambda a, b: a >= b)
+        self.candidates = deque()
+        self.nans = deque()
+        self.index = -1
+
+    def update(self, x):
+        """Adds one value and returns the extreme of the last `window` values."""
+        self.index += 1
+        expired = self.index - self.window
+        while self.candidates and self.candidates[0][0] <= expired:
+            self.candidates.popleft()
+        while self.nans and self.nans[0] <= expired:
+            self.nans.popleft()
+
+        if _isnan(x):
+            self.nans.append(self.index)
+        else:
+            while self.candidates and self.better(x, self.candidates[-1][1]):
+                self.candidates.pop()
+            self.candidates.append((self.index, x))
+
+        if self.index + 1 < self.window or self.nans or not self.candidates:
+            return NAN
+        return self.candidates[0][1]
+
+
+class EMAStream:
+    """Exponential moving average matching Series.ewm(span=span, adjust=False).mean()."""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.weighted = NAN
+        self.old_weight = 1.0
+
+    def update(self, x):
+        if not _isnan(self.weighted):
+            # NaN inputs still age the previous value, as with ignore_na=False
+            self.old_weight *= 1.0 - self.alpha
+            if not _isnan(x):
+                if self.weighted != x:
+                    self.weighted = ((self.old_weight * self.weighted + self.alpha * x)
+                                     / (self.old_weight + self.alpha))
+                self.old_weight = 1.0
+        elif not _isnan(x):
+            self.weighted = x
+        return self.weighted
+
+
+class SMAStream:
+    """Streaming counterpart of the 'sma' indicator."""
+
+    def __init__(self, period):
+        self.period = period
+        self.stats = RollingStats(period)
+
+    def update(self, bar):
+        return {f'SMA_{self.period}': self.stats.update(bar['Close'])}
+
+
+class BollingerStream:
+    """Streaming counterpart of the 'bollinger_bands' indicator."""
+
+    def __init__(self, period=20, std_dev=2):
+        self.period = period
+        self.std_dev = std_dev
+        self.stats = RollingStats(period)
+
+    def update(self, bar):
+        middle = self.stats.update(bar['Close'])
+        std = self.stats.current_std()
+        return {
+            f'SMA_{self.period}': middle,
+            'Upper_Band': middle + std * self.std_dev,
+            'Lower_Band': middle - std * self.std_dev,
+        }
+
+
+class RSIStream:
+    """Streaming counterpart of the 'rsi' indicator (rolling-mean gains and losses)."""
+
+    def __init__(self, period=14):
+        self.gains = RollingStats(period)
+        self.losses = RollingStats(period)
+        self.prev_close = NAN
+
+    def update(self, bar):
+        close = bar['Close']
+        delta = close - self.prev_close
+        self.prev_close = close
+        avg_gain = self.gains.update(delta if delta > 0 else 0.0)
+        avg_loss = self.losses.update(-delta if delta < 0 else 0.0)
+
+        # Avoid division by zero
+        if avg_loss == 0:
+            avg_loss = 0.00001
+        return {'RSI': 100 - (100 / (1 + avg_gain / avg_loss))}
+
+
+class MACDStream:
+    """Streaming counterpart of the 'macd' indicator."""
+
+    def __init__(self, fast_period=12, slow_period=26, signal_period=9):
+        self.fast = EMAStream(fast_period)
+        self.slow = EMAStream(slow_period)
+        self.signal = EMAStream(signal_period)
+
+    def update(self, bar):
+        close = bar['Close']
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+        return {'MACD': macd, 'MACD_Signal': signal, 'MACD_Histogram': macd - signal}
+
+
+class ATRStream:
+    """Streaming counterpart of the 'atr' indicator."""
+
+    def __init__(self, period=14):
+        self.stats = RollingStats(period)
+        self.prev_close = NAN
+
+    def update(self, bar):
+        high, low, close = bar['High'], bar['Low'], bar['Close']
+        ranges = (high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        # np.maximum propagates NaN, so any missing input yields a NaN true range
+        tr = NAN if any(_isnan(r) for r in ranges) else max(ranges)
+        self.prev_close = close
+        return {'ATR': self.stats.update(tr)}
+
+
+class OBVStream:
+    """Streaming counterpart of the 'obv' indicator."""
+
+    def __init__(self):
+        self.obv = 0
+        self.prev_close = NAN
+
+    def update(self, bar):
+        close, volume = bar['Close'], bar['Volume']
+        if close > self.prev_close:
+            self.obv += volume
+        elif close < self.prev_close:
+            self.obv -= volume
+        self.prev_close = close
+        return {'OBV': self.obv}
+
+
+class StochasticStream:
+    """Streaming counterpart of the 'stochastic' indicator."""
+
+    def __init__(self, k_period=14, d_period=3):
+        self.lowest = RollingExtreme(k_period, 'min')
+        self.highest = RollingExtreme(k_period, 'max')
+        self.d = RollingStats(d_period)
+
+    def update(self, bar):
+        lowest_low = self.lowest.update(bar['Low'])
+        highest_high = self.highest.update(bar['High'])
+        span = highest_high - lowest_low
+        if span == 0:
+            k = NAN if bar['Close'] == lowest_low else math.copysign(math.inf, bar['Close'] - lowest_low)
+        else:
+            k = 100 * ((bar['Close'] - lowest_low) / span)
+        return {'%K': k, '%D': self.d.update(k)}
+
+
+# Indicator name -> streaming class, mirroring indicators.INDICATORS
+STREAMS = {
+    'sma': SMAStream,
+    'bollinger_bands': BollingerStream,
+    'rsi': RSIStream,
+    'macd': MACDStream,
+    'atr': ATRStream,
+    'obv': OBVStream,
+    'stochastic': StochasticStream,
+}
+
+
+class IndicatorStream:
+    """
+    Incremental version of indicators.compute_indicators.
+    Takes the same request list; update(bar) consumes one OHLCV bar (a dict or
+    Series) in O(1) and returns the latest value of every requested output.
+    """
+
+    def __init__(self, requests):
+        self.streams = []
+        for request in requests:
+            name, params = (request, {}) if isinstance(request, str) else request
+            self.streams.append(STREAMS[name](**params))
+
+    def update(self, bar):
+        latest = {}
+        for stream in self.streams:
+            latest.update(stream.update(bar))
+        return latest
+
+    def warm_up(self, df):
+        """Feeds every row of a history DataFrame and returns the values after the last bar."""
+        latest = {}
+        columns = [col for col in ('Open', 'High', 'Low', 'Close', 'Volume') if col in df.columns]
+        for row in zip(*(df[col].tolist() for col in columns)):
+            latest = self.update(dict(zip(columns, row)))
+        return latest
+
+
+if __name__ == "__main__":
+    import numpy as np
+    import pandas as pd
+    from indicators import compute_indicators
+
+    # Check that bar-by-bar updates reproduce the batch indicators
+    rng = np.random.default_rng(0)
+    n = 5000
+    close = 100 + rng.standard_normal(n).cumsum()
+    df = pd.DataFrame({
+        'Open': close,
+        'High': close + rng.random(n),
+        'Low': close - rng.random(n),
+        'Close': close,
+        'Volume': rng.integers(1, 1_000_000, n),
+    }, index=pd.bdate_range('2000-01-03', periods=n))
+    df.iloc[1000:1003, :4] = np.nan
+
+    requests = [
+        ('sma', {'period': 20}),
+        ('bollinger_bands', {'period': 20, 'std_dev': 2}),
+        ('rsi', {'period': 14}),
+        ('macd', {'fast_period': 12, 'slow_period': 26, 'signal_period': 9}),
+        ('atr', {'period': 14}),
+        'obv',
+        ('stochastic', {'k_period': 14, 'd_period': 3}),
+    ]
+    batch = compute_indicators(df, requests, cache=None)
+    stream = IndicatorStream(requests)
+    rows = [stream.update(bar) for bar in df.to_dict('records')]
+    streamed = pd.DataFrame(rows, index=df.index)[batch.columns]
+
+    for col in batch.columns:
+        np.testing.assert_allclose(streamed[col], batch[col], rtol=1e-9, atol=1e-9, err_msg=col)
+    print(f"Streaming matches batch for {len(batch.columns)} outputs over {n} bars")
@@ -0,0 +1,190 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import METRICS, TRADING_DAYS, evaluate, positions, rule_positions
+from indicators import compute_array_indicators, indicator_requests
+
+# Candidate values per rule, within the limits of Home's sidebar inputs. ATR and
+# the stochastic %D period feed no signal rule, so sweeping them changes nothing.
+PARAM_SPACE = {
+    'SMA': {'sma_periods': range(1, 51)},
+    'RSI': {'rsi_periods': range(2, 51, 2), 'rsi_upper': range(50, 91, 5), 'rsi_lower': range(10, 51, 5)},
+    'MACD': {'macd_fast': range(5, 31), 'macd_slow': range(10, 51, 2), 'macd_signal': range(3, 21)},
+    'Bollinger Bands': {'bb_periods': range(2, 51), 'bb_std': (1, 2, 3, 4)},
+    'Stochastic': {'stoch_k': range(5, 31)},
+}
+RULE_FLAGS = {'SMA': 'sma_flag', 'RSI': 'rsi_flag', 'MACD': 'macd_flag', 'Bollinger Bands': 'bb_flag',
+              'Stochastic': 'stoch_flag'}
+# Home's sidebar defaults, with every indicator switched off
+DEFAULT_PARAMS = {
+    'volume_flag': False, 'sma_flag': False, 'sma_periods': 20,
+    'bb_flag': False, 'bb_periods': 20, 'bb_std': 2,
+    'rsi_flag': False, 'rsi_periods': 20, 'rsi_upper': 70, 'rsi_lower': 30,
+    'macd_flag': False, 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9,
+    'atr_flag': False, 'atr_period': 14, 'obv_flag': False,
+    'stoch_flag': False, 'stoch_k': 14, 'stoch_d': 3,
+}
+# Metrics where smaller is better when ranking
+LOWER_IS_BETTER = {'volatility'}
+FIELDS = ('High', 'Low', 'Close')
+# Combinations handed to a worker at a time; they share one indicator memo
+CHUNK_SIZE = 16
+
+
+def _valid(combo):
+    return (combo.get('rsi_lower', 0) < combo.get('rsi_upper', 100)
+            and combo.get('macd_fast', 0) < combo.get('macd_slow', 100))
+
+
+def grid(rule, space=None):
+    """Every valid combination of the rule's candidate values, as parameter dicts."""
+    space = space or PARAM_SPACE[rule]
+    combos = (dict(zip(space, values)) for values in itertools.product(*space.values()))
+    return [combo for combo in combos if _valid(combo)]
+
+
+def random_sample(rule, n, space=None, seed=None):
+    """n distinct valid combinations drawn uniformly from the rule's grid."""
+    combos = grid(rule, space)
+    rng = np.random.default_rng(seed)
+    return [combos[i] for i in rng.choice(len(combos), size=min(n, len(combos)), replace=False)]
+
+
+def panel_arrays(panel):
+    """{field: (time x ticker) float64 array} and the tickers of a (Ticker, Field) panel."""
+    tickers = list(dict.fromkeys(panel.columns.get_level_values('Ticker')))
+    arrays = {field: panel.xs(field, axis=1, level='Field').reindex(columns=tickers).to_numpy(dtype=np.float64)
+              for field in FIELDS}
+    return arrays, tickers
+
+
+class SharedPrices:
+    """
+    The High/Low/Close arrays in one shared-memory block, so pool workers map the
+    same pages instead of each unpickling a copy. Use as a context manager; the
+    block is released on exit. spec is what workers need to attach to it.
+    """
+
+    def __init__(self, arrays):
+        shape = next(iter(arrays.values())).shape
+        self._shm = shared_memory.SharedMemory(create=True, size=max(len(FIELDS) * 8 * int(np.prod(shape)), 1))
+        block = np.ndarray((len(FIELDS),) + shape, dtype=np.float64, buffer=self._shm.buf)
+        for i, field in enumerate(FIELDS):
+            block[i] = arrays[field]
+        self.spec = (self._shm.name, shape)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._shm.close()
+        self._shm.unlink()
+
+
+# Set in each worker by _attach: read-only views of the shared block
+_PRICES = {}
+
+
+def _attach(spec):
+    name, shape = spec
+    # Pool workers share the parent's resource tracker, so attaching registers
+    # nothing new and the parent's unlink on exit cleans up
+    shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray((len(FIELDS),) + shape, dtype=np.float64, buffer=shm.buf)
+    block.flags.writeable = False
+    _PRICES.update({field: block[i] for i, field in enumerate(FIELDS)}, shm=shm)
+
+
+def _mean(values):
+    # Tickers where a metric is undefined (e.g. the hit rate without trades) are left out
+    values = values[~np.isnan(values)]
+    return float(values.mean()) if len(values) else np.nan
+
+
+def _evaluate_chunk(rule, combos, allow_short, cost_bps):
+    """Backtests combos of one rule on every ticker; returns one row of ticker-averaged metrics per combo."""
+    close = _PRICES['Close']
+    listed = np.count_nonzero(~np.isnan(close), axis=0)
+    years = np.maximum(listed, 1) / TRADING_DAYS
+    arrays = {field: _PRICES[field] for field in FIELDS}
+    memo = {}
+    rows = []
+    for combo in combos:
+        params = {**DEFAULT_PARAMS, **combo, RULE_FLAGS[rule]: True}
+        outputs = compute_array_indicators(arrays, indicator_requests(params), memo=memo)
+        (result, inputs), = rule_positions(outputs, close, params).values()
+        metrics, _ = evaluate(close, positions(result, inputs, allow_short), years, cost_bps)
+        rows.append({**combo, **{name: _mean(values[listed > 1]) for name, values in metrics.items()}})
+    return rows
+
+
+def rank(results, metric='sharpe'):
+    """Sorts sweep results best first by metric."""
+    return results.sort_values(metric, ascending=metric in LOWER_IS_BETTER, na_position='last',
+                               ignore_index=True)
+
+
+def sweep(arrays, rule, combos, metric='sharpe', allow_short=False, cost_bps=0.0, max_workers=None,
+          chunk_size=CHUNK_SIZE):
+    """
+    Backtests every parameter combination of one rule on every ticker, on a
+    process pool sharing the price arrays through shared memory. arrays is
+    {field: (time x ticker) array} as from panel_arrays, or 1-D arrays for one
+    ticker. Returns (results
+    DataFrame ranked by metric, one row per combination with the swept
+    parameters and the METRICS averaged over tickers, stats dict with the
+    combinations/sec throughput).
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    arrays = {field: np.asarray(arrays[field], dtype=np.float64).reshape(len(arrays[field]), -1)
+              for field in FIELDS}
+    chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+    start = time.perf_counter()
+    with SharedPrices(arrays) as shared:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach, initargs=(shared.spec,)) as pool:
+            futures = [pool.submit(_evaluate_chunk, rule, chunk, allow_short, cost_bps) for chunk in chunks]
+            rows = [row for future in futures for row in future.result()]
+    elapsed = time.perf_counter() - start
+    results = pd.DataFrame(rows, columns=list(combos[0]) + list(METRICS) if combos else list(METRICS))
+    tickers = arrays['Close'].shape[1]
+    stats = {
+        'combinations': len(combos), 'tickers': tickers, 'workers': max_workers, 'seconds': elapsed,
+        'combinations_per_s': len(combos) / elapsed if elapsed else np.nan,
+        'backtests_per_s': len(combos) * tickers / elapsed if elapsed else np.nan,
+    }
+    return rank(results, metric), stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Throughput of a parameter sweep over a synthetic universe.")
+    parser.add_argument('--rule', default='RSI', choices=list(PARAM_SPACE))
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--combinations', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--metric', default='sharpe', choices=METRICS)
+    args = parser.parse_args()
+
+    # Random-walk bars standing in for the S&P 500; later tickers list part-way through
+    rng = np.random.default_rng(0)
+    bars = args.years * TRADING_DAYS
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, (bars, args.tickers)), axis=0))
+    spread = close * rng.uniform(0.001, 0.02, close.shape)
+    close[:bars // 3, ::10] = np.nan
+    arrays = {'Close': close, 'High': close + spread, 'Low': close - spread}
+
+    combos = random_sample(args.rule, args.combinations, seed=0)
+    results, stats = sweep(arrays, args.rule, combos, metric=args.metric, max_workers=args.workers)
+    print(f"{stats['combinations']} {args.rule} combinations x {stats['tickers']} tickers x {bars} bars "
+          f"on {stats['workers']} workers: {stats['seconds']:.1f} s, "
+          f"{stats['combinations_per_s']:.1f} combinations/s, {stats['backtests_per_s']:.0f} backtests/s\n")
+    with pd.option_context('display.width', 140, 'display.float_format', '{:.3f}'.format):
+        print(results.head(10))
@@ -0,0 +1,208 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Team runs executing at once across all sessions, and runs allowed to wait for a
+# worker; beyond both, new runs are turned away instead of piling up
+MAX_WORKERS = int(os.getenv("TEAM_RUNNER_WORKERS", "4"))
+MAX_PENDING = int(os.getenv("TEAM_RUNNER_QUEUE", "16"))
+
+_DONE = object()
+
+
+class RunnerBusy(Exception):
+    """Raised when every worker is busy and the waiting queue is full."""
+
+
+class RunCancelled(Exception):
+    """Raised while iterating a run that was cancelled."""
+
+
+class RunHandle:
+    """
+    A submitted team run. Iterating it yields the streamed chunks as the worker
+    produces them and re-raises the run's error, if any. cancel() stops the run:
+    a queued run never starts and a running one stops at its next chunk.
+    """
+
+    def __init__(self, session_id, message):
+        self.session_id = session_id
+        self.message = message
+        self.status = 'queued'
+        self.error = None
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self._chunks = queue.Queue()
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Cancels the run; does nothing once it has finished."""
+        if self.finished is None:
+            self._cancelled.set()
+
+    def done(self):
+        return self.finished is not None
+
+    def queue_s(self):
+        """Seconds the run waited for a worker."""
+        return (self.started or time.perf_counter()) - self.submitted
+
+    def __iter__(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is _DONE:
+                break
+            yield chunk
+        if self.error is not None:
+            raise self.error
+        if self.status == 'cancelled':
+            raise RunCancelled(f"Run for session {self.session_id} was cancelled")
+
+
+class TeamRunner:
+    """
+    Runs team requests on a bounded worker pool, off the Streamlit script thread.
+    Every run builds its own team with make_team(), so concurrent sessions never
+    share agent state. At most max_workers runs execute and max_pending wait;
+    submit() waits up to `timeout` seconds for room and then raises RunnerBusy.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=MAX_PENDING):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='team-run')
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self._active = {}
+        self.counts = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0, 'rejected': 0,
+                       'queue_s': 0.0, 'run_s': 0.0}
+
+    def submit(self, make_team, message, session_id=None, timeout=0):
+        """
+        Queues a streamed run of make_team().run(message) and returns its RunHandle.
+        A new run for a session cancels that session's previous run.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self.counts['rejected'] += 1
+            raise RunnerBusy("All workers are busy and the queue is full")
+        handle = RunHandle(session_id, message)
+        with self._lock:
+            self.counts['submitted'] += 1
+            if session_id is not None:
+                previous = self._active.get(session_id)
+                if previous is not None:
+                    previous.cancel()
+                self._active[session_id] = handle
+        self._pool.submit(self._run, handle, make_team)
+        return handle
+
+    def _run(self, handle, make_team):
+        handle.started = time.perf_counter()
+        try:
+            if handle.cancelled:
+                return
+            handle.status = 'running'
+            chunks = make_team().run(message=handle.message, stream=True)
+            try:
+                for chunk in chunks:
+                    if handle.cancelled:
+                        break
+                    handle._chunks.put(chunk)
+            finally:
+                # Stops a generator-based stream where it is
+                close = getattr(chunks, 'close', None)
+                if close is not None:
+                    close()
+        except Exception as e:
+            handle.error = e
+        finally:
+            handle.finished = time.perf_counter()
+            if handle.error is not None:
+                handle.status = 'failed'
+            elif handle.cancelled:
+                handle.status = 'cancelled'
+            else:
+                handle.status = 'done'
+            with self._lock:
+                self.counts[{'done': 'completed'}.get(handle.status, handle.status)] += 1
+                self.counts['queue_s'] += handle.started - handle.submitted
+                self.counts['run_s'] += handle.finished - handle.started
+                if self._active.get(handle.session_id) is handle:
+                    del self._active[handle.session_id]
+            handle._chunks.put(_DONE)
+            self._slots.release()
+
+    def stats(self):
+        """Returns the counters plus the current number of running and queued runs."""
+        with self._lock:
+            stats = dict(self.counts)
+            active = list(self._active.values())
+        stats['running'] = sum(handle.status == 'running' for handle in active)
+        stats['queued'] = sum(handle.status == 'queued' for handle in active)
+        return stats
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Process-wide runner shared by every chat session; threads start on first submit
+TEAM_RUNNER = TeamRunner()
+
+
+if __name__ == "__main__":
+    import sys
+    import numpy as np
+    from chat_streaming import FakeTeam, render_stream
+
+    class NullPlaceholder:
+        def markdown(self, text):
+            pass
+
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    runner = TeamRunner(max_workers=8, max_pending=32)
+    make_team = lambda: FakeTeam(first_token_delay=0.5, token_delay=0.002, chunk_size=40)
+    results = []
+
+    def session(i):
+        # Each simulated user waits up to 10 s for a slot, then streams the answer
+        start = time.perf_counter()
+        try:
+            handle = runner.submit(make_team, f"question {i}", session_id=i, timeout=10)
+        except RunnerBusy:
+            results.append(('rejected', 0.0, 0.0, time.perf_counter() - start))
+            return
+        _, metrics = render_stream(handle, NullPlaceholder())
+        results.append(('done', handle.queue_s(), metrics['ttft_s'], time.perf_counter() - start))
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    done = np.array([r[1:] for r in results if r[0] == 'done'])
+    print(f"{sessions} sessions, {runner.max_workers} workers, queue {runner.max_pending}: "
+          f"{len(done)} answered, {sum(r[0] == 'rejected' for r in results)} rejected in {elapsed:.1f} s "
+          f"({len(done) / elapsed:.1f} answers/s)")
+    for name, column in (('queue wait', 0), ('first token', 1), ('total', 2)):
+        print(f"  {name:<12} p50 {np.percentile(done[:, column], 50):5.2f} s  "
+              f"p95 {np.percentile(done[:, column], 95):5.2f} s")
+
+    # A user navigating away cancels their run; the worker is freed at the next chunk
+    slow = lambda: FakeTeam(first_token_delay=0.1, token_delay=0.05, chunk_size=4)
+    handle = runner.submit(slow, "long question", session_id='leaving')
+    time.sleep(0.5)
+    handle.cancel()
+    time.sleep(0.2)
+    print(f"cancelled run status: {handle.status}; runner stats: {runner.stats()}")
+    runner.shutdown()
@@ -0,0 +1,167 @@
+import inspect
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulk_loader
+from bulk_loader import load_bulk
+from price_store import PriceStore
+
+
+class RecordingFetcher:
+    """Batch fetcher serving synthetic daily bars and recording every request."""
+
+    def __init__(self, listed=None):
+        self.calls = []
+        self.listed = listed or {}
+
+    def __call__(self, symbols, start, end):
+        self.calls.append((tuple(symbols), pd.Timestamp(start), pd.Timestamp(end)))
+        index = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+        result = {}
+        for symbol in symbols:
+            days = index[index >= self.listed.get(symbol, index[0] if len(index) else start)]
+            if len(days):
+                close = np.linspace(100, 110, len(days))
+                result[symbol] = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1,
+                                               "Close": close, "Volume": 1000}, index=days)
+        return result
+
+
+def test_second_identical_load_does_no_network_io(tmp_path):
+    fetcher = RecordingFetcher()
+    store = PriceStore(tmp_path, fetcher=lambda *args: pd.DataFrame())
+    tickers = ["AAA", "BBB", "CCC"]
+    first, failures = load_bulk(tickers, "2024-01-01", "2024-07-01", fetcher=fetcher, store=store)
+    assert not failures
+    assert len(fetcher.calls) == 1
+
+    second, failures = load_bulk(tickers, "2024-01-01", "2024-07-01", fetcher=fetcher, store=store)
+    assert len(fetcher.calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_wider_window_fetches_only_the_new_bars(tmp_path):
+    fetcher = RecordingFetcher()
+    store = PriceStore(tmp_path, fetcher=lambda *args: pd.DataFrame())
+    load_bulk(["AAA", "BBB"], "2024-01-01", "2024-07-01", fetcher=fetcher, store=store)
+    panel, _ = load_bulk(["AAA", "BBB"], "2024-01-01", "2024-07-03", fetcher=fetcher, store=store)
+
+    assert fetcher.calls[-1] == (("AAA", "BBB"), pd.Timestamp("2024-07-01"), pd.Timestamp("2024-07-03"))
+    assert panel.index[0] == pd.Timestamp("2024-01-01")
+    assert panel.index[-1] == pd.Timestamp("2024-07-02")
+
+
+def test_today_is_the_only_range_fetched_again(tmp_path):
+    # Pages load up to tomorrow, and today's bar is never marked as covered
+    fetcher = RecordingFetcher()
+    store = PriceStore(tmp_path, fetcher=lambda *args: pd.DataFrame())
+    today = pd.Timestamp.now().normalize()
+    start, end = today - pd.Timedelta(days=365), today + pd.Timedelta(days=1)
+    load_bulk(["AAA", "BBB"], start, end, fetcher=fetcher, store=store)
+    load_bulk(["AAA", "BBB"], start, end, fetcher=fetcher, store=store)
+
+    assert fetcher.calls[-1] == (("AAA", "BBB"), today, end)
+
+
+def test_tickers_missing_different_ranges_fetch_only_their_gaps(tmp_path):
+    fetcher = RecordingFetcher()
+    store = PriceStore(tmp_path, fetcher=lambda *args: pd.DataFrame())
+    load_bulk(["AAA"], "2024-01-01", "2024-07-01", fetcher=fetcher, store=store)
+    fetcher.calls.clear()
+    panel, failures = load_bulk(["AAA", "BBB"], "2024-01-01", "2024-07-01", fetcher=fetcher, store=store)
+
+    assert not failures
+    assert fetcher.calls == [(("BBB",), pd.Timestamp("2024-01-01"), pd.Timestamp("2024-07-01"))]
+    assert list(panel.columns.get_level_values("Ticker").unique()) == ["AAA", "BBB"]
+
+
+def test_failed_batch_is_reported_and_not_stored(tmp_path):
+    def failing(symbols, start, end):
+        raise IOError("throttled")
+
+    store = PriceStore(tmp_path, fetcher=lambda *args: pd.DataFrame())
+    panel, failures = load_bulk(["AAA"], "2024-01-01", "2024-07-01", fetcher=failing, store=store)
+    assert panel.empty
+    assert failures == {"AAA": "throttled"}
+    assert store.missing("AAA", "2024-01-01", "2024-07-01")
+
+
+def test_empty_batch_for_a_trading_range_is_retried_next_load(tmp_path):
+    # yf.download answers a throttled request with an empty frame
+    calls = []
+
+    def throttled(symbols, start, end):
+        calls.append(tuple(symbols))
+        return {}
+
+    store = PriceStore(tmp_path, fetcher=lambda *args: pd.DataFrame())
+    panel, failures = load_bulk(["AAA", "BBB"], "2024-07-01", "2024-07-03", fetcher=throttled, store=store)
+    assert panel.empty
+    assert set(failures) == {"AAA", "BBB"}
+    assert store.missing("AAA", "2024-07-01", "2024-07-03")
+
+    fetcher = RecordingFetcher()
+    panel, failures = load_bulk(["AAA", "BBB"], "2024-07-01", "2024-07-03", fetcher=fetcher, store=store)
+    assert not failures
+    assert len(fetcher.calls) == 1
+
+
+def test_ticker_missing_from_a_batch_is_a_failure(tmp_path):
+    fetcher = RecordingFetcher(listed={"NEW": pd.Timestamp("2030-01-01")})
+    store = PriceStore(tmp_path, fetcher=lambda *args: pd.DataFrame())
+    panel, failures = load_bulk(["AAA", "NEW"], "2024-07-01", "2024-07-03", fetcher=fetcher, store=store)
+    assert list(failures) == ["NEW"]
+    assert list(panel.columns.get_level_values("Ticker").unique()) == ["AAA"]
+    assert store.missing("NEW", "2024-07-01", "2024-07-03")
+
+
+def test_empty_batch_for_a_closed_range_is_covered(tmp_path):
+    store = PriceStore(tmp_path, fetcher=lambda *args: pd.DataFrame())
+    fetcher = RecordingFetcher()
+    # Saturday to Monday, exclusive: no session
+    load_bulk(["AAA"], "2024-07-06", "2024-07-08", fetcher=lambda *args: {}, store=store)
+    assert not store.missing("AAA", "2024-07-06", "2024-07-08")
+    load_bulk(["AAA"], "2024-07-06", "2024-07-08", fetcher=fetcher, store=store)
+    assert not fetcher.calls
+
+
+@pytest.fixture
+def fake_download(monkeypatch):
+    """Replaces yf.download with a stub that only accepts arguments the real one takes."""
+    yf = pytest.importorskip("yfinance")
+    import upstream
+    signature = inspect.signature(yf.download)
+    calls = []
+
+    def download(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        calls.append(bound.arguments)
+        symbols = bound.arguments["tickers"]
+        index = pd.bdate_range(bound.arguments["start"], periods=2, name="Date")
+        columns = pd.MultiIndex.from_product([["Close", "High", "Low", "Open", "Volume"], symbols],
+                                             names=["Price", "Ticker"])
+        return pd.DataFrame(1.0, index=index, columns=columns) if download.bars else pd.DataFrame()
+
+    download.bars = True
+    monkeypatch.setattr(yf, "download", download)
+    # No real curl session or network, and no backoff sleeps
+    monkeypatch.setattr(upstream.Provider, "session", property(lambda self: None))
+    monkeypatch.setattr(upstream.get_provider("yahoo"), "retries", 0)
+    return download, calls
+
+
+def test_batch_fetcher_passes_only_arguments_yfinance_accepts(fake_download):
+    download, calls = fake_download
+    result = bulk_loader.yfinance_batch_fetcher(["AAA", "BBB"], "2024-07-01", "2024-07-03")
+    assert len(calls) == 1
+    assert sorted(result) == ["AAA", "BBB"]
+    assert len(result["AAA"]) == 2
+
+
+def test_batch_fetcher_raises_when_a_trading_range_comes_back_empty(fake_download):
+    download, calls = fake_download
+    download.bars = False
+    with pytest.raises(ConnectionError):
+        bulk_loader.yfinance_batch_fetcher(["AAA", "BBB"], "2024-07-01", "2024-07-03")
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import (
+    calculate_atr, calculate_bollinger_bands, calculate_macd, calculate_obv, calculate_rsi, calculate_sma,
+    calculate_stochastic, compute_array_indicators, compute_indicators, compute_panel_indicators,
+)
+from lru_cache import LRUCache
+
+# The pandas implementations the fused engine replaced, kept as the reference
+def reference_indicators(df):
+    df = df.copy()
+    close, high, low = df['Close'], df['High'], df['Low']
+    out = {}
+    out['SMA_20'] = close.rolling(window=20).mean()
+    std = close.rolling(window=20).std()
+    out['Upper_Band'] = out['SMA_20'] + std * 2
+    out['Lower_Band'] = out['SMA_20'] - std * 2
+
+    delta = close.diff()
+    avg_gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+    avg_loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean().replace(0, 0.00001)
+    out['RSI'] = 100 - (100 / (1 + avg_gain / avg_loss))
+
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    out['MACD'] = macd
+    out['MACD_Signal'] = macd.ewm(span=9, adjust=False).mean()
+    out['MACD_Histogram'] = macd - out['MACD_Signal']
+
+    tr = np.maximum(np.maximum(high - low, np.abs(high - close.shift(1))), np.abs(low - close.shift(1)))
+    out['ATR'] = tr.rolling(window=14).mean()
+
+    out['OBV'] = pd.Series(np.where(close > close.shift(1), df['Volume'],
+                                    np.where(close < close.shift(1), -df['Volume'], 0)).cumsum(),
+                           index=df.index)
+
+    lowest, highest = low.rolling(window=14).min(), high.rolling(window=14).max()
+    out['%K'] = 100 * ((close - lowest) / (highest - lowest))
+    out['%D'] = out['%K'].rolling(window=3).mean()
+    return pd.DataFrame(out)
+
+
+def assert_matches(actual, expected, columns=None):
+    for col in columns or expected.columns:
+        np.testing.assert_allclose(np.asarray(actual[col], dtype=np.float64),
+                                   np.asarray(expected[col], dtype=np.float64),
+                                   rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_fused_engine_matches_the_old_indicators(seed, random_bars, indicator_requests):
+    df = random_bars(seed=seed)
+    result = compute_indicators(df, indicator_requests, cache=None)
+    expected = reference_indicators(df)
+    assert set(result.columns) == set(expected.columns)
+    assert result.index.equals(df.index)
+    assert_matches(result, expected)
+
+
+def test_calculate_wrappers_match_the_old_indicators(random_bars):
+    df = random_bars()
+    expected = reference_indicators(df)
+    wrappers = [
+        (calculate_sma, {'period': 20}, ['SMA_20']),
+        (calculate_bollinger_bands, {}, ['SMA_20', 'Upper_Band', 'Lower_Band']),
+        (calculate_rsi, {}, ['RSI']),
+        (calculate_macd, {}, ['MACD', 'MACD_Signal', 'MACD_Histogram']),
+        (calculate_atr, {}, ['ATR']),
+        (calculate_obv, {}, ['OBV']),
+        (calculate_stochastic, {}, ['%K', '%D']),
+    ]
+    for func, kwargs, columns in wrappers:
+        out = func(df.copy(), **kwargs)
+        assert_matches(out, expected, columns)
+        # No intermediate columns are left behind
+        assert set(out.columns) == set(df.columns) | set(columns)
+
+
+def test_cached_result_equals_uncached(random_bars, indicator_requests):
+    df = random_bars()
+    cache = LRUCache(max_entries=16)
+    first = compute_indicators(df, indicator_requests, cache=cache)
+    second = compute_indicators(df, indicator_requests, cache=cache)
+    pd.testing.assert_frame_equal(first, second)
+    pd.testing.assert_frame_equal(first, compute_indicators(df, indicator_requests, cache=None))
+
+
+def test_panel_and_array_engines_match_per_ticker(random_bars, indicator_requests):
+    frames = {f'T{i}': random_bars(n=800, seed=i, gap=False) for i in range(4)}
+    # A ticker listing part-way through
+    frames['T3'] = frames['T3'].iloc[300:]
+    panel = pd.concat(frames, axis=1, names=['Ticker', 'Field']).sort_index()
+    by_panel = compute_panel_indicators(panel, indicator_requests)
+    arrays = {field: panel.xs(field, axis=1, level='Field').to_numpy(dtype=np.float64)
+              for field in ('Open', 'High', 'Low', 'Close', 'Volume')}
+    by_array = compute_array_indicators(arrays, indicator_requests)
+
+    for i, (ticker, frame) in enumerate(frames.items()):
+        single = compute_indicators(frame, indicator_requests, cache=None)
+        rows = panel.index.get_indexer(frame.index)
+        for name in single.columns:
+            np.testing.assert_allclose(by_panel[name][ticker].loc[frame.index], single[name],
+                                       rtol=1e-9, atol=1e-9, err_msg=f'{ticker} {name}')
+            np.testing.assert_allclose(by_array[name][rows, i], single[name],
+                                       rtol=1e-9, atol=1e-9, err_msg=f'{ticker} {name}')
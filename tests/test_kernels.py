@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from kernels import rolling_std
+
+
+@pytest.mark.parametrize('window', [1, 2, 20, 250])
+def test_rolling_std_kernel_matches_pandas(window, random_bars):
+    df = random_bars(n=1000)
+    df.iloc[500:520, 1] = 42.0
+    values = df[['Close', 'High', 'Low']].to_numpy()
+    expected = df[['Close', 'High', 'Low']].rolling(window).std().to_numpy()
+    np.testing.assert_allclose(rolling_std(values, window), expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(rolling_std(values[:, 0], window), expected[:, 0], rtol=1e-9, atol=1e-9)
+
+
+def test_rolling_std_kernel_stays_accurate_on_large_prices():
+    rng = np.random.default_rng(0)
+    values = 1e9 + np.arange(100_000) * 1e-3 + rng.standard_normal(100_000)
+    exact = sliding_window_view(values, 20).std(axis=1, ddof=1)
+    assert np.abs(rolling_std(values, 20)[19:] - exact).max() < 1e-9
@@ -0,0 +1,109 @@
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import price_store
+from price_store import PriceStore, has_sessions
+
+
+def bars(start, end):
+    index = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+    close = np.linspace(100, 110, len(index))
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                         "Volume": 1000}, index=index)
+
+
+def test_sessions_skip_weekends_holidays_and_today():
+    assert has_sessions("2024-07-01", "2024-07-02")
+    assert not has_sessions("2024-07-06", "2024-07-08")     # Saturday and Sunday
+    assert not has_sessions("2024-07-04", "2024-07-05")     # Independence Day
+    assert not has_sessions("2024-03-29", "2024-03-30")     # Good Friday
+    today = pd.Timestamp.now().normalize()
+    assert not has_sessions(today, today + pd.Timedelta(days=1))
+
+
+def test_empty_download_of_a_trading_range_is_not_covered(tmp_path):
+    calls = []
+
+    def fetcher(symbol, start, end):
+        calls.append((start, end))
+        return pd.DataFrame()
+
+    store = PriceStore(tmp_path, fetcher=fetcher)
+    assert store.get("AAA", "2024-07-01", "2024-07-03").empty
+    assert store.missing("AAA", "2024-07-01", "2024-07-03")
+    store.get("AAA", "2024-07-01", "2024-07-03")
+    assert len(calls) == 2
+
+
+def test_empty_download_of_a_closed_range_is_covered(tmp_path):
+    store = PriceStore(tmp_path, fetcher=lambda *args: pd.DataFrame())
+    store.get("AAA", "2024-07-04", "2024-07-05")
+    store.get("AAA", "2024-07-06", "2024-07-08")
+    assert not store.missing("AAA", "2024-07-04", "2024-07-05")
+    assert not store.missing("AAA", "2024-07-06", "2024-07-08")
+
+
+def test_stored_range_is_not_downloaded_again(tmp_path):
+    calls = []
+
+    def fetcher(symbol, start, end):
+        calls.append((start, end))
+        return bars(start, end)
+
+    store = PriceStore(tmp_path, fetcher=fetcher)
+    first = store.get("AAA", "2024-01-01", "2024-07-01")
+    second = store.get("AAA", "2024-01-01", "2024-07-01")
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+
+
+class FakeTicker:
+    """Stands in for yfinance.Ticker; history() returns or raises what the test sets."""
+    outcome = None
+    calls = []
+
+    def __init__(self, symbol, session=None):
+        self.symbol = symbol
+
+    def history(self, **kwargs):
+        FakeTicker.calls.append(kwargs)
+        if isinstance(FakeTicker.outcome, Exception):
+            raise FakeTicker.outcome
+        return FakeTicker.outcome
+
+
+@pytest.fixture
+def fake_yfinance(monkeypatch):
+    yf = pytest.importorskip("yfinance")
+    from yfinance.exceptions import YFPricesMissingError
+
+    import upstream
+    monkeypatch.setattr(yf, "Ticker", FakeTicker)
+    # No real curl session or network for the provider
+    monkeypatch.setattr(upstream.Provider, "session", property(lambda self: None))
+    FakeTicker.calls = []
+    return YFPricesMissingError
+
+
+def test_yfinance_fetcher_asks_history_to_raise(fake_yfinance):
+    index = pd.date_range("2024-07-01", periods=2, tz=price_store.EXCHANGE_TZ)
+    FakeTicker.outcome = pd.DataFrame({"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5,
+                                       "Volume": 10.0}, index=index)
+    data = price_store.yfinance_fetcher("AAA", "2024-07-01", "2024-07-03")
+
+    assert FakeTicker.calls[0]["raise_errors"] is True
+    assert data.index.tz is None
+    assert data["Volume"].dtype == np.int64
+
+
+def test_yfinance_fetcher_returns_empty_when_yahoo_has_no_bars(fake_yfinance):
+    FakeTicker.outcome = fake_yfinance("AAA", " (1d 2024-07-06 -> 2024-07-08)")
+    assert price_store.yfinance_fetcher("AAA", "2024-07-06", "2024-07-08").empty
+
+
+def test_yfinance_fetcher_raises_download_errors(fake_yfinance):
+    FakeTicker.outcome = ValueError("bad response")
+    with pytest.raises(ValueError):
+        price_store.yfinance_fetcher("AAA", "2024-07-01", "2024-07-03")
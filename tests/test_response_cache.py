@@ -0,0 +1,44 @@
+import pytest
+
+from response_cache import ResponseCache, company_aliases
+
+ALIASES = company_aliases({'NVDA': 'Nvidia', 'AMD': 'Advanced Micro Devices', 'XOM': 'Exxon Mobil'})
+
+
+@pytest.fixture
+def cache():
+    cache = ResponseCache(aliases=ALIASES, tickers=set(ALIASES.values()))
+    cache.store("analyze NVDA", "NVDA analysis", seconds=9.0)
+    cache.store("What is the outlook for the energy sector?", "Energy outlook", seconds=10.0)
+    cache.store("What is the outlook for bonds?", "Bond outlook", seconds=10.0)
+    cache.store("Should I buy NVDA?", "Buy case", seconds=11.0)
+    return cache
+
+
+@pytest.mark.parametrize("question, answer", [
+    ("NVIDIA stock analysis?", "NVDA analysis"),
+    ("can you analyze $nvda for me", "NVDA analysis"),
+    ("Energy sector outlook?", "Energy outlook"),
+    ("Outlook for bonds", "Bond outlook"),
+    ("Should I buy Nvidia stock?", "Buy case"),
+])
+def test_rephrased_question_reuses_the_answer(cache, question, answer):
+    assert cache.lookup(question).content == answer
+
+
+@pytest.mark.parametrize("question", [
+    "What is the outlook for the tech sector?",
+    "What is the outlook for bond yields?",
+    "Should I sell NVDA?",
+    "Should I short NVDA?",
+    "analyze AMD",
+    "Compare NVDA and AMD",
+])
+def test_question_differing_in_a_key_word_misses(cache, question):
+    assert cache.lookup(question) is None
+
+
+def test_empty_answer_is_not_stored(cache):
+    cache.store("What is the outlook for gold?", "  ", seconds=1.0)
+    assert len(cache) == 4
+    assert cache.lookup("What is the outlook for gold?") is None
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from schema import normalize_schema, split_tickers
+
+
+def yfinance_download(tickers, index, listed=None):
+    """A raw multi-ticker download: (Price, Ticker) columns, NaN before each listing date."""
+    listed = listed or {}
+    columns = pd.MultiIndex.from_product([['Close', 'High', 'Low', 'Open', 'Volume'], tickers],
+                                         names=['Price', 'Ticker'])
+    rng = np.random.default_rng(0)
+    raw = pd.DataFrame(rng.uniform(50, 150, (len(index), len(columns))), index=index, columns=columns)
+    raw['Volume'] = raw['Volume'].round()
+    for ticker, day in listed.items():
+        raw.loc[raw.index < day, (slice(None), ticker)] = np.nan
+    return raw
+
+
+def test_late_listed_ticker_keeps_only_listed_bars():
+    index = pd.bdate_range('2024-01-01', periods=60)
+    listing = index[40]
+    frames = split_tickers(normalize_schema(yfinance_download(['OLD', 'NEW'], index, {'NEW': listing})))
+
+    assert frames['OLD'].index.equals(index.rename('Date'))
+    assert frames['NEW'].index[0] == listing
+    assert len(frames['NEW']) == 20
+    assert not frames['NEW'][['Open', 'High', 'Low', 'Close']].isna().any().any()
+    assert frames['NEW']['Volume'].dtype == np.int64
+
+
+def test_missing_bar_is_dropped_but_zero_volume_bar_is_kept():
+    index = pd.bdate_range('2024-01-01', periods=10)
+    raw = yfinance_download(['AAA', 'BBB'], index)
+    raw.loc[index[3], (slice(None), 'AAA')] = np.nan
+    raw.loc[index[5], ('Volume', 'AAA')] = 0
+    frame = split_tickers(normalize_schema(raw))['AAA']
+
+    assert index[3] not in frame.index
+    assert frame.loc[index[5], 'Volume'] == 0
+    assert len(frame) == 9
+
+
+def test_fields_are_canonical_and_sorted_by_ticker():
+    index = pd.bdate_range('2024-01-01', periods=5)
+    data = normalize_schema(yfinance_download(['BBB', 'AAA'], index))
+
+    assert data.columns.names == ['Ticker', 'Field']
+    assert list(data.columns.get_level_values('Ticker').unique()) == ['AAA', 'BBB']
+    assert set(data['AAA'].columns) == {'Open', 'High', 'Low', 'Close', 'Volume'}
+    assert data.index.name == 'Date'
+
+
+def test_single_ticker_download_is_flattened():
+    index = pd.bdate_range('2024-01-01', periods=5)
+    raw = yfinance_download(['AAA'], index)
+    raw.loc[index[2], ('Volume', 'AAA')] = np.nan
+    for data in (normalize_schema(raw), normalize_schema(raw.droplevel('Ticker', axis=1))):
+        assert list(data.columns) == ['Close', 'High', 'Low', 'Open', 'Volume']
+        assert data.index.name == 'Date'
+        assert data['Close'].dtype == np.float64
+        assert data['Volume'].dtype == np.int64
+        assert data.loc[index[2], 'Volume'] == 0
+        np.testing.assert_array_equal(data['Close'], raw[('Close', 'AAA')])
@@ -0,0 +1,37 @@
+import datetime
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import bulk_loader
+import data_loader
+from price_store import PriceStore
+from test_bulk_loader import RecordingFetcher
+
+TICKERS = [f"T{i:02d}" for i in range(12)]
+
+
+@pytest.fixture
+def screener(tmp_path, monkeypatch):
+    fetcher = RecordingFetcher()
+    store = PriceStore(tmp_path, fetcher=lambda *args: pd.DataFrame())
+    monkeypatch.setattr(bulk_loader, "yfinance_batch_fetcher", fetcher)
+    monkeypatch.setattr(bulk_loader, "get_price_store", lambda: store)
+    data_loader.load_universe.clear()
+    monkeypatch.setattr(data_loader, "get_sp500_components",
+                        lambda: (TICKERS, {t: f"{t} Inc" for t in TICKERS}))
+    return AppTest.from_file("../pages/2_Screener.py", default_timeout=60), fetcher
+
+
+def test_rescan_only_fetches_the_latest_bar(screener):
+    at, fetcher = screener
+    at.run()
+    assert not at.exception
+    assert len(fetcher.calls) == 1
+
+    # "Refresh data" clears the page cache; the store still holds everything before today
+    at.sidebar.button[0].click().run()
+    assert not at.exception
+    today = pd.Timestamp(datetime.date.today())
+    assert fetcher.calls[1:] == [(tuple(TICKERS), today, today + pd.Timedelta(days=1))]
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import add_indicators
+from streaming import IndicatorStream
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_streaming_matches_batch(seed, random_bars, indicator_requests):
+    df = random_bars(3000, seed)
+    batch = add_indicators(df.copy(), indicator_requests).drop(columns=df.columns)
+    stream = IndicatorStream(indicator_requests)
+    streamed = pd.DataFrame([stream.update(bar) for bar in df.to_dict('records')], index=df.index)
+
+    assert set(streamed.columns) == set(batch.columns)
+    for col in batch.columns:
+        np.testing.assert_allclose(streamed[col], batch[col], rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_warm_up_then_update_matches_batch(random_bars, indicator_requests):
+    df = random_bars(1500, 3)
+    batch = add_indicators(df.copy(), indicator_requests)
+    stream = IndicatorStream(indicator_requests)
+    stream.warm_up(df.iloc[:1000])
+    streamed = pd.DataFrame([stream.update(bar) for bar in df.iloc[1000:].to_dict('records')],
+                            index=df.index[1000:])
+    for col in streamed.columns:
+        np.testing.assert_allclose(streamed[col], batch[col].iloc[1000:], rtol=1e-9, atol=1e-9, err_msg=col)
@@ -0,0 +1,215 @@
+import functools
+import json
+import threading
+import time
+
+from lru_cache import LRUCache
+
+# Seconds a tool result stays fresh, by tool function name. Quotes go stale in
+# seconds, statements only change with a filing.
+DEFAULT_TTL = 300
+TOOL_TTLS = {
+    # YFinanceTools
+    'get_current_stock_price': 30,
+    'get_historical_stock_prices': 300,
+    'get_technical_indicators': 300,
+    'get_company_news': 600,
+    'get_stock_fundamentals': 3600,
+    'get_key_financial_ratios': 3600,
+    'get_analyst_recommendations': 3600,
+    'get_company_info': 86400,
+    'get_income_statements': 86400,
+    # SerperTools, and LinkupClient.search
+    'search_news': 600,
+    'search': 900,
+    'search_scholar': 86400,
+}
+
+# Arguments naming tickers; 'nvda' and 'NVDA' share one cache entry
+SYMBOL_ARGUMENTS = ('symbol', 'symbols', 'ticker', 'tickers')
+
+
+def _normalize(name, value):
+    if name in SYMBOL_ARGUMENTS and isinstance(value, str):
+        return value.strip().upper()
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _call_key(tool, args, kwargs):
+    kwargs = {name: _normalize(name, value) for name, value in kwargs.items()}
+    return tool, json.dumps([args, kwargs], sort_keys=True, default=repr)
+
+
+class _Call:
+    """An upstream call in flight; concurrent identical calls wait on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.seconds = 0.0
+
+
+class ToolCache:
+    """
+    Shared cache for agent tool calls. Results are kept for a per-tool TTL,
+    concurrent identical calls share a single upstream call (request coalescing),
+    and per-tool counters record hits, misses, coalesced waits, errors, upstream
+    time and the latency saved by not calling upstream. Errors are never cached.
+    """
+
+    def __init__(self, max_entries=2048, clock=time.monotonic):
+        self.clock = clock
+        # key -> (expires at, result, seconds the upstream call took)
+        self._entries = LRUCache(max_entries=max_entries)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _count(self, tool, **deltas):
+        stats = self._stats.setdefault(tool, {
+            'calls': 0, 'hits': 0, 'coalesced': 0, 'misses': 0, 'errors': 0,
+            'upstream_s': 0.0, 'saved_s': 0.0,
+        })
+        for name, delta in deltas.items():
+            stats[name] += delta
+
+    def call(self, tool, ttl, func, *args, **kwargs):
+        """Returns func(*args, **kwargs), from cache when a fresh result for the same call exists."""
+        key = _call_key(tool, args, kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._count(tool, calls=1, hits=1, saved_s=entry[2])
+                return entry[1]
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = _Call()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            start = self.clock()
+            pending.done.wait()
+            waited = self.clock() - start
+            with self._lock:
+                self._count(tool, calls=1, coalesced=1, saved_s=max(pending.seconds - waited, 0.0))
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        start = self.clock()
+        try:
+            pending.result = func(*args, **kwargs)
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            pending.seconds = self.clock() - start
+            with self._lock:
+                self._count(tool, calls=1, misses=1, upstream_s=pending.seconds,
+                            errors=int(pending.error is not None))
+                if pending.error is None:
+                    self._entries.put(key, (self.clock() + ttl, pending.result, pending.seconds))
+                del self._inflight[key]
+            pending.done.set()
+        return pending.result
+
+    def wrap(self, tool, func, ttl):
+        """Returns func with its calls going through this cache; keeps func's signature and docstring."""
+        @functools.wraps(func)
+        def cached(*args, **kwargs):
+            return self.call(tool, ttl, func, *args, **kwargs)
+        return cached
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Returns {tool: counters} plus a 'total' row; hit_rate counts coalesced calls as hits."""
+        with self._lock:
+            rows = {tool: dict(counts) for tool, counts in self._stats.items()}
+        total = {}
+        for counts in rows.values():
+            for name, value in counts.items():
+                total[name] = total.get(name, 0) + value
+        if rows:
+            rows['total'] = total
+        for counts in rows.values():
+            counts['hit_rate'] = (counts['hits'] + counts['coalesced']) / counts['calls'] if counts['calls'] else 0.0
+        return rows
+
+
+# Process-wide cache shared by every session and agent
+TOOL_CACHE = ToolCache()
+
+
+def cache_tools(tools, ttls=None, cache=TOOL_CACHE, methods=None):
+    """
+    Routes the calls of an agno toolkit (or any client object) through cache and
+    returns it. For a toolkit every registered function is wrapped; for other
+    objects, list the method names to wrap in methods. TTLs come from ttls, then
+    TOOL_TTLS, then DEFAULT_TTL.
+    """
+    ttls = {**TOOL_TTLS, **(ttls or {})}
+    prefix = type(tools).__name__
+    functions = getattr(tools, 'functions', None)
+    if methods is None and isinstance(functions, dict):
+        for name, function in functions.items():
+            function.entrypoint = cache.wrap(f'{prefix}.{name}', function.entrypoint,
+                                             ttls.get(name, DEFAULT_TTL))
+        return tools
+    for name in methods or ():
+        setattr(tools, name, cache.wrap(f'{prefix}.{name}', getattr(tools, name),
+                                        ttls.get(name, DEFAULT_TTL)))
+    return tools
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    class _Function:
+        def __init__(self, entrypoint):
+            self.entrypoint = entrypoint
+
+    class StubFinanceTools:
+        """Local stand-in for YFinanceTools with fixed upstream latency."""
+
+        def __init__(self, latency=0.2):
+            self.latency = latency
+            self.upstream_calls = 0
+            self.functions = {
+                'get_current_stock_price': _Function(self.get_current_stock_price),
+                'get_income_statements': _Function(self.get_income_statements),
+            }
+
+        def get_current_stock_price(self, symbol):
+            self.upstream_calls += 1
+            time.sleep(self.latency)
+            return json.dumps({'symbol': symbol.upper(), 'price': 100.0})
+
+        def get_income_statements(self, symbol):
+            self.upstream_calls += 1
+            time.sleep(self.latency)
+            return json.dumps({'symbol': symbol.upper(), 'revenue': [1, 2, 3]})
+
+    cache = ToolCache()
+    stub = cache_tools(StubFinanceTools(), cache=cache)
+    price = stub.functions['get_current_stock_price'].entrypoint
+    statements = stub.functions['get_income_statements'].entrypoint
+
+    # Five users ask about NVDA at the same moment, then again a little later
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        for _ in range(2):
+            list(pool.map(lambda s: (price(symbol=s), statements(symbol=s)), ['NVDA', 'nvda', 'NVDA', 'Nvda', 'NVDA']))
+    elapsed = time.perf_counter() - start
+    print(f"20 tool calls in {elapsed:.2f} s with {stub.upstream_calls} upstream calls "
+          f"(uncached: {20 * stub.latency:.2f} s sequential, 20 upstream calls)")
+    for tool, counts in cache.stats().items():
+        print(f"{tool:<48} calls {counts['calls']:3}  hits {counts['hits']:3}  coalesced {counts['coalesced']:3}  "
+              f"misses {counts['misses']:3}  hit rate {counts['hit_rate']:5.0%}  saved {counts['saved_s']:.2f} s")
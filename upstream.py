@@ -0,0 +1,268 @@
+import functools
+import os
+import random
+import threading
+import time
+
+# Sustained requests per second and burst size per upstream provider. The chart,
+# the screener and every chat session share these, so a burst from one of them
+# waits its turn instead of getting the whole app throttled. Override with e.g.
+# UPSTREAM_RATE_YAHOO=5 and UPSTREAM_BURST_YAHOO=10.
+PROVIDER_LIMITS = {
+    'yahoo': (4.0, 8),
+    'serper': (5.0, 5),
+    'linkup': (2.0, 4),
+    'wikipedia': (1.0, 2),
+}
+# Keep-alive connections kept open by the Wikipedia session
+POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average and up to `burst` at once.
+    acquire() blocks until a token is free; waiting callers are counted so the
+    queue depth can be reported.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.max_waiting = 0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=None):
+        """Takes a token, waiting for one if needed; returns the seconds waited, or None on timeout."""
+        start = self.clock()
+        queued = False
+        try:
+            while True:
+                with self._lock:
+                    now = self.clock()
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return now - start
+                    wait = (1 - self._tokens) / self.rate
+                    if not queued:
+                        queued = True
+                        self.waiting += 1
+                        self.max_waiting = max(self.max_waiting, self.waiting)
+                if timeout is not None and now - start + wait > timeout:
+                    return None
+                self.sleep(wait)
+        finally:
+            if queued:
+                with self._lock:
+                    self.waiting -= 1
+
+
+def _status(error):
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error):
+    """Rate limiting, server errors and dropped connections are worth retrying."""
+    status = _status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    text = f"{type(error).__name__} {error}".lower()
+    return (isinstance(error, (ConnectionError, TimeoutError))
+            or any(word in text for word in ('ratelimit', 'rate limit', 'too many requests', 'timed out',
+                                             'connection reset', 'connection aborted')))
+
+
+def backoff(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _make_session(name):
+    # yfinance only accepts curl_cffi sessions; the Wikipedia scrape uses requests.
+    # The Serper and Linkup clients open their own connections and take no session.
+    if name == 'yahoo':
+        from curl_cffi import requests as curl_requests
+        from yfinance.data import YfData
+
+        session = curl_requests.Session(impersonate="chrome")
+        # yfinance keeps one session for the whole process; passing ours makes every
+        # yfinance call, including the agents' YFinanceTools, reuse its connections
+        YfData(session=session)
+        return session
+    if name == 'wikipedia':
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    raise ValueError(f"{name} has no shared session; its client manages its own connections")
+
+
+class Provider:
+    """
+    One upstream API: a token-bucket rate limit, retries with jittered backoff
+    and, for Yahoo and Wikipedia, a pooled keep-alive session created on first
+    use. call() runs any function under the limit; stats() reports calls,
+    retries, failures, time spent waiting for the limiter and the current and
+    peak queue depth.
+    """
+
+    def __init__(self, name, rate, burst, retries=DEFAULT_RETRIES, clock=time.monotonic, sleep=time.sleep):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self.retries = retries
+        self.sleep = sleep
+        self._session = None
+        self._lock = threading.Lock()
+        self.counts = {'calls': 0, 'attempts': 0, 'retries': 0, 'failures': 0,
+                       'throttled': 0, 'wait_s': 0.0}
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = _make_session(self.name)
+            return self._session
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self.counts[name] += delta
+
+    def call(self, func, *args, retries=None, **kwargs):
+        """Returns func(*args, **kwargs), waiting for the rate limit and retrying transient errors."""
+        retries = self.retries if retries is None else retries
+        self._count(calls=1)
+        for attempt in range(retries + 1):
+            waited = self.bucket.acquire()
+            self._count(attempts=1, wait_s=waited, throttled=int(waited > 0.001))
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt == retries or not is_retryable(e):
+                    self._count(failures=1)
+                    raise
+                self._count(retries=1)
+                self.sleep(backoff(attempt))
+
+    def wrap(self, func):
+        """Returns func with its calls going through this provider; keeps func's signature and docstring."""
+        @functools.wraps(func)
+        def limited(*args, **kwargs):
+            return self.call(func, *args, **kwargs)
+        return limited
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counts)
+        stats['queue'] = self.bucket.waiting
+        stats['max_queue'] = self.bucket.max_waiting
+        return stats
+
+
+def _limits(name):
+    rate, burst = PROVIDER_LIMITS[name]
+    return (float(os.getenv(f"UPSTREAM_RATE_{name.upper()}", rate)),
+            int(os.getenv(f"UPSTREAM_BURST_{name.upper()}", burst)))
+
+
+# Process-wide providers shared by the data loaders and every agent
+PROVIDERS = {name: Provider(name, *_limits(name)) for name in PROVIDER_LIMITS}
+
+
+def get_provider(name):
+    return PROVIDERS[name]
+
+
+def limit_tools(tools, provider, methods=None):
+    """
+    Routes the calls of an agno toolkit (or the listed methods of any client
+    object) through a provider's rate limit and retries, and returns it. Apply
+    before cache_tools, so cache hits never wait for the limiter.
+    """
+    provider = PROVIDERS[provider] if isinstance(provider, str) else provider
+    if provider.name == 'yahoo':
+        # Toolkits build their own yfinance objects; make sure they find the pooled session
+        provider.session
+    functions = getattr(tools, 'functions', None)
+    if methods is None and isinstance(functions, dict):
+        for function in functions.values():
+            function.entrypoint = provider.wrap(function.entrypoint)
+        return tools
+    for name in methods or ():
+        setattr(tools, name, provider.wrap(getattr(tools, name)))
+    return tools
+
+
+def stats():
+    """Returns {provider: counters} for every provider."""
+    return {name: provider.stats() for name, provider in PROVIDERS.items()}
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    class FlakyUpstream:
+        """Local stand-in for an API that answers in 50 ms and throttles bursts with 429s."""
+
+        def __init__(self, limit_per_s):
+            self.limit_per_s = limit_per_s
+            self.recent = []
+            self.lock = threading.Lock()
+            self.requests = 0
+            self.throttled = 0
+
+        def get(self, symbol):
+            with self.lock:
+                now = time.monotonic()
+                self.recent = [t for t in self.recent if now - t < 1.0]
+                self.requests += 1
+                if len(self.recent) >= self.limit_per_s:
+                    self.throttled += 1
+                    error = IOError("429 Too Many Requests")
+                    error.status_code = 429
+                    raise error
+                self.recent.append(now)
+            time.sleep(0.05)
+            return symbol
+
+    def burst(provider):
+        upstream = FlakyUpstream(limit_per_s=10)
+        get = provider.wrap(upstream.get) if provider else upstream.get
+        results = []
+        start = time.perf_counter()
+        # 60 requests from 12 threads at once, like a screener refresh during chat traffic
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            for future in [pool.submit(get, f"T{i}") for i in range(60)]:
+                try:
+                    results.append(future.result())
+                except IOError:
+                    pass
+        return len(results), upstream, time.perf_counter() - start
+
+    for label, provider in (("no coordination", None),
+                            ("retries only", Provider('demo', rate=1e9, burst=10 ** 9)),
+                            ("shared limiter", Provider('demo', rate=9.0, burst=5))):
+        ok, upstream, elapsed = burst(provider)
+        print(f"{label:<16} {ok:2}/60 succeeded, {upstream.requests:3} requests sent, "
+              f"{upstream.throttled:3} throttled by upstream, {elapsed:5.2f} s")
+        if provider:
+            print(f"{'':<16} {provider.stats()}")
@@ -1,6 +0,0 @@
-import cufflinks as cf
-
-def configure_cufflinks():
-    """Configures cufflinks for offline use."""
-    cf.go_offline()
-    cf.set_config_file(offline=True, world_readable=False)
\ No newline at end of file